@@ -0,0 +1,70 @@
+"""
+Benchmark flatten_insider_payload: engine='rows' vs engine='columnar'.
+
+The sample payload is tiled N times (with unique ids) to get a backfill-sized input.
+
+    python benchmarks/bench_flatten.py --copies 5000 --repeat 3
+"""
+# std lib
+import argparse
+import copy
+import json
+import pathlib
+import sys
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+# packages
+import pandas as pd
+
+# local
+from flattener import flatten_insider_payload
+
+
+def scaled_payload(copies: int) -> dict:
+    with open(ROOT / "insider_trades.json", "r") as f:
+        sample = json.load(f)["transactions"]
+    filings = []
+    for i in range(copies):
+        for filing in sample:
+            filing = copy.copy(filing)
+            filing["id"] = f"{filing['id']}-{i}"
+            filings.append(filing)
+    return {"transactions": filings}
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--copies", type=int, default=1000)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args(argv)
+
+    payload = scaled_payload(args.copies)
+    n_filings = len(payload["transactions"])
+
+    rows = flatten_insider_payload(payload, engine="rows")
+    columnar = flatten_insider_payload(payload, engine="columnar")
+    pd.testing.assert_frame_equal(rows, columnar)
+
+    results = {}
+    for engine in ("rows", "columnar"):
+        results[engine] = best_of(lambda: flatten_insider_payload(payload, engine=engine), args.repeat)
+        print(f"{engine:>9}: {results[engine]:.3f}s  "
+              f"({n_filings / results[engine]:,.0f} filings/s, {len(rows):,} legs)")
+    print(f"  speedup: {results['rows'] / results['columnar']:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,75 @@
+"""
+Per-filing cost of the strict, lazy and trusted validation modes.
+
+The sample payload is tiled N times into one JSON document, then parsed whole with
+parse_filings_json in each mode. '+tables' also touches every filing's tables.
+
+    python benchmarks/bench_validation.py --copies 500
+"""
+# std lib
+import argparse
+import gc
+import json
+import pathlib
+import sys
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT / "src"), str(ROOT)]
+
+# local
+from insider_trading.types.sec_filings import parse_filings_json
+
+
+def scaled_raw(copies: int) -> tuple[bytes, int]:
+    with open(ROOT / "insider_trades.json", "r") as f:
+        payload = json.load(f)
+    payload["transactions"] = payload["transactions"] * copies
+    return json.dumps(payload).encode(), len(payload["transactions"])
+
+
+def best_of(fn, repeat: int) -> float:
+    # GC off while timing, as timeit does: every mode allocates ~35 objects per filing
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            t0 = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - t0)
+        finally:
+            gc.enable()
+    return best
+
+
+def touch_tables(raw, mode):
+    for t in parse_filings_json(raw, mode).transactions:
+        t.nonDerivativeTable, t.derivativeTable, t.footnotes
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--copies", type=int, default=500)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args(argv)
+
+    raw, n = scaled_raw(args.copies)
+    cases = {
+        "strict":      lambda: parse_filings_json(raw, "strict"),
+        "lazy":        lambda: parse_filings_json(raw, "lazy"),
+        "lazy+tables": lambda: touch_tables(raw, "lazy"),
+        "trusted":     lambda: parse_filings_json(raw, "trusted"),
+        "trusted+tables": lambda: touch_tables(raw, "trusted"),
+    }
+    print(f"{n:,} filings, {len(raw) / 1e6:.1f} MB")
+    base = None
+    for name, fn in cases.items():
+        t = best_of(fn, args.repeat)
+        base = base or t
+        print(f"{name:>15}: {t * 1e6 / n:8.1f} us/filing  ({base / t:.2f}x vs strict)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,249 @@
+"""
+Benchmark suite for the parsing pipeline on synthetic Form 4 payloads.
+
+Times (best of --repeat) and memory-profiles (tracemalloc peak, one extra run) every
+case at every size, writes the results as JSON and, given a baseline from an earlier
+run, fails when a case got slower or hungrier than the allowed threshold.
+
+Cases:
+    flatten_rows       flattener.flatten_insider_payload(engine="rows")
+    flatten_columnar   flattener.flatten_insider_payload(engine="columnar")
+    flatten_helpers    helpers.flatten_insider_payload
+    flatten_stream     iter_filings over the payload file + iter_flatten_insider_payload
+    flatten_parallel   backfill.parallel_flatten_table over a JSONL copy, parsing included
+                       (--workers; peak memory is the parent process only)
+    validate_strict    SECFilingJSON.model_validate_json
+    score              ScoringEngine.score on the columnar frame
+    startup_help       `python -m insider_trading --help` in a fresh interpreter (run once,
+                       reported with filings=0)
+    startup_stats      `python -m insider_trading stats` on a leg store of that size
+    startup_python     bare `python -c pass`, the floor under both startup cases
+
+Sizes above --max-in-memory only run the file-based cases (1M filings do not fit in RAM
+as Python objects). Startup cases time a subprocess (no peak memory) and fail the run
+when slower than --max-startup-ms.
+
+    python benchmarks/suite.py --sizes 10k,100k -o bench.json
+    python benchmarks/suite.py --sizes 10k --baseline bench.json --max-slowdown 0.25
+"""
+# std lib
+import argparse
+import gc
+import json
+import os
+import pathlib
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT / "src"), str(ROOT), str(ROOT / "benchmarks")]
+
+# local
+from synth import synthetic_payload, write_payload
+
+CASES = ("flatten_rows", "flatten_columnar", "flatten_helpers", "flatten_stream",
+         "flatten_parallel", "validate_strict", "score",
+         "startup_help", "startup_stats", "startup_python")
+STARTUP_CASES = ("startup_help", "startup_stats", "startup_python")
+
+
+def parse_size(s: str) -> int:
+    s = s.strip().lower()
+    mult = {"k": 1_000, "m": 1_000_000}.get(s[-1:], 1)
+    return int(float(s[:-1] if mult > 1 else s) * mult)
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def peak_mb(fn) -> float:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+
+
+def _command(*args: str):
+    """A fresh interpreter running args, with the repo importable as the tests see it."""
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([str(ROOT / "src"), str(ROOT)])}
+    cmd = [sys.executable, *args]
+    return lambda: subprocess.run(cmd, env=env, check=True, stdout=subprocess.DEVNULL)
+
+
+def _build_store(path: pathlib.Path, root: pathlib.Path) -> pathlib.Path:
+    """Leg store from a payload file, appended batch by batch like the poller does."""
+    from flattener import iter_flatten_insider_payload
+    from insider_trading.store import LegStore
+    from insider_trading.stream import iter_filings
+
+    store = LegStore(root)
+    for batch in iter_flatten_insider_payload(iter_filings(path), batch_size=50_000):
+        store.append(batch)
+    return root
+
+
+def _cases(n: int, seed: int, workdir: pathlib.Path, in_memory: bool, workers: int | None = None,
+           wanted: list[str] | None = None) -> dict:
+    """name -> callable for one size; inputs are built once, outside the timings."""
+    from flattener import flatten_insider_payload, iter_flatten_insider_payload
+    from insider_trading.backfill import parallel_flatten_table
+    from insider_trading.stream import iter_filings
+
+    path = write_payload(workdir / f"synth_{n}.json", n, seed)
+    lines = write_payload(workdir / f"synth_{n}.jsonl", n, seed, jsonl=True)
+
+    def stream():
+        legs = 0
+        for batch in iter_flatten_insider_payload(iter_filings(path), batch_size=50_000):
+            legs += len(batch)
+        return legs
+
+    cases = {"flatten_stream": stream,
+             "flatten_parallel": lambda: parallel_flatten_table(lines, workers=workers)}
+    if wanted is None or "startup_stats" in wanted:
+        store = _build_store(path, workdir / f"legs_{n}")
+        cases["startup_stats"] = _command("-m", "insider_trading", "stats", "--store", str(store))
+    if in_memory:
+        import helpers
+        from insider_trading.scoring import ScoringEngine
+        from insider_trading.types.sec_filings import SECFilingJSON
+
+        payload = synthetic_payload(n, seed)
+        raw = path.read_bytes()
+        frame = flatten_insider_payload(payload, engine="columnar")
+        engine = ScoringEngine()
+        cases.update({
+            "flatten_rows":     lambda: flatten_insider_payload(payload, engine="rows"),
+            "flatten_columnar": lambda: flatten_insider_payload(payload, engine="columnar"),
+            "flatten_helpers":  lambda: helpers.flatten_insider_payload(payload),
+            "validate_strict":  lambda: SECFilingJSON.model_validate_json(raw),
+            "score":            lambda: engine.score(frame),
+        })
+    return cases
+
+
+def run(sizes: list[int], seed: int = 0, repeat: int = 3, cases: list[str] | None = None,
+        memory: bool = True, max_in_memory: int = 200_000, workers: int | None = None) -> dict:
+    results = []
+    wanted = list(cases or CASES)
+    for name, args in (("startup_python", ("-c", "pass")), ("startup_help", ("-m", "insider_trading", "--help"))):
+        if name in wanted:
+            seconds = best_of(_command(*args), max(repeat, 5))
+            results.append({"case": name, "filings": 0, "seconds": round(seconds, 6)})
+            print(f"{name:>17} {0:>9,}: {seconds * 1e3:8.1f}ms", flush=True)
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            available = _cases(n, seed, pathlib.Path(tmp), n <= max_in_memory, workers, wanted)
+            for name in wanted:
+                if name not in available:
+                    continue
+                fn = available[name]
+                if name in STARTUP_CASES:
+                    seconds = best_of(fn, max(repeat, 5))
+                    results.append({"case": name, "filings": n, "seconds": round(seconds, 6)})
+                    print(f"{name:>17} {n:>9,}: {seconds * 1e3:8.1f}ms", flush=True)
+                    continue
+                seconds = best_of(fn, repeat)
+                row = {"case": name, "filings": n, "seconds": round(seconds, 6),
+                       "us_per_filing": round(seconds * 1e6 / n, 3)}
+                if memory:
+                    row["peak_mb"] = round(peak_mb(fn), 3)
+                results.append(row)
+                print(f"{name:>17} {n:>9,}: {seconds:8.3f}s  {row['us_per_filing']:9.2f} us/filing"
+                      + (f"  peak {row['peak_mb']:8.1f} MB" if memory else ""), flush=True)
+            available.clear()
+            gc.collect()
+    return {
+        "meta": {"python": platform.python_version(), "machine": platform.machine(),
+                 "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                 "cpus": os.cpu_count(), "seed": seed, "repeat": repeat},
+        "results": results,
+    }
+
+
+def regressions(current: dict, baseline: dict, max_slowdown: float = 0.25,
+                max_memory_growth: float = 0.25) -> list[str]:
+    """
+    Cases (matched on case and filings) that exceed the allowed relative growth.
+    baseline["thresholds"][case] = {"time": x, "memory": y} overrides the defaults.
+    """
+    base = {(r["case"], r["filings"]): r for r in baseline.get("results", [])}
+    limits = baseline.get("thresholds", {})
+    out = []
+    for r in current["results"]:
+        b = base.get((r["case"], r["filings"]))
+        if b is None:
+            continue
+        lim = limits.get(r["case"], {})
+        t_lim = lim.get("time", max_slowdown)
+        if "us_per_filing" in r and r["us_per_filing"] > b["us_per_filing"] * (1 + t_lim):
+            out.append(f"{r['case']}@{r['filings']}: {r['us_per_filing']:.2f} us/filing vs "
+                       f"{b['us_per_filing']:.2f} baseline (+{t_lim:.0%} allowed)")
+        elif "us_per_filing" not in r and r["seconds"] > b["seconds"] * (1 + t_lim):
+            out.append(f"{r['case']}@{r['filings']}: {r['seconds'] * 1e3:.1f} ms vs "
+                       f"{b['seconds'] * 1e3:.1f} baseline (+{t_lim:.0%} allowed)")
+        m_lim = lim.get("memory", max_memory_growth)
+        if "peak_mb" in r and "peak_mb" in b and r["peak_mb"] > b["peak_mb"] * (1 + m_lim):
+            out.append(f"{r['case']}@{r['filings']}: peak {r['peak_mb']:.1f} MB vs "
+                       f"{b['peak_mb']:.1f} baseline (+{m_lim:.0%} allowed)")
+    return out
+
+
+def slow_startups(current: dict, max_ms: float = 100.0) -> list[str]:
+    """CLI startup cases over the absolute budget (the interpreter floor is not checked)."""
+    return [f"{r['case']}@{r['filings']}: {r['seconds'] * 1e3:.1f} ms > {max_ms:g} ms"
+            for r in current["results"]
+            if r["case"] in STARTUP_CASES and r["case"] != "startup_python" and r["seconds"] * 1e3 > max_ms]
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--sizes", default="10k", help="comma separated, e.g. 10k,100k,1m")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--cases", default=None, help=f"comma separated subset of {','.join(CASES)}")
+    ap.add_argument("--no-memory", action="store_true", help="skip the tracemalloc run")
+    ap.add_argument("--max-in-memory", type=parse_size, default=200_000)
+    ap.add_argument("--workers", type=int, default=None, help="flatten_parallel pool size (default: all cores)")
+    ap.add_argument("-o", "--output", default=None, help="write results as JSON")
+    ap.add_argument("--baseline", default=None, help="results JSON of an earlier run to compare against")
+    ap.add_argument("--max-slowdown", type=float, default=0.25)
+    ap.add_argument("--max-memory-growth", type=float, default=0.25)
+    ap.add_argument("--max-startup-ms", type=float, default=100.0)
+    args = ap.parse_args(argv)
+
+    cases = args.cases.split(",") if args.cases else None
+    unknown = set(cases or ()) - set(CASES)
+    if unknown:
+        ap.error(f"unknown cases: {', '.join(sorted(unknown))}")
+    result = run([parse_size(s) for s in args.sizes.split(",")], args.seed, args.repeat, cases,
+                 memory=not args.no_memory, max_in_memory=args.max_in_memory, workers=args.workers)
+    if args.output:
+        pathlib.Path(args.output).write_text(json.dumps(result, indent=2))
+
+    failed = slow_startups(result, args.max_startup_ms)
+    if args.baseline:
+        failed += regressions(result, json.loads(pathlib.Path(args.baseline).read_text()),
+                              args.max_slowdown, args.max_memory_growth)
+    for line in failed:
+        print(f"REGRESSION {line}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,211 @@
+"""
+Synthetic sec-api Form 4 payloads, seeded from the shape of insider_trades.json.
+
+Owners, titles, relationships, security titles and footnote texts come from the sample;
+issuers, dates, amounts and table layout are drawn from a seeded RNG, so the same
+(n, seed) always gives the same payload. Varied per filing:
+- 1-3 reporting owners (more than one adds a 'reportingOwners' list)
+- 0-4 non-derivative legs with a realistic code mix and chained post_shares
+- derivative legs, non-derivative and derivative holdings, footnotes
+
+    python benchmarks/synth.py --filings 100000 --seed 1 -o synth_100k.json
+    python benchmarks/synth.py --filings 1000000 --jsonl -o synth_1m.jsonl
+"""
+# std lib
+import argparse
+import json
+import pathlib
+import random
+from datetime import date, timedelta
+from typing import Iterator
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+
+# code -> (weight, acquiredDisposedCode, has price)
+_CODES = {"S": (35, "D", True), "M": (15, "A", False), "F": (15, "D", True), "A": (12, "A", False),
+          "P": (10, "A", True), "G": (8, "D", False), "C": (5, "A", False)}
+_EXTRA_FOOTNOTES = [
+    "The shares were gifted to a charitable foundation.",
+    "The shares are held by a family trust of which the reporting person is trustee.",
+    "The price reported is a weighted average. These shares were sold in multiple transactions "
+    "at prices ranging from $101.15 to $102.40, inclusive.",
+]
+
+
+class _Shape:
+    """Pools drawn from the sample payload."""
+
+    def __init__(self, sample: list[dict]):
+        self.owners = [f["reportingOwner"] for f in sample]
+        self.signatures = [f.get("ownerSignatureName") for f in sample]
+        self.footnotes = [fn["text"] for f in sample for fn in f.get("footnotes") or []] + _EXTRA_FOOTNOTES
+        self.nd_titles = sorted({l["securityTitle"] for f in sample
+                                 for l in (f.get("nonDerivativeTable") or {}).get("transactions") or []})
+        self.d_titles = sorted({l["securityTitle"] for f in sample
+                                for l in (f.get("derivativeTable") or {}).get("transactions") or []})
+        self.schema = sample[0].get("schemaVersion")
+        self.codes = list(_CODES)
+        self.code_weights = [_CODES[c][0] for c in self.codes]
+
+
+def load_shape(path: str | pathlib.Path = ROOT / "insider_trades.json") -> _Shape:
+    with open(path, "r") as f:
+        return _Shape(json.load(f)["transactions"])
+
+
+def _issuers(rng: random.Random, n: int) -> list[dict]:
+    out = []
+    for k in range(n):
+        symbol = "".join(rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ") for _ in range(rng.randint(2, 4)))
+        out.append({"cik": str(100_000 + k), "name": f"{symbol.title()} Holdings Inc.",
+                    "tradingSymbol": symbol, "_price": round(rng.lognormvariate(3.5, 1.0), 2)})
+    return out
+
+
+def _owner(rng: random.Random, shape: _Shape, issuer_no: int, j: int) -> dict:
+    tmpl = rng.choice(shape.owners)
+    return {"cik": str(2_000_000 + issuer_no * 16 + j), "name": f"{tmpl['name']} {issuer_no}-{j}",
+            "address": dict(tmpl["address"]), "relationship": dict(tmpl["relationship"])}
+
+
+def _footnote_ids(rng: random.Random, notes: list[dict], shape: _Shape, p: float) -> list[str]:
+    if rng.random() >= p:
+        return []
+    fid = f"F{len(notes) + 1}"
+    notes.append({"id": fid, "text": rng.choice(shape.footnotes)})
+    return [fid]
+
+
+def _leg(rng, shape, notes, title, tdate, code, held, price, deriv=False) -> tuple[dict, int]:
+    _, ad, priced = _CODES[code]
+    shares = max(1, int(rng.lognormvariate(8, 1.6)))
+    if ad == "D":
+        shares = min(shares, max(held, 1))
+    held = max(0, held + (shares if ad == "A" else -shares))
+    amounts = {"shares": shares, "acquiredDisposedCode": ad}
+    if priced:
+        amounts["pricePerShare"] = round(price * rng.uniform(0.97, 1.03), 2)
+        amounts["pricePerShareFootnoteId"] = _footnote_ids(rng, notes, shape, 0.3)
+    leg = {
+        "securityTitle": title,
+        "securityTitleFootnoteId": _footnote_ids(rng, notes, shape, 0.2),
+        "transactionDate": tdate,
+        "coding": {"formType": "4", "code": code, "equitySwapInvolved": False},
+        "amounts": amounts,
+        "postTransactionAmounts": {"sharesOwnedFollowingTransaction": held},
+        "ownershipNature": {"directOrIndirectOwnership": "D" if rng.random() < 0.9 else "I"},
+    }
+    if deriv:
+        leg["underlyingSecurity"] = {"title": "Common Stock", "shares": shares}
+    return leg, held
+
+
+def _holding(rng, shape, notes, title, deriv=False) -> dict:
+    h = {
+        "securityTitle": title,
+        "postTransactionAmounts": {"sharesOwnedFollowingTransaction": max(1, int(rng.lognormvariate(9, 1.5)))},
+        "ownershipNature": {"directOrIndirectOwnership": "I", "natureOfOwnership": "By Trust"},
+    }
+    ids = _footnote_ids(rng, notes, shape, 0.5)
+    if ids:
+        h["ownershipNature"]["natureOfOwnershipFootnoteId"] = ids
+    if deriv:
+        h["underlyingSecurity"] = {"title": "Common Stock", "shares": h["postTransactionAmounts"]
+                                   ["sharesOwnedFollowingTransaction"]}
+    return h
+
+
+def iter_synthetic_filings(n: int, seed: int = 0, shape: _Shape | None = None,
+                           start: date = date(2024, 1, 2)) -> Iterator[dict]:
+    """n filings, deterministic for a given seed; filedAt increases over about a year."""
+    shape = shape or load_shape()
+    rng = random.Random(seed)
+    issuers = _issuers(rng, max(20, n // 200))
+    span = 365 * 24 * 3600
+    for i in range(n):
+        issuer_no = rng.randrange(len(issuers))
+        issuer = issuers[issuer_no]
+        k = rng.choices((1, 2, 3), weights=(85, 10, 5))[0]
+        owners = [_owner(rng, shape, issuer_no, j) for j in rng.sample(range(16), k)]   # distinct owners
+
+        offset = i * span // max(n, 1)
+        filed = start + timedelta(seconds=offset)
+        tdate = (filed - timedelta(days=rng.randint(0, 3))).isoformat()
+        notes: list[dict] = []
+        held = int(rng.lognormvariate(10, 1.5))
+
+        nd = []
+        for _ in range(rng.choices((0, 1, 2, 3, 4), weights=(8, 45, 25, 12, 10))[0]):
+            code = rng.choices(shape.codes, weights=shape.code_weights)[0]
+            leg, held = _leg(rng, shape, notes, rng.choice(shape.nd_titles), tdate, code, held, issuer["_price"])
+            nd.append(leg)
+        filing = {
+            "id": f"{rng.getrandbits(128):032x}",
+            "accessionNo": f"{int(owners[0]['cik']):010d}-{filed.year % 100:02d}-{i:06d}",
+            "filedAt": f"{filed.isoformat()}T{offset // 3600 % 24:02d}:{offset // 60 % 60:02d}:{offset % 60:02d}-04:00",
+            "schemaVersion": shape.schema,
+            "documentType": "4",
+            "periodOfReport": tdate,
+            "notSubjectToSection16": False,
+            "issuer": {c: issuer[c] for c in ("cik", "name", "tradingSymbol")},
+            "reportingOwner": owners[0],
+        }
+        if k > 1:
+            filing["reportingOwners"] = owners
+        if nd or rng.random() < 0.15:
+            filing["nonDerivativeTable"] = {"transactions": nd}
+            if rng.random() < 0.15:
+                filing["nonDerivativeTable"]["holdings"] = [
+                    _holding(rng, shape, notes, rng.choice(shape.nd_titles))]
+        if rng.random() < 0.3:
+            d_held = int(rng.lognormvariate(9, 1.2))
+            legs = []
+            for _ in range(rng.randint(1, 3)):
+                leg, d_held = _leg(rng, shape, notes, rng.choice(shape.d_titles), tdate,
+                                   rng.choice(("M", "A")), d_held, 0.0, deriv=True)
+                legs.append(leg)
+            filing["derivativeTable"] = {"transactions": legs}
+            if rng.random() < 0.05:
+                filing["derivativeTable"]["holdings"] = [
+                    _holding(rng, shape, notes, rng.choice(shape.d_titles), deriv=True)]
+        filing["footnotes"] = notes
+        filing["ownerSignatureName"] = rng.choice(shape.signatures)
+        filing["ownerSignatureNameDate"] = filed.isoformat()
+        yield filing
+
+
+def synthetic_payload(n: int, seed: int = 0) -> dict:
+    """sec-api response shape: {"total": ..., "transactions": [...]} (held in memory)."""
+    filings = list(iter_synthetic_filings(n, seed))
+    return {"total": {"value": n, "relation": "eq"}, "transactions": filings}
+
+
+def write_payload(path: str | pathlib.Path, n: int, seed: int = 0, jsonl: bool = False) -> pathlib.Path:
+    """Stream n filings to disk without holding them in memory."""
+    path = pathlib.Path(path)
+    with open(path, "w") as f:
+        if jsonl:
+            for filing in iter_synthetic_filings(n, seed):
+                f.write(json.dumps(filing) + "\n")
+            return path
+        f.write(f'{{"total": {{"value": {n}, "relation": "eq"}}, "transactions": [')
+        for i, filing in enumerate(iter_synthetic_filings(n, seed)):
+            f.write(("," if i else "") + json.dumps(filing))
+        f.write("]}")
+    return path
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--filings", type=int, default=10_000)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--jsonl", action="store_true", help="one filing per line")
+    ap.add_argument("-o", "--output", required=True)
+    args = ap.parse_args(argv)
+    path = write_payload(args.output, args.filings, args.seed, args.jsonl)
+    print(f"{args.filings:,} filings -> {path} ({path.stat().st_size / 1e6:.1f} MB)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
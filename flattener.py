@@ -1,11 +1,21 @@
 import math
+from functools import lru_cache
+
+import numpy as np
 import pandas as pd
 
+from footnotes import FOOTNOTE_COLS, leg_footnote_columns
+from roles import ROLE_MAP, role_score
+
 # -------- utilities --------
+@lru_cache(maxsize=None)
+def _split_path(path):
+    return tuple(path.split("."))
+
 def _get_path(obj, path, default=None):
     """Safe dotted-path getter (e.g., 'amounts.shares')."""
     cur = obj
-    for part in path.split("."):
+    for part in _split_path(path):
         if cur is None:
             return default
         if isinstance(cur, dict):
@@ -21,14 +31,164 @@ def _get_path(obj, path, default=None):
             return default
     return cur if cur is not None else default
 
+_first_fallbacks = 0   # _first hits that came from an alias path, not the first one
+
 def _first(obj, *paths, default=None):
     """Return the first non-None value among candidate paths."""
-    for p in paths:
+    global _first_fallbacks
+    if not paths:
+        return default
+    v = _get_path(obj, paths[0], None)
+    if v is not None:
+        return v
+    for p in paths[1:]:
         v = _get_path(obj, p, None)
         if v is not None:
+            _first_fallbacks += 1
             return v
     return default
 
+# -------- schema-variant resolver --------
+# Candidate alias paths per field, in _first priority order
+_FIELD_PATHS = {
+    "securityTitle":     ("securityTitle",),
+    "transactionDate":   ("transactionDate",),
+    "code":              ("coding.code", "transactionCode.code", "transactionCoding.transactionCode"),
+    "acq_disp":          ("amounts.acquiredDisposedCode", "transactionAcquiredDisposedCode"),
+    "shares":            ("amounts.shares",),
+    "pricePerShare":     ("amounts.pricePerShare",),
+    "post_shares":       ("postTransactionAmounts.sharesOwnedFollowingTransaction",
+                          "postTransactionAmounts.sharesOwnedFollowing"),
+    "directOrIndirect":  ("ownershipNature.directOrIndirectOwnership",),
+    "underlying_title":  ("underlyingSecurity.title",),
+    "underlying_shares": ("underlyingSecurity.shares",),
+    "holding_shares":    ("postTransactionAmounts.sharesOwnedFollowingTransaction",
+                          "postTransactionAmounts.sharesOwnedFollowing",
+                          "amountOwnedFollowingTransaction",
+                          "amountOwnedFollowing",
+                          "amountOwned",
+                          "sharesOwnedFollowingTransaction",
+                          "shares"),
+}
+
+def _get_parts(obj, parts):
+    """_get_path over a pre-split path."""
+    cur = obj
+    for part in parts:
+        if isinstance(cur, dict):
+            cur = cur.get(part)
+        elif isinstance(cur, list):
+            try:
+                cur = cur[int(part)]
+            except (ValueError, IndexError, TypeError):
+                return None
+        else:
+            return None
+    return cur
+
+def _compile_accessor(parts):
+    """Direct getter for one known path; nested dicts skip the generic walk."""
+    if len(parts) == 1:
+        (k,) = parts
+        def get(obj):
+            return obj.get(k) if isinstance(obj, dict) else _get_parts(obj, parts)
+    elif len(parts) == 2:
+        k1, k2 = parts
+        def get(obj):
+            sub = obj.get(k1) if isinstance(obj, dict) else None
+            return sub.get(k2) if isinstance(sub, dict) else _get_parts(obj, parts)
+    else:
+        def get(obj):
+            return _get_parts(obj, parts)
+    return get
+
+class SchemaResolver:
+    """
+    Learns which alias path each field uses per schemaVersion (e.g. 'X0508').
+    - The first leg of a schema probes the candidates like _first and caches the
+      winning path as a compiled accessor; later legs call it directly.
+    - If the accessor comes back empty (a document that does not match), the field
+      is re-probed and the cache follows whichever path hit.
+    - A field no candidate path finds (a holding has no transactionDate) is cached as
+      absent; later legs only re-probe it when one of its top-level keys shows up.
+    - An accessor learned for an alias still tries the higher-priority paths first, so
+      a document carrying several aliases resolves exactly like _first.
+    """
+    def __init__(self, field_paths=None):
+        self._paths = {f: tuple(_split_path(p) for p in ps)
+                       for f, ps in (field_paths or _FIELD_PATHS).items()}
+        self._heads = {f: frozenset(parts[0] for parts in ps) for f, ps in self._paths.items()}
+        self._accessors = {}   # schemaVersion -> {field: getter}
+        self._absent = {}      # schemaVersion -> {field: top-level keys that would end it}
+        self._learned = {}     # schemaVersion -> {field: path parts}
+        self.probes = 0        # lookups that walked the candidate paths
+        self.fallbacks = 0     # values served from an alias path, not the first one
+
+    def _alias_accessor(self, field, i):
+        paths = self._paths[field]
+        before = tuple(_compile_accessor(p) for p in paths[:i])
+        get = _compile_accessor(paths[i])
+        def counted(obj):
+            for j, acc in enumerate(before):
+                v = acc(obj)
+                if v is not None:
+                    if j:
+                        self.fallbacks += 1
+                    return v
+            v = get(obj)
+            if v is not None:
+                self.fallbacks += 1
+            return v
+        return counted
+
+    def _probe(self, obj, schema, field, default):
+        self.probes += 1
+        for i, parts in enumerate(self._paths[field]):
+            v = _get_parts(obj, parts)
+            if v is not None:
+                self._absent[schema].pop(field, None)
+                learned = self._learned.setdefault(schema, {})
+                if learned.get(field) != parts:
+                    learned[field] = parts
+                    self._accessors[schema][field] = (
+                        _compile_accessor(parts) if i == 0 else self._alias_accessor(field, i))
+                if i > 0:
+                    self.fallbacks += 1
+                return v
+        self._absent[schema][field] = self._heads[field]
+        return default
+
+    def bind(self, schema):
+        """Getter (obj, field, default=None) specialised to one schemaVersion."""
+        accessors = self._accessors.setdefault(schema, {})
+        absent = self._absent.setdefault(schema, {})
+        probe = self._probe
+        def get(obj, field, default=None):
+            acc = accessors.get(field)
+            if acc is not None:
+                v = acc(obj)
+                if v is not None:
+                    return v
+            heads = absent.get(field)
+            if heads is not None and isinstance(obj, dict) and heads.isdisjoint(obj):
+                return default
+            return probe(obj, schema, field, default)
+        return get
+
+    def get(self, obj, schema, field, default=None):
+        return self.bind(schema)(obj, field, default)
+
+    def variants(self):
+        """{schemaVersion: {field: dotted path}} learned so far."""
+        return {schema: {f: ".".join(parts) for f, parts in fields.items()}
+                for schema, fields in self._learned.items()}
+
+_RESOLVER = SchemaResolver()
+
+def fallback_hits() -> dict:
+    """Running totals of alias-path hits: _first (rows engine) and the resolver (columnar engine)."""
+    return {"first": _first_fallbacks, "resolver": _RESOLVER.fallbacks}
+
 def _to_num(x):
     try:
         return float(x)
@@ -53,24 +213,9 @@ def _stake_change(shares, post_shares):
     p = _to_num(post_shares) or 0.0
     return (s / (s + p)) if (s + p) > 0 else 0.0
 
-# Map title to coarse role score
-_ROLE_MAP = {
-    "chief executive officer": 1.00, "ceo": 1.00, "president": 0.90, "chair": 0.90,
-    "chief financial officer": 0.85, "cfo": 0.85, "chief operating officer": 0.80, "coo": 0.80,
-    "general counsel": 0.75, "principal accounting officer": 0.75,
-    "senior vice president": 0.70, "svp": 0.70, "vice president": 0.60, "vp": 0.60,
-    "director": 0.60, "ten percent owner": 0.70
-}
-def _role_score(rel):
-    rel = rel or {}
-    title = (rel.get("officerTitle") or "").lower()
-    for k, s in _ROLE_MAP.items():
-        if k in title:
-            return s
-    if rel.get("isOfficer"):         return 0.50
-    if rel.get("isTenPercentOwner"): return 0.70
-    if rel.get("isDirector"):        return 0.60
-    return 0.30
+# Role scoring lives in roles.py (shared with helpers.py)
+_ROLE_MAP   = ROLE_MAP
+_role_score = role_score
 
 def _owners_iter(filing):
     """
@@ -84,21 +229,127 @@ def _owners_iter(filing):
         ow = filing.get("reportingOwner") or {}
         yield ow, (ow.get("relationship") or {})
 
+def _filings_of(payload):
+    """Normalize the top-level payload into a list of filings."""
+    if isinstance(payload, dict):
+        return payload.get("transactions", [])
+    if isinstance(payload, list):
+        return payload
+    return []
+
+# Output column order and sort key shared by every engine
+_ORDER = [
+    "filedAt","periodOfReport","issuer_symbol","issuer_name","owner_name","owner_title",
+    "table","securityTitle","transactionDate","code","acq_disp","direction",
+    "shares","pricePerShare","value_usd","post_shares","stake_change",
+    "directOrIndirect","underlying_title","underlying_shares",
+    "accessionNo","owner_cik","issuer_cik","documentType","schemaVersion","id",
+    "isDirector","isOfficer","isTenPercentOwner","role_score",
+]
+_SORT_BY  = ["filedAt","issuer_symbol","owner_name","transactionDate"]
+_SORT_ASC = [False, True, True, True]
+
+# -------- compact schema --------
+# compact=True output dtypes; columns not listed keep their default dtype.
+# filedAt is parsed once to UTC; dates stay naive (they carry no time or offset).
+_CATEGORY = "category"
+COMPACT_DTYPES = {
+    "filedAt":           "datetime64[ns, UTC]",
+    "periodOfReport":    "datetime64[ns]",
+    "transactionDate":   "datetime64[ns]",
+    "issuer_symbol":     _CATEGORY,
+    "issuer_name":       _CATEGORY,
+    "owner_name":        _CATEGORY,
+    "owner_title":       _CATEGORY,
+    "table":             _CATEGORY,
+    "securityTitle":     _CATEGORY,
+    "code":              _CATEGORY,
+    "acq_disp":          _CATEGORY,
+    "direction":         _CATEGORY,
+    "directOrIndirect":  _CATEGORY,
+    "underlying_title":  _CATEGORY,
+    "documentType":      _CATEGORY,
+    "schemaVersion":     _CATEGORY,
+    "accessionNo":       _CATEGORY,    # repeated on every leg of a filing
+    "id":                _CATEGORY,
+    "owner_cik":         "Int64",
+    "issuer_cik":        "Int64",
+    "isDirector":        "boolean",
+    "isOfficer":         "boolean",
+    "isTenPercentOwner": "boolean",
+    "fn_10b5_1":         "boolean",
+    "fn_weighted_avg":   "boolean",
+    "fn_gift":           "boolean",
+    "fn_trust":          "boolean",
+}
+_BOOLS = {True: True, False: False, 1: True, 0: False, "true": True, "false": False,
+          "1": True, "0": False}
+
+def _per_unique(obj, parse):
+    """Apply parse to the distinct values only; filing-level columns repeat on every leg."""
+    codes, uniques = pd.factorize(obj)
+    parsed = parse(pd.Series([*uniques, None], dtype=object))
+    codes[codes < 0] = len(uniques)
+    return parsed.take(codes).reset_index(drop=True)
+
+def _compact_column(name, values):
+    """One column in its COMPACT_DTYPES dtype, built straight from a list or Series."""
+    dtype = COMPACT_DTYPES.get(name)
+    if dtype is None:
+        return values
+    obj = values if isinstance(values, pd.Series) and values.dtype == object \
+        else pd.Series(values, dtype=object)
+    if dtype == _CATEGORY:
+        return pd.Categorical(obj)
+    if dtype.startswith("datetime64"):
+        utc = "UTC" in dtype
+        def parse(v):
+            v = v if utc else v.str.slice(0, 10)
+            return pd.to_datetime(v, utc=utc, errors="coerce", format="ISO8601").astype(dtype)
+        return _per_unique(obj, parse)
+    if dtype == "boolean":
+        return obj.map(_BOOLS).astype("boolean")
+    return _per_unique(obj, lambda v: pd.to_numeric(v, errors="coerce").astype(dtype))
+
+def to_compact(df):
+    """Convert a default-schema flattened frame to COMPACT_DTYPES (row order unchanged)."""
+    if df.empty:
+        return df
+    out = df.copy()
+    for c in df.columns:
+        if c in COMPACT_DTYPES:
+            out[c] = _compact_column(c, df[c].astype(object))
+    return out
+
+def memory_report(df) -> pd.Series:
+    """Deep memory per column in MB, largest first, with a 'total' row."""
+    mb = df.memory_usage(index=False, deep=True) / 1e6
+    mb = mb.sort_values(ascending=False)
+    mb["total"] = mb.sum()
+    return mb
+
 # -------- main flattener --------
-def flatten_insider_payload(payload, debug: bool=False) -> pd.DataFrame:
+def flatten_insider_payload(payload, debug: bool=False, engine: str="rows",
+                            footnotes: bool=False, compact: bool=False) -> pd.DataFrame:
     """
     Robust flattener for sec-api insider ownership/trading API.
     - Accepts dict with 'transactions' or a list of filings.
     - Emits one row per transaction leg (non-derivative or derivative).
     - Also emits rows for 'holdings' (Form 3/5) with direction='HOLDING'.
+    - engine='columnar' builds per-column buffers and derives the computed
+      fields with NumPy; the result is identical to engine='rows'.
+    - footnotes=True (columnar engine) adds per-leg footnote feature columns
+      (see footnotes.FOOTNOTE_COLS), resolved through each leg's *FootnoteId fields.
+    - compact=True returns COMPACT_DTYPES (categoricals, UTC timestamps, nullable
+      booleans, Int64 CIKs); the columnar engine builds it directly.
     """
-    # Normalize top-level
-    if isinstance(payload, dict):
-        filings = payload.get("transactions", [])
-    elif isinstance(payload, list):
-        filings = payload
-    else:
-        filings = []
+    filings = _filings_of(payload)
+    if engine == "columnar":
+        return _flatten_columnar(filings, debug=debug, footnotes=footnotes, compact=compact)
+    if engine != "rows":
+        raise ValueError(f"unknown engine: {engine!r}")
+    if footnotes:
+        raise ValueError("footnote features require engine='columnar'")
 
     rows = []
     if debug:
@@ -248,16 +499,359 @@ def flatten_insider_payload(payload, debug: bool=False) -> pd.DataFrame:
                            pd.to_numeric(df["pricePerShare"], errors="coerce").fillna(0))
     df["stake_change"]  = [_stake_change(s, p) for s, p in zip(df["shares"], df["post_shares"])]
 
-    # Order for readability
-    order = [
-        "filedAt","periodOfReport","issuer_symbol","issuer_name","owner_name","owner_title",
-        "table","securityTitle","transactionDate","code","acq_disp","direction",
-        "shares","pricePerShare","value_usd","post_shares","stake_change",
-        "directOrIndirect","underlying_title","underlying_shares",
-        "accessionNo","owner_cik","issuer_cik","documentType","schemaVersion","id",
-        "isDirector","isOfficer","isTenPercentOwner","role_score",
-    ]
+    df = _order_and_sort(df)
+    if compact:
+        df = to_compact(df)
+    if debug:
+        print(f"[debug] memory: {memory_report(df)['total']:.1f} MB")
+    return df
+
+def _order_and_sort(df):
+    """Apply the readable column order and the canonical row sort."""
+    order = _ORDER
     cols = [c for c in order if c in df.columns] + [c for c in df.columns if c not in order]
-    df = df[cols].sort_values(["filedAt","issuer_symbol","owner_name","transactionDate"],
-                               ascending=[False, True, True, True]).reset_index(drop=True)
-    return df
\ No newline at end of file
+    df = df[cols].sort_values(_SORT_BY, ascending=_SORT_ASC).reset_index(drop=True)
+    return df
+
+# -------- columnar engine --------
+_FILING_COLS = ("id","accessionNo","schemaVersion","documentType","filedAt","periodOfReport",
+                "issuer_cik","issuer_name","issuer_symbol")
+_OWNER_COLS  = ("owner_cik","owner_name","owner_title","isDirector","isOfficer",
+                "isTenPercentOwner","role_score")
+_LEG_COLS    = ("table","securityTitle","transactionDate","code","acq_disp","shares",
+                "pricePerShare","post_shares","directOrIndirect","underlying_title",
+                "underlying_shares")
+
+def _new_buffers(footnotes: bool=False):
+    """One list per raw column; derived columns are added in _frame_from_buffers."""
+    extra = FOOTNOTE_COLS if footnotes else ()
+    return {c: [] for c in (*_FILING_COLS, *_OWNER_COLS, *_LEG_COLS, *extra)}
+
+def _filing_legs(filing, resolver=None):
+    """
+    Extract the leg columns of one filing as {column: [values]}.
+    Legs do not depend on the reporting owner, so this runs once per filing.
+    Alias paths are resolved through the per-schemaVersion SchemaResolver.
+    """
+    get = (resolver or _RESOLVER).bind(filing.get("schemaVersion"))
+    legs = {c: [] for c in _LEG_COLS}
+    table, title, tdate, code_, ad_, sh_, px_, post_, doi, u_t, u_s = (legs[c] for c in _LEG_COLS)
+
+    nd = filing.get("nonDerivativeTable") or {}
+    dt = filing.get("derivativeTable") or {}
+    for name, txns in (("nonDeriv", nd.get("transactions") or []),
+                       ("deriv",    dt.get("transactions") or [])):
+        is_deriv = name == "deriv"
+        for leg in txns:
+            table.append(name)
+            title.append(get(leg, "securityTitle"))
+            tdate.append(get(leg, "transactionDate"))
+            code_.append(get(leg, "code"))
+            ad_.append(get(leg, "acq_disp"))
+            sh_.append(_to_num(get(leg, "shares")))
+            px_.append(_to_num(get(leg, "pricePerShare")))
+            post_.append(_to_num(get(leg, "post_shares")))
+            doi.append(get(leg, "directOrIndirect"))
+            u_t.append(get(leg, "underlying_title") if is_deriv else None)
+            u_s.append(_to_num(get(leg, "underlying_shares")) if is_deriv else None)
+
+    period = filing.get("periodOfReport")
+    for name, holds in (("nonDeriv_hold", nd.get("holdings") or []),
+                        ("deriv_hold",    dt.get("holdings") or [])):
+        is_deriv = name == "deriv_hold"
+        for h in holds:
+            shares = _to_num(get(h, "holding_shares"))
+            table.append(name)
+            title.append(get(h, "securityTitle"))
+            tdate.append(get(h, "transactionDate", default=period))
+            code_.append(None)
+            ad_.append(None)
+            sh_.append(shares)
+            px_.append(math.nan)
+            post_.append(shares)
+            doi.append(get(h, "directOrIndirect"))
+            u_t.append(get(h, "underlying_title") if is_deriv else None)
+            u_s.append(_to_num(get(h, "underlying_shares")) if is_deriv else None)
+    return legs
+
+def _filing_values(filing):
+    """The _FILING_COLS values of one filing."""
+    issuer = filing.get("issuer") or {}
+    return (filing.get("id"), filing.get("accessionNo"), filing.get("schemaVersion"),
+            filing.get("documentType"), filing.get("filedAt"), filing.get("periodOfReport"),
+            issuer.get("cik"), issuer.get("name"), issuer.get("tradingSymbol"))
+
+def _owner_values(owner, rel):
+    """The _OWNER_COLS values of one reporting owner."""
+    return (owner.get("cik"), owner.get("name"), rel.get("officerTitle"),
+            rel.get("isDirector"), rel.get("isOfficer"), rel.get("isTenPercentOwner"),
+            _role_score(rel))
+
+def _append_filing(buf, filing):
+    """Append every (owner x leg) row of one filing to the column buffers."""
+    legs = _filing_legs(filing)
+    n = len(legs["table"])
+    if n == 0:
+        return 0
+    if FOOTNOTE_COLS[0] in buf:
+        legs.update(leg_footnote_columns(filing))
+    filing_vals = _filing_values(filing)
+    added = 0
+    for owner, rel in _owners_iter(filing):
+        owner_vals = _owner_values(owner, rel)
+        for c, v in zip(_FILING_COLS, filing_vals):
+            buf[c].extend([v] * n)
+        for c, v in zip(_OWNER_COLS, owner_vals):
+            buf[c].extend([v] * n)
+        for c, vals in legs.items():
+            buf[c].extend(vals)
+        added += n
+    return added
+
+def _direction_vec(code, acq_disp, table):
+    """Vectorized _direction over whole columns."""
+    def _upper(values):
+        arr = np.asarray(values, dtype=object)
+        return np.char.upper(np.where(pd.isna(arr), "", arr).astype(str))
+    c, a = _upper(code), _upper(acq_disp)
+    t = np.asarray(table, dtype=object)
+    is_holding = (t == "nonDeriv_hold") | (t == "deriv_hold")
+    fallback = np.where(c != "", c, np.where(a != "", a, t))
+    out = np.select(
+        [is_holding, (c == "P") | (a == "A"), (c == "S") | (a == "D"), c == "F", c == "M"],
+        ["HOLDING", "BUYish", "SELLish", "TaxWithhold", "Option/RSU"],
+        default=fallback.astype(object),
+    )
+    return out.astype(object)
+
+def _stake_change_vec(shares, post_shares):
+    """Vectorized _stake_change: NaN in either input yields 0.0, like the scalar version."""
+    total = shares + post_shares
+    ok = total > 0   # False for NaN
+    out = np.zeros(len(total))
+    np.divide(shares, total, out=out, where=ok)
+    return out
+
+def _frame_from_buffers(buf, compact: bool=False):
+    """Turn filled column buffers into the final ordered, sorted DataFrame."""
+    if not buf["table"]:
+        return pd.DataFrame()
+    shares = np.asarray(buf["shares"], dtype=float)
+    price  = np.asarray(buf["pricePerShare"], dtype=float)
+    post   = np.asarray(buf["post_shares"], dtype=float)
+    direction = _direction_vec(buf["code"], buf["acq_disp"], buf["table"])
+    if compact:
+        return _compact_frame_from_buffers(buf, direction, shares, price, post)
+
+    df = pd.DataFrame(buf)
+    df["direction"]    = direction
+    df["value_usd"]    = np.where(np.isnan(shares), 0.0, shares) * np.where(np.isnan(price), 0.0, price)
+    df["stake_change"] = _stake_change_vec(shares, post)
+    return _order_and_sort(df)
+
+def _compact_frame_from_buffers(buf, direction, shares, price, post):
+    """
+    compact=True: the row order comes from the raw sort keys (so it matches the default
+    schema exactly), then every column is built once, straight into its compact dtype.
+    """
+    keys = pd.DataFrame({c: buf[c] for c in _SORT_BY})
+    perm = keys.sort_values(_SORT_BY, ascending=_SORT_ASC).index.to_numpy()
+    cols = {c: _compact_column(c, vals) for c, vals in buf.items()}
+    cols["direction"]    = _compact_column("direction", direction)
+    cols["value_usd"]    = np.where(np.isnan(shares), 0.0, shares) * np.where(np.isnan(price), 0.0, price)
+    cols["stake_change"] = _stake_change_vec(shares, post)
+    df = pd.DataFrame(cols)
+    order = [c for c in _ORDER if c in df.columns] + [c for c in df.columns if c not in _ORDER]
+    return df[order].take(perm).reset_index(drop=True)
+
+def _flatten_columnar(filings, debug: bool=False, footnotes: bool=False,
+                      compact: bool=False) -> pd.DataFrame:
+    buf = _new_buffers(footnotes)
+    if debug:
+        print(f"[debug] filings: {len(filings)}")
+    for filing in filings:
+        _append_filing(buf, filing)
+    df = _frame_from_buffers(buf, compact=compact)
+    if df.empty and debug:
+        print("[debug] No rows; check input shape/keys.")
+    elif debug:
+        print(f"[debug] memory: {memory_report(df)['total']:.1f} MB")
+    return df
+
+# -------- chunked flattener --------
+def iter_flatten_insider_payload(payload, batch_size: int=100_000, debug: bool=False,
+                                 footnotes: bool=False, compact: bool=False):
+    """
+    Chunked flatten_insider_payload for inputs too large to hold at once.
+    - Accepts the same payloads, or any iterable of filing dicts
+      (e.g. insider_trading.stream.iter_filings).
+    - Yields DataFrames of about batch_size rows in the usual column schema; a filing
+      is never split across batches, and each batch is sorted on its own.
+    - Only one batch of column buffers is alive at a time, so peak memory is bounded
+      by batch_size rather than by the input size.
+    - footnotes=True adds the per-leg footnote feature columns.
+    - compact=True yields COMPACT_DTYPES batches (categories differ per batch).
+    """
+    if isinstance(payload, dict):
+        filings = payload.get("transactions", [])
+    elif payload is None:
+        filings = []
+    else:
+        filings = payload
+
+    buf, pending, batches = _new_buffers(footnotes), 0, 0
+    for filing in filings:
+        pending += _append_filing(buf, filing)
+        if pending >= batch_size:
+            yield _frame_from_buffers(buf, compact=compact)
+            buf, pending, batches = _new_buffers(footnotes), 0, batches + 1
+    if pending:
+        yield _frame_from_buffers(buf, compact=compact)
+        batches += 1
+    if debug:
+        print(f"[debug] batches: {batches}")
+
+# -------- normalized output --------
+_LINK_COLS = _OWNER_COLS[2:]          # relationship fields: per (filing, owner)
+
+def _sort_ranks(values, ascending=True):
+    """
+    Integer sort keys equivalent to sorting values with sort_values(na_position='last'):
+    equal values share a rank and missing values rank after everything else.
+    """
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object), sort=True)
+    k = len(uniques)
+    ranks = codes if ascending else np.where(codes < 0, codes, k - 1 - codes)
+    return np.where(ranks < 0, k, ranks).astype(np.int32)
+
+def _table(cols, compact, index):
+    df = pd.DataFrame({c: _compact_column(c, v) if compact else v for c, v in cols.items()})
+    df.index.name = index
+    return df
+
+class NormalizedLegs:
+    """
+    flatten_insider_payload(engine="columnar") split into four tables keyed by
+    integer surrogate keys (the RangeIndex of each table):
+        filings        filing_key: _FILING_COLS, one row per filing with legs
+        owners         owner_key: owner_cik, owner_name, one row per distinct owner
+        filing_owners  filing_key, owner_key and the relationship fields
+                       (owner_title, flags, role_score), one row per (filing, owner)
+        legs           leg_key: filing_key, the leg columns, direction, value_usd,
+                       stake_change (and footnote columns), one row per leg
+    Filing and owner fields are stored once instead of on every leg, and legs once
+    instead of once per joint filer. wide() rebuilds the flattened frame on demand:
+
+        norm = normalize_insider_payload(payload)
+        norm.legs.groupby("filing_key")["value_usd"].sum()
+        df = norm.wide()                                   # == flatten_insider_payload(...)
+        df = norm.wide(["filedAt", "owner_name", "shares"])  # only what is asked for
+    """
+    def __init__(self, filings, owners, filing_owners, legs, sort_keys):
+        self.filings = filings
+        self.owners = owners
+        self.filing_owners = filing_owners
+        self.legs = legs
+        self._sort_keys = sort_keys     # _SORT_BY ranks, on filings, filings, owners and legs
+
+    def tables(self) -> dict:
+        return {"filings": self.filings, "owners": self.owners,
+                "filing_owners": self.filing_owners, "legs": self.legs}
+
+    def columns(self) -> list:
+        """Columns of the wide frame, in its order."""
+        present = {*self.filings.columns, *self.owners.columns, *_LINK_COLS, *self.legs.columns}
+        present.discard("filing_key")
+        return [c for c in _ORDER if c in present] + [c for c in FOOTNOTE_COLS if c in present]
+
+    def _rows(self):
+        """(link, leg) positions of every wide row, in flatten_insider_payload's row order."""
+        leg_filing = self.legs["filing_key"].to_numpy()
+        link_filing = self.filing_owners["filing_key"].to_numpy()
+        n = np.bincount(leg_filing, minlength=len(self.filings))
+        start = np.cumsum(n) - n
+        counts = n[link_filing]
+        link = np.repeat(np.arange(len(link_filing)), counts)
+        leg = np.repeat(start[link_filing] - (np.cumsum(counts) - counts), counts) + np.arange(counts.sum())
+        filed, symbol, owner, tdate = self._sort_keys
+        f, o = leg_filing[leg], self.filing_owners["owner_key"].to_numpy()[link]
+        perm = np.lexsort((tdate[leg], owner[o], symbol[f], filed[f]))   # stable, like sort_values
+        return link[perm], leg[perm]
+
+    def __len__(self) -> int:
+        n = np.bincount(self.legs["filing_key"].to_numpy(), minlength=len(self.filings))
+        return int(n[self.filing_owners["filing_key"].to_numpy()].sum())
+
+    def wide(self, columns=None) -> pd.DataFrame:
+        """
+        The flattened (owner x leg) frame, or just the given columns of it (which may
+        include filing_key / owner_key to join back onto the tables).
+        """
+        if len(self.legs) == 0:
+            return pd.DataFrame()
+        columns = self.columns() if columns is None else list(columns)
+        link, leg = self._rows()
+        idx = {"legs": leg, "filing_owners": link,
+               "filings": self.legs["filing_key"].to_numpy()[leg],
+               "owners": self.filing_owners["owner_key"].to_numpy()[link]}
+        tables = self.tables()
+        out = {}
+        for c in columns:
+            name = next((n for n in idx if c in tables[n].columns), None)
+            if name is None:
+                raise KeyError(c)
+            out[c] = tables[name][c].array.take(idx[name])
+        return pd.DataFrame(out)
+
+def normalize_insider_payload(payload, footnotes: bool=False, compact: bool=False) -> NormalizedLegs:
+    """
+    Flatten into NormalizedLegs instead of one wide frame.
+    - Same payloads as flatten_insider_payload; filings without legs are dropped,
+      as they contribute no rows there either.
+    - Owners are deduplicated across filings on (owner_cik, owner_name).
+    - footnotes=True adds the footnote feature columns to legs; compact=True stores
+      every table in COMPACT_DTYPES, so wide() returns the compact schema.
+    """
+    fbuf = {c: [] for c in _FILING_COLS}
+    obuf = {"owner_cik": [], "owner_name": []}
+    lbuf = {c: [] for c in ("filing_key", "owner_key", *_LINK_COLS)}
+    gbuf = {c: [] for c in ("filing_key", *_LEG_COLS, *(FOOTNOTE_COLS if footnotes else ()))}
+    owner_keys = {}
+    for filing in _filings_of(payload):
+        legs = _filing_legs(filing)
+        n = len(legs["table"])
+        if n == 0:
+            continue
+        if footnotes:
+            legs.update(leg_footnote_columns(filing))
+        key = len(fbuf["id"])
+        for c, v in zip(_FILING_COLS, _filing_values(filing)):
+            fbuf[c].append(v)
+        for owner, rel in _owners_iter(filing):
+            cik, name, *link = _owner_values(owner, rel)
+            okey = owner_keys.setdefault((cik, name), len(owner_keys))
+            if okey == len(obuf["owner_cik"]):
+                obuf["owner_cik"].append(cik)
+                obuf["owner_name"].append(name)
+            lbuf["filing_key"].append(key)
+            lbuf["owner_key"].append(okey)
+            for c, v in zip(_LINK_COLS, link):
+                lbuf[c].append(v)
+        gbuf["filing_key"].extend([key] * n)
+        for c, vals in legs.items():
+            gbuf[c].extend(vals)
+
+    shares = np.asarray(gbuf["shares"], dtype=float)
+    price  = np.asarray(gbuf["pricePerShare"], dtype=float)
+    post   = np.asarray(gbuf["post_shares"], dtype=float)
+    gbuf["direction"]    = _direction_vec(gbuf["code"], gbuf["acq_disp"], gbuf["table"])
+    gbuf["value_usd"]    = np.where(np.isnan(shares), 0.0, shares) * np.where(np.isnan(price), 0.0, price)
+    gbuf["stake_change"] = _stake_change_vec(shares, post)
+    for b in (lbuf, gbuf):
+        b["filing_key"] = np.asarray(b["filing_key"], dtype=np.int32)
+    lbuf["owner_key"] = np.asarray(lbuf["owner_key"], dtype=np.int32)
+
+    sort_keys = tuple(_sort_ranks(vals, asc) for vals, asc in zip(
+        (fbuf["filedAt"], fbuf["issuer_symbol"], obuf["owner_name"], gbuf["transactionDate"]), _SORT_ASC))
+    return NormalizedLegs(_table(fbuf, compact, "filing_key"), _table(obuf, compact, "owner_key"),
+                          _table(lbuf, compact, None), _table(gbuf, compact, "leg_key"), sort_keys)
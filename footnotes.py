@@ -0,0 +1,107 @@
+"""
+Footnote features linked to individual transaction legs.
+
+Each distinct footnote text is lower-cased and scanned once by a single combined
+regex (results are cached by text, so repeated boilerplate costs a dict lookup).
+Legs pick up the features of the footnotes they reference through their
+*FootnoteId fields (securityTitleFootnoteId, amounts.pricePerShareFootnoteId, ...).
+"""
+import math
+import re
+from functools import lru_cache
+from typing import NamedTuple
+
+# Feature name -> pattern over lower-cased footnote text
+FOOTNOTE_PATTERNS = {
+    "plan_10b5_1":  r"10b5\s*[-\u2013]\s*1",
+    "weighted_avg": r"weighted[- ]average",
+    "gift":         r"\bgift(?:s|ed)?\b",
+    "trust":        r"\btrust(?:s|ee|ees)?\b",
+    "price_range":  r"prices?\s+rang(?:ing|ed)\s+from\s+\$?(?P<lo>\d[\d,]*(?:\.\d+)?)\s+to\s+\$?(?P<hi>\d[\d,]*(?:\.\d+)?)",
+}
+
+# Columns added to the flattened frame
+FOOTNOTE_COLS = ("fn_10b5_1", "fn_weighted_avg", "fn_gift", "fn_trust",
+                 "fn_price_low", "fn_price_high")
+
+_COMBINED = re.compile("|".join(f"(?P<{name}>{pat})" for name, pat in FOOTNOTE_PATTERNS.items()))
+
+
+class FootnoteFeatures(NamedTuple):
+    plan_10b5_1:  bool = False
+    weighted_avg: bool = False
+    gift:         bool = False
+    trust:        bool = False
+    price_low:    float = math.nan
+    price_high:   float = math.nan
+
+
+_NONE = FootnoteFeatures()
+
+def _price(s):
+    return float(s.replace(",", ""))
+
+@lru_cache(maxsize=8192)
+def footnote_features(text) -> FootnoteFeatures:
+    """All features of one footnote text in a single pass (memoized by text)."""
+    if not text:
+        return _NONE
+    found = set()
+    lo, hi = math.nan, math.nan
+    for m in _COMBINED.finditer(text.lower()):
+        found.add(m.lastgroup)   # outermost group, i.e. the feature name
+        if m.group("lo") is not None:
+            a, b = _price(m.group("lo")), _price(m.group("hi"))
+            lo = a if math.isnan(lo) else min(lo, a)
+            hi = b if math.isnan(hi) else max(hi, b)
+    return FootnoteFeatures("plan_10b5_1" in found, "weighted_avg" in found,
+                            "gift" in found, "trust" in found, lo, hi)
+
+def filing_footnote_features(filing) -> dict:
+    """{footnote id: FootnoteFeatures} for one filing."""
+    out = {}
+    for fn in filing.get("footnotes") or []:
+        if isinstance(fn, dict) and fn.get("id") is not None:
+            out[fn["id"]] = footnote_features(fn.get("text"))
+    return out
+
+def _footnote_ids(obj, depth: int=0):
+    """Yield every footnote id referenced by a leg (keys ending in 'FootnoteId')."""
+    if not isinstance(obj, dict) or depth > 2:
+        return
+    for k, v in obj.items():
+        if k.endswith("FootnoteId"):
+            if isinstance(v, list):
+                yield from v
+            elif v is not None:
+                yield v
+        elif isinstance(v, dict):
+            yield from _footnote_ids(v, depth + 1)
+
+def merge_features(features) -> FootnoteFeatures:
+    """OR the flags and widen the price range across several footnotes."""
+    flags = [False, False, False, False]
+    lo, hi = math.nan, math.nan
+    for f in features:
+        flags = [a or b for a, b in zip(flags, f[:4])]
+        if not math.isnan(f.price_low):
+            lo = f.price_low if math.isnan(lo) else min(lo, f.price_low)
+            hi = f.price_high if math.isnan(hi) else max(hi, f.price_high)
+    return FootnoteFeatures(*flags, lo, hi)
+
+def leg_footnote_columns(filing) -> dict:
+    """
+    Footnote columns for every leg of a filing, in flattener leg order
+    (non-derivative transactions, derivative transactions, then the holdings).
+    """
+    by_id = filing_footnote_features(filing)
+    cols = {c: [] for c in FOOTNOTE_COLS}
+    nd = filing.get("nonDerivativeTable") or {}
+    dt = filing.get("derivativeTable") or {}
+    for legs in (nd.get("transactions"), dt.get("transactions"),
+                 nd.get("holdings"), dt.get("holdings")):
+        for leg in legs or []:
+            f = merge_features(by_id[i] for i in _footnote_ids(leg) if i in by_id) if by_id else _NONE
+            for c, v in zip(FOOTNOTE_COLS, f):
+                cols[c].append(v)
+    return cols
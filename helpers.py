@@ -1,4 +1,12 @@
+# packages
 import pandas as pd
+
+# local lib
+# Filing-wide checks; footnotes.leg_footnote_columns links features to legs instead
+from footnotes import footnote_features
+# Role scoring is shared with flattener.py (one table, one cached matcher)
+from roles import ROLE_MAP, role_score
+
 """
 
 This is trash code I reference 
@@ -9,35 +17,12 @@ This is trash code I reference
 def has_10b5_1(footnotes):
     if not isinstance(footnotes, list):
         return False
-    return any("10b5-1" in (fn.get("text") or "").lower() for fn in footnotes)
+    return any(footnote_features(fn.get("text")).plan_10b5_1 for fn in footnotes)
 
 def has_weighted_avg(footnotes):
     if not isinstance(footnotes, list):
         return False
-    return any("weighted average" in (fn.get("text") or "").lower() for fn in footnotes)
-
-ROLE_MAP = {
-    "chief executive officer": 1.00, "ceo": 1.00, "president": 0.90, "chair": 0.90,
-    "chief financial officer": 0.85, "cfo": 0.85, "chief operating officer": 0.80, "coo": 0.80,
-    "general counsel": 0.75, "principal accounting officer": 0.75,
-    "senior vice president": 0.70, "svp": 0.70, "vice president": 0.60, "vp": 0.60,
-    "director": 0.60, "ten percent owner": 0.90
-}
-
-def role_score(relationship: dict) -> float:
-    rel = relationship or {}
-    title = (rel.get('officerTitle') or '').lower()
-
-    for key, score in ROLE_MAP.items():
-        if key in title: 
-            return score 
-    if rel.get('isOfficer'):
-        return 0.5
-    if rel.get('isTenPercentOwner'):
-        return 0.90
-    if rel.get('isDirector'):
-        return 0.6
-    return 0.3
+    return any(footnote_features(fn.get("text")).weighted_avg for fn in footnotes)
 
 #Normalize transaction semantics into buy/sell ish buckets 
 def direction_from(code, acq_disp):
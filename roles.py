@@ -0,0 +1,107 @@
+"""
+Coarse role scoring shared by flattener.py and helpers.py.
+
+Title keys are checked in ROLE_MAP order and the first one contained in the
+lower-cased officerTitle wins; with no match, the relationship flags decide.
+"""
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# Map title to coarse role score (priority = dict order)
+ROLE_MAP = {
+    "chief executive officer": 1.00, "ceo": 1.00, "president": 0.90, "chair": 0.90,
+    "chief financial officer": 0.85, "cfo": 0.85, "chief operating officer": 0.80, "coo": 0.80,
+    "general counsel": 0.75, "principal accounting officer": 0.75,
+    "senior vice president": 0.70, "svp": 0.70, "vice president": 0.60, "vp": 0.60,
+    "director": 0.60, "ten percent owner": 0.70
+}
+
+# Fallbacks when no title key matches, checked in this order
+FLAG_SCORES = (("isOfficer", 0.50), ("isTenPercentOwner", 0.70), ("isDirector", 0.60))
+DEFAULT_SCORE = 0.30
+
+
+class RoleScorer:
+    """
+    Compiled, memoized role scorer.
+    - The title table is compiled once into a single regex; a zero-width lookahead
+      finds every key occurrence in one pass and the lowest-priority-index hit wins,
+      which is exactly the linear substring scan.
+    - Scores are cached per lower-cased title (only a few hundred distinct titles
+      appear across millions of legs).
+    """
+    def __init__(self, role_map=None, flag_scores=FLAG_SCORES, default=DEFAULT_SCORE,
+                 cache_size: int=4096):
+        self.role_map = dict(ROLE_MAP if role_map is None else role_map)
+        self.flag_scores = tuple(flag_scores)
+        self.default = default
+        self._keys = list(self.role_map)
+        self._scores = [self.role_map[k] for k in self._keys]
+        self._rank = {k: i for i, k in enumerate(self._keys)}
+        # Alternatives in priority order: at a given position the best key wins
+        alternation = "|".join(re.escape(k) for k in self._keys)
+        self._matcher = re.compile(f"(?=({alternation}))") if self._keys else None
+        self.title_score = lru_cache(maxsize=cache_size)(self._title_score)
+
+    def _title_score(self, title: str):
+        """Score for a lower-cased title, or None when no key matches."""
+        if self._matcher is None:
+            return None
+        hits = self._matcher.findall(title)
+        if not hits:
+            return None
+        return self._scores[min(self._rank[h] for h in hits)]
+
+    def score(self, relationship) -> float:
+        """Score one relationship dict (officerTitle + flags)."""
+        rel = relationship or {}
+        s = self.title_score((rel.get("officerTitle") or "").lower())
+        if s is not None:
+            return s
+        for flag, flag_score in self.flag_scores:
+            if rel.get(flag):
+                return flag_score
+        return self.default
+
+    def score_many(self, titles, isOfficer=None, isDirector=None, isTenPercentOwner=None) -> np.ndarray:
+        """
+        Vectorized scores for whole columns: titles are factorized so each distinct
+        title is scored once, then the flag fallbacks are applied with np.select.
+        """
+        titles = pd.Series(titles, dtype=object).reset_index(drop=True)
+        n = len(titles)
+        codes, uniques = pd.factorize(titles.fillna("").astype(str).str.lower())
+        per_title = np.array([np.nan if (s := self.title_score(t)) is None else s for t in uniques],
+                             dtype=float)
+        out = per_title[codes] if n else np.empty(0)
+
+        flags = {"isOfficer": isOfficer, "isDirector": isDirector,
+                 "isTenPercentOwner": isTenPercentOwner}
+        conds, choices = [], []
+        for flag, flag_score in self.flag_scores:
+            col = flags.get(flag)
+            if col is None:
+                continue
+            col = pd.Series(col, dtype=object).reset_index(drop=True)
+            conds.append(col.fillna(False).astype(bool).to_numpy())
+            choices.append(flag_score)
+        fallback = np.select(conds, choices, default=self.default) if conds else np.full(n, self.default)
+        return np.where(np.isnan(out), fallback, out)
+
+    def score_frame(self, df: pd.DataFrame, title_col: str="owner_title") -> np.ndarray:
+        """score_many over a flattened frame's title and relationship flag columns."""
+        return self.score_many(df[title_col],
+                               **{c: df[c] for c in ("isOfficer", "isDirector", "isTenPercentOwner")
+                                  if c in df.columns})
+
+
+_SCORER = RoleScorer()
+
+def role_score(relationship) -> float:
+    return _SCORER.score(relationship)
+
+def role_scores(titles, isOfficer=None, isDirector=None, isTenPercentOwner=None) -> np.ndarray:
+    return _SCORER.score_many(titles, isOfficer, isDirector, isTenPercentOwner)
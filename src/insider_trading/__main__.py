@@ -1,4 +1,4 @@
-from .main import main
+from .cli import main
 
 if __name__ == "__main__":
-    raise SystemExit(main())
\ No newline at end of file
+    raise SystemExit(main())
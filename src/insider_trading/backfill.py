@@ -0,0 +1,201 @@
+"""
+Parallel backfill flattening.
+
+Filings are sharded across a process pool. Each worker runs the columnar flattener on
+its shard (so the shard comes back already sorted) and writes the result as an
+uncompressed Arrow IPC file in shared memory (/dev/shm when available). The parent
+memory-maps the shards instead of unpickling DataFrames, turns the sort columns into
+one integer key per row, and k-way merges the sorted shards with a tournament of
+vectorized stable merges. Ties keep shard order, so the result is identical to
+flatten_insider_payload(engine="columnar") over the same filings.
+
+JSON Lines inputs are split into byte ranges that workers read themselves; EDGAR XML
+files, directories and archives are split into lists of documents that workers parse
+themselves (see edgar.shards); other inputs are parsed in the parent and shipped to
+workers in shards.
+"""
+# std lib
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator
+
+# packages
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+# local lib
+from insider_trading import edgar
+
+SHM_DIR = "/dev/shm"
+
+# === Workers ===
+def _read_lines(path: str, start: int, end: int) -> list[dict]:
+    """Filings of the JSONL lines that start in [start, end)."""
+    out = []
+    with open(path, "rb") as f:
+        if start:
+            f.seek(start - 1)
+            f.readline()            # finish the line that straddles start
+        while f.tell() < end:
+            line = f.readline()
+            if not line:
+                break
+            if line.strip():
+                out.append(json.loads(line))
+    return out
+
+def _flatten_shard(job: tuple) -> tuple[str, int]:
+    """Flatten one shard to an Arrow IPC file; returns (path, rows)."""
+    from flattener import flatten_insider_payload
+
+    shard_id, filings, outdir, footnotes = job
+    if isinstance(filings, edgar.XmlShard):
+        filings = list(edgar.read_shard(filings))
+    elif isinstance(filings, tuple):
+        filings = _read_lines(*filings)
+    df = flatten_insider_payload(filings, engine="columnar", footnotes=footnotes)
+    path = Path(outdir) / f"shard-{shard_id:06d}.arrow"
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    with pa.OSFile(str(path), "wb") as sink, ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    return str(path), len(df)
+# === End Workers ===
+
+# === Sharding ===
+def _line_ranges(path: Path, parts: int) -> list[tuple[str, int, int]]:
+    size = path.stat().st_size
+    step = max(1, -(-size // max(1, parts)))
+    return [(str(path), lo, min(lo + step, size)) for lo in range(0, size, step)]
+
+def _chunks(filings: Iterable[dict], size: int) -> Iterator[list[dict]]:
+    it = iter(filings)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+def _shards(source, shard_size: int, workers: int, lines: bool | None):
+    if isinstance(source, (str, os.PathLike)):
+        path = Path(source)
+        if lines or (lines is None and path.suffix in (".jsonl", ".ndjson")):
+            # ~4 ranges per worker keeps the pool busy when ranges differ in cost
+            parts = max(workers * 4, path.stat().st_size // (shard_size * 2048) + 1)
+            return _line_ranges(path, parts)
+        if edgar.is_edgar_source(path):
+            return edgar.shards(path, min(shard_size, edgar.SHARD_SIZE))
+        from insider_trading.stream import iter_filings
+        return _chunks(iter_filings(path), shard_size)
+    if isinstance(source, dict):
+        source = source.get("transactions") or []
+    return _chunks(source, shard_size)
+# === End Sharding ===
+
+# === K-way merge ===
+def _ranks(col: pd.Series, ascending: bool) -> tuple[np.ndarray, int]:
+    """Dense sort rank per value; missing values rank last, as sort_values puts them."""
+    codes, uniques = pd.factorize(col, sort=True)
+    n = len(uniques)
+    codes = codes.astype(np.int64)
+    if not ascending:
+        codes = np.where(codes >= 0, n - 1 - codes, codes)
+    codes[codes < 0] = n
+    return codes, n + 1
+
+def sort_keys(df: pd.DataFrame, by: list[str], ascending: list[bool]) -> np.ndarray:
+    """
+    One int64 per row that orders rows like df.sort_values(by, ascending). Ranks are
+    combined mixed-radix; the running key is compressed whenever the next column
+    could overflow it.
+    """
+    key = np.zeros(len(df), dtype=np.int64)
+    span = 1
+    for c, asc in zip(by, ascending):
+        r, card = _ranks(df[c], asc)
+        if span * card >= 2 ** 62:
+            _, key = np.unique(key, return_inverse=True)
+            key = key.astype(np.int64)
+            span = int(key.max()) + 1 if len(key) else 1
+        key = key * card + r
+        span *= card
+    return key
+
+def _merge_two(a: tuple[np.ndarray, np.ndarray], b: tuple[np.ndarray, np.ndarray]):
+    """Stable merge of two sorted (keys, row ids) runs; a wins ties."""
+    ka, ia = a
+    kb, ib = b
+    pos_a = np.arange(len(ka)) + np.searchsorted(kb, ka, side="left")
+    pos_b = np.arange(len(kb)) + np.searchsorted(ka, kb, side="right")
+    keys = np.empty(len(ka) + len(kb), dtype=ka.dtype)
+    rows = np.empty(len(keys), dtype=ia.dtype)
+    keys[pos_a], keys[pos_b] = ka, kb
+    rows[pos_a], rows[pos_b] = ia, ib
+    return keys, rows
+
+def kway_merge(runs: list[np.ndarray]) -> np.ndarray:
+    """
+    Row order that merges k sorted key runs (numbered consecutively, run 0 first).
+    Adjacent runs are merged pairwise in log2(k) rounds, each a vectorized O(n) pass
+    plus binary searches.
+    """
+    offsets = np.cumsum([0] + [len(r) for r in runs])
+    level = [(np.asarray(r), np.arange(offsets[i], offsets[i + 1])) for i, r in enumerate(runs)]
+    if not level:
+        return np.arange(0)
+    while len(level) > 1:
+        nxt = [_merge_two(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            nxt.append(level[-1])
+        level = nxt
+    return level[0][1]
+# === End K-way merge ===
+
+def parallel_flatten_table(source, workers: int | None = None, shard_size: int = 20_000,
+                           footnotes: bool = False, lines: bool | None = None,
+                           tmpdir: str | None = None) -> pa.Table:
+    """
+    Flatten source in a process pool and return the merged Arrow table.
+    - source: sec-api payload dict, iterable of filings, a JSON / JSONL path, or an
+      EDGAR XML file, submission, archive or directory (see edgar)
+    - workers: pool size (default os.cpu_count())
+    - shard_size: filings per shard for in-memory and JSON inputs (EDGAR documents
+      are capped at edgar.SHARD_SIZE per shard)
+    """
+    from flattener import _SORT_ASC, _SORT_BY
+
+    workers = workers or os.cpu_count() or 1
+    base = tmpdir or (SHM_DIR if os.path.isdir(SHM_DIR) else None)
+    with tempfile.TemporaryDirectory(prefix="backfill-", dir=base) as outdir:
+        jobs = ((i, shard, outdir, footnotes)
+                for i, shard in enumerate(_shards(source, shard_size, workers, lines)))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            done = [r for r in pool.map(_flatten_shard, jobs) if r[1]]
+        if not done:
+            return pa.table({})
+
+        shards = []
+        for path, _ in done:
+            with pa.memory_map(path, "r") as source_map:
+                shards.append(ipc.open_file(source_map).read_all())   # zero-copy views
+        combined = pa.concat_tables(shards, promote_options="permissive")
+        keys = sort_keys(combined.select(_SORT_BY).to_pandas(), _SORT_BY, _SORT_ASC)
+        bounds = np.cumsum([0] + [s.num_rows for s in shards])
+        order = kway_merge([keys[bounds[i]:bounds[i + 1]] for i in range(len(shards))])
+        # take() copies out of the mappings, so the shard files can go with the directory
+        return combined.take(pa.array(order))
+
+def parallel_flatten(source, workers: int | None = None, shard_size: int = 20_000,
+                     footnotes: bool = False, lines: bool | None = None,
+                     tmpdir: str | None = None, compact: bool = False) -> pd.DataFrame:
+    """parallel_flatten_table() as the flattener's DataFrame (compact: COMPACT_DTYPES)."""
+    table = parallel_flatten_table(source, workers, shard_size, footnotes, lines, tmpdir)
+    if table.num_columns == 0:
+        return pd.DataFrame()
+    df = table.to_pandas()
+    if compact:
+        from flattener import to_compact
+        df = to_compact(df)
+    return df
@@ -0,0 +1,372 @@
+"""
+Persistent per-filing cache of flattened legs, so reruns after a rule change only
+redo the filings the change touches.
+
+An entry is keyed by filing id and remembers a digest of the filing's content plus a
+fingerprint of every rule set its rows were derived with (rule_fingerprints()):
+    flatten    field paths, column layout and the code that builds the rows
+    roles      roles.ROLE_MAP / FLAG_SCORES / DEFAULT_SCORE
+    direction  the code of flattener._direction_vec
+    footnotes  footnotes.FOOTNOTE_PATTERNS and the code that links footnotes to legs
+Code is fingerprinted by its bytecode and constants, so edits to comments or to
+unrelated functions do not invalidate anything. On lookup a filing is
+    - a hit       content and all fingerprints match: rows come from the cache
+    - patched     only roles / direction changed: role_score / direction are
+                  recomputed vectorized over the cached rows
+    - a miss      new or changed content, a new flatten fingerprint, or new footnote
+                  rules on a filing that has footnotes: flattened again
+Patched and missed filings are written back, so the next run is all hits.
+
+Rows live in Arrow IPC segment files (one per write, memory-mapped on read; every
+entry always carries the footnote columns) with an SQLite index of entries. Cached
+rows are gathered with one take() over the segments and re-sorted, so the result is
+the frame flatten_insider_payload(filings, engine="columnar") would return.
+Scoring is not cached: cluster features span filings, and scoring the recombined
+frame is an order of magnitude cheaper than flattening it.
+
+Entries are evicted least recently used first once the cache outgrows max_bytes;
+segments left mostly empty are rewritten. One writer at a time.
+
+    with FeatureCache("cache/features", max_bytes=4 << 30) as cache:
+        legs = cache.flatten(filings, footnotes=True)
+        scored = ScoringEngine().score(legs)
+"""
+# std lib
+import hashlib
+import os
+import pickle
+import sqlite3
+from pathlib import Path
+from types import CodeType
+from typing import Iterable
+
+# packages
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+# local lib
+import flattener
+import footnotes
+import roles
+from footnotes import FOOTNOTE_COLS
+from insider_trading.metrics import METRICS
+
+RULE_SETS = ("flatten", "roles", "direction", "footnotes")
+_LOW_WATER = 0.9        # eviction frees down to this fraction of max_bytes
+_MIN_LIVE = 0.5         # segments with fewer live rows than this are rewritten
+_BATCH = 500            # ids per SQLite IN (...) statement
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rules    (rules INTEGER PRIMARY KEY, flatten TEXT, roles TEXT,
+                                     direction TEXT, footnotes TEXT,
+                                     UNIQUE (flatten, roles, direction, footnotes));
+CREATE TABLE IF NOT EXISTS segments (segment INTEGER PRIMARY KEY, rows INTEGER, bytes INTEGER);
+CREATE TABLE IF NOT EXISTS entries  (id TEXT PRIMARY KEY, digest BLOB, rules INTEGER,
+                                     has_notes INTEGER, segment INTEGER, start INTEGER,
+                                     rows INTEGER, bytes INTEGER, used INTEGER);
+CREATE INDEX IF NOT EXISTS entries_segment ON entries (segment);
+CREATE INDEX IF NOT EXISTS entries_used ON entries (used);
+CREATE TABLE IF NOT EXISTS meta     (name TEXT PRIMARY KEY, value INTEGER);
+"""
+
+# === Fingerprints ===
+def _code_parts(code: CodeType) -> list:
+    """Bytecode, names and constants (nested functions included), without line numbers."""
+    parts = [code.co_code, code.co_names, code.co_varnames]
+    for c in code.co_consts:
+        parts.append(_code_parts(c) if isinstance(c, CodeType) else c)
+    return parts
+
+def _fingerprint(*objs) -> str:
+    parts = [_code_parts(o.__code__) if callable(o) and hasattr(o, "__code__") else o for o in objs]
+    return hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+
+def rule_fingerprints() -> dict[str, str]:
+    """Current fingerprint per rule set (see the module docstring)."""
+    f = flattener
+    return {
+        "flatten": _fingerprint(f._FIELD_PATHS, f._ORDER, f._SORT_BY, f._SORT_ASC, f._FILING_COLS,
+                                f._OWNER_COLS, f._LEG_COLS, f._filing_legs, f._filing_values,
+                                f._owner_values, f._append_filing, f._owners_iter,
+                                f._frame_from_buffers, f._stake_change_vec, f._to_num,
+                                # path resolution the legs are read through
+                                f._split_path.__wrapped__, f._get_parts, f._compile_accessor,
+                                f.SchemaResolver.__init__, f.SchemaResolver._alias_accessor,
+                                f.SchemaResolver._probe, f.SchemaResolver.bind),
+        "roles": _fingerprint(roles.ROLE_MAP, roles.FLAG_SCORES, roles.DEFAULT_SCORE),
+        "direction": _fingerprint(f._direction_vec),
+        "footnotes": _fingerprint(footnotes.FOOTNOTE_PATTERNS, footnotes.FOOTNOTE_COLS,
+                                  footnotes.footnote_features, footnotes.merge_features,
+                                  footnotes.leg_footnote_columns, footnotes._footnote_ids,
+                                  footnotes._price),
+    }
+
+def filing_digest(filing: dict) -> bytes:
+    """Content digest; a different key order only costs a miss, never a wrong hit."""
+    return hashlib.blake2b(pickle.dumps(filing, protocol=5), digest_size=16).digest()
+# === End Fingerprints ===
+
+class FeatureCache:
+    """
+        cache = FeatureCache("cache/features")
+        legs = cache.flatten(filings)              # only new / changed filings are flattened
+        cache.last                                 # {"hits": ..., "patched": ..., "misses": ..., "uncached": ...}
+    """
+
+    def __init__(self, root: str | os.PathLike, max_bytes: int = 1 << 30):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._db = sqlite3.connect(self.root / "index.sqlite")
+        self._db.executescript(_SCHEMA)
+        self.last = {"hits": 0, "patched": 0, "misses": 0, "uncached": 0}
+
+    def close(self) -> None:
+        self._db.close()
+
+    def __enter__(self) -> "FeatureCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # --- Index ---
+    def _meta(self, name: str, default: int = 0) -> int:
+        row = self._db.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else default
+
+    def _set_meta(self, name: str, value: int) -> None:
+        self._db.execute("INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)", (name, value))
+
+    def _rules_id(self, fps: dict[str, str]) -> int:
+        vals = tuple(fps[k] for k in RULE_SETS)
+        self._db.execute("INSERT OR IGNORE INTO rules (flatten, roles, direction, footnotes) "
+                         "VALUES (?, ?, ?, ?)", vals)
+        return self._db.execute("SELECT rules FROM rules WHERE flatten = ? AND roles = ? AND "
+                                "direction = ? AND footnotes = ?", vals).fetchone()[0]
+
+    def _rules(self) -> dict[int, dict[str, str]]:
+        return {r[0]: dict(zip(RULE_SETS, r[1:]))
+                for r in self._db.execute("SELECT rules, flatten, roles, direction, footnotes FROM rules")}
+
+    def _lookup(self, ids: list[str]) -> dict[str, tuple]:
+        out = {}
+        for i in range(0, len(ids), _BATCH):
+            batch = ids[i:i + _BATCH]
+            q = ("SELECT id, digest, rules, has_notes, segment, start, rows FROM entries "
+                 f"WHERE id IN ({','.join('?' * len(batch))})")
+            out.update((r[0], r[1:]) for r in self._db.execute(q, batch))
+        return out
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def nbytes(self) -> int:
+        return self._db.execute("SELECT COALESCE(SUM(bytes), 0) FROM entries").fetchone()[0]
+
+    # --- Segments ---
+    def _segment_path(self, segment: int) -> Path:
+        return self.root / f"seg-{segment:08d}.arrow"
+
+    def _read_segment(self, segment: int) -> pa.Table:
+        with pa.memory_map(str(self._segment_path(segment)), "r") as source:
+            return ipc.open_file(source).read_all()
+
+    def _write_segment(self, table: pa.Table) -> tuple[int, int]:
+        """Write a new segment; returns (segment, bytes)."""
+        segment = self._meta("next_segment", 1)
+        self._set_meta("next_segment", segment + 1)
+        path = self._segment_path(segment)
+        tmp = path.with_suffix(".tmp")
+        with pa.OSFile(str(tmp), "wb") as sink, ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp, path)
+        size = path.stat().st_size
+        self._db.execute("INSERT INTO segments (segment, rows, bytes) VALUES (?, ?, ?)",
+                         (segment, table.num_rows, size))
+        return segment, size
+
+    def _store(self, df: pd.DataFrame | None, keys: list[tuple], rows: np.ndarray,
+               rules: int, clock: int) -> int | None:
+        """
+        Write df as one segment and (re)point entries at it: keys[i] = (id, digest,
+        has_notes) owns the next rows[i] rows of df. Returns the segment.
+        """
+        total = int(rows.sum())
+        starts = np.cumsum(rows) - rows
+        segment, size = self._write_segment(pa.Table.from_pandas(df, preserve_index=False)) if total \
+            else (None, 0)
+        self._db.executemany(
+            "INSERT OR REPLACE INTO entries (id, digest, rules, has_notes, segment, start, rows, bytes, used) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(fid, digest, rules, notes, segment if n else None, int(s), int(n),
+              round(size * int(n) / total) if n else 0, clock)
+             for (fid, digest, notes), s, n in zip(keys, starts, rows)])
+        return segment
+
+    # --- Flatten ---
+    def flatten(self, filings: Iterable[dict] | dict, footnotes: bool = False,
+                compact: bool = False) -> pd.DataFrame:
+        """flatten_insider_payload(filings, engine="columnar", ...) through the cache."""
+        filings = flattener._filings_of(filings) if isinstance(filings, dict) else list(filings)
+        fps = rule_fingerprints()
+        rules = self._rules_id(fps)
+        known = self._rules()
+        clock = self._meta("clock") + 1
+        self._set_meta("clock", clock)
+
+        ids = [f.get("id") if isinstance(f, dict) else None for f in filings]
+        digests = [filing_digest(f) if fid is not None else None for f, fid in zip(filings, ids)]
+        first = {}                  # id -> position of the first filing carrying it
+        for pos, fid in enumerate(ids):
+            if fid is not None:
+                first.setdefault(fid, pos)
+        found = self._lookup(list(first))
+        hits, patch, miss = [], [], []
+        for fid, pos in first.items():
+            e = found.get(fid)
+            old = known.get(e[1]) if e is not None else None
+            if old is None or e[0] != digests[pos] or old["flatten"] != fps["flatten"] \
+                    or (e[2] and old["footnotes"] != fps["footnotes"]):
+                miss.append(fid)
+            elif old["roles"] != fps["roles"] or old["direction"] != fps["direction"]:
+                patch.append(fid)
+            else:
+                hits.append(fid)
+
+        # Recompute patched and missed filings and write them back as one new segment
+        where = {fid: found[fid][3:] for fid in hits}      # id -> (segment, start, rows)
+        if patch or miss:
+            frames, keys, rows = [], [], []
+            if patch:
+                cached = self._gather([found[fid][3:] for fid in patch])
+                if len(cached):
+                    cached["role_score"] = roles.role_scores(cached["owner_title"], cached["isOfficer"],
+                                                             cached["isDirector"], cached["isTenPercentOwner"])
+                    cached["direction"] = flattener._direction_vec(cached["code"], cached["acq_disp"],
+                                                                   cached["table"])
+                frames.append(cached)
+                keys += [(fid, digests[first[fid]], found[fid][2]) for fid in patch]
+                rows += [found[fid][5] for fid in patch]
+            if miss:
+                subset = [filings[first[fid]] for fid in miss]
+                grouped, counts = _group_rows(
+                    flattener.flatten_insider_payload(subset, engine="columnar", footnotes=True), miss)
+                frames.append(grouped)
+                keys += [(fid, digests[first[fid]], int(bool(f.get("footnotes")))) for fid, f in zip(miss, subset)]
+                rows += counts.tolist()
+            rows = np.asarray(rows, dtype=np.int64)
+            frames = [f for f in frames if len(f)]
+            segment = self._store(pd.concat(frames, ignore_index=True) if frames else None,
+                                  keys, rows, rules, clock)
+            for (fid, _, _), s, n in zip(keys, np.cumsum(rows) - rows, rows):
+                where[fid] = (segment, int(s), int(n))
+        for i in range(0, len(hits), _BATCH):
+            batch = hits[i:i + _BATCH]
+            self._db.execute(f"UPDATE entries SET used = ? WHERE id IN ({','.join('?' * len(batch))})",
+                             (clock, *batch))
+
+        # Filings without an id, or repeating an id with other content, bypass the cache
+        pieces, extra = [], []
+        for pos, fid in enumerate(ids):
+            if fid is not None and (first[fid] == pos or digests[pos] == digests[first[fid]]):
+                pieces.append(where[fid])
+            else:
+                one = flattener.flatten_insider_payload([filings[pos]], engine="columnar", footnotes=True)
+                extra.append(one)
+                pieces.append((-len(extra), 0, len(one)))
+        df = self._gather(pieces, extra)
+        self._db.commit()
+
+        self.last = {"hits": len(hits), "patched": len(patch), "misses": len(miss), "uncached": len(extra)}
+        for outcome, n in self.last.items():
+            if n:
+                METRICS.inc("feature_cache_filings_total", n, outcome=outcome)
+        self.evict()
+
+        if df.empty:
+            return pd.DataFrame()
+        df = flattener._order_and_sort(df)
+        if not footnotes:
+            df = df.drop(columns=[c for c in FOOTNOTE_COLS if c in df.columns])
+        return flattener.to_compact(df) if compact else df
+
+    def _gather(self, pieces: list[tuple], extra: list[pd.DataFrame] = ()) -> pd.DataFrame:
+        """
+        Rows of (segment, start, rows) pieces, in piece order, as one frame. Negative
+        segments -k refer to extra[k - 1] (rows that bypass the cache).
+        """
+        pieces = [p for p in pieces if p[2]]
+        if not pieces:
+            return pd.DataFrame()
+        seg, start, n = (np.fromiter((p[i] for p in pieces), np.int64, len(pieces)) for i in range(3))
+        keys, inv = np.unique(seg, return_inverse=True)
+        tables = [self._read_segment(int(k)) if k > 0 else pa.Table.from_pandas(extra[-k - 1], preserve_index=False)
+                  for k in keys]
+        offsets = np.cumsum([0] + [t.num_rows for t in tables])[:-1]
+        first = offsets[inv] + start
+        idx = np.repeat(first - (np.cumsum(n) - n), n) + np.arange(n.sum())
+        combined = pa.concat_tables(tables, promote_options="permissive")
+        return combined.take(pa.array(idx)).to_pandas()   # copies out of the mappings
+
+    # --- Eviction ---
+    def evict(self, max_bytes: int | None = None) -> int:
+        """Drop least recently used entries until under max_bytes; returns entries dropped."""
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        total = self.nbytes()
+        dropped = 0
+        if total > limit:
+            target = total - int(limit * _LOW_WATER)
+            victims, freed = [], 0
+            for fid, size in self._db.execute("SELECT id, bytes FROM entries ORDER BY used, id"):
+                if freed >= target:
+                    break
+                victims.append((fid,))
+                freed += size
+            self._db.executemany("DELETE FROM entries WHERE id = ?", victims)
+            dropped = len(victims)
+            METRICS.inc("feature_cache_evictions_total", dropped)
+        self._compact()
+        self._db.commit()
+        return dropped
+
+    def _compact(self) -> None:
+        """Delete segments nothing points at; rewrite those mostly dead."""
+        live = dict(self._db.execute("SELECT segment, SUM(rows) FROM entries WHERE segment IS NOT NULL "
+                                     "GROUP BY segment"))
+        for segment, rows in self._db.execute("SELECT segment, rows FROM segments").fetchall():
+            n = live.get(segment, 0)
+            if n >= rows * _MIN_LIVE:
+                continue
+            if n:
+                entries = self._db.execute("SELECT id, digest, has_notes, rules, start, rows, used FROM entries "
+                                           "WHERE segment = ? ORDER BY start", (segment,)).fetchall()
+                table = self._read_segment(segment)
+                idx = np.concatenate([np.arange(e[4], e[4] + e[5]) for e in entries])
+                new, size = self._write_segment(table.take(pa.array(idx)))
+                starts = np.cumsum([0] + [e[5] for e in entries[:-1]])
+                self._db.executemany(
+                    "UPDATE entries SET segment = ?, start = ?, bytes = ? WHERE id = ?",
+                    [(new, int(s), round(size * e[5] / len(idx)), e[0]) for e, s in zip(entries, starts)])
+            self._db.execute("DELETE FROM segments WHERE segment = ?", (segment,))
+            self._segment_path(segment).unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        for (segment,) in self._db.execute("SELECT segment FROM segments").fetchall():
+            self._segment_path(segment).unlink(missing_ok=True)
+        self._db.executescript("DELETE FROM entries; DELETE FROM segments; DELETE FROM rules;")
+        self._db.commit()
+
+    def stats(self) -> dict:
+        segs = self._db.execute("SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM segments").fetchone()
+        return {"entries": len(self), "live_bytes": self.nbytes(), "segments": segs[0],
+                "segment_bytes": segs[1], "max_bytes": self.max_bytes, **self.last}
+
+def _group_rows(df: pd.DataFrame, ids: list[str]) -> tuple[pd.DataFrame, np.ndarray]:
+    """df's rows grouped by filing id in ids order (each group keeps df's order), and the group sizes."""
+    if df.empty:
+        return df, np.zeros(len(ids), dtype=np.int64)
+    codes = pd.Categorical(df["id"], categories=ids).codes.astype(np.int64)
+    return df.iloc[np.argsort(codes, kind="stable")], np.bincount(codes, minlength=len(ids))
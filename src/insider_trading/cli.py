@@ -0,0 +1,327 @@
+"""
+Command line entry point: python -m insider_trading <command> [options].
+
+Commands:
+    poll       poll sec-api.io, flatten, score and alert as filings arrive (main.run)
+    backfill   flatten a bulk JSON / JSONL download or EDGAR XML filings in a process pool
+               into a leg store
+    flatten    flatten a payload file to CSV / Parquet / Arrow / JSON lines (or stdout),
+               or to normalized filings / owners / legs Parquet tables
+    score      score legs from a payload file or a leg store
+    stats      summarise a leg store from its manifest
+
+Only argparse and the standard library are imported at startup; each command imports
+pandas, pyarrow, pydantic or aiohttp when it runs, so --help and stats never pay for
+them. Arguments that do not start with a command are taken as poll arguments, as
+before the subcommands existed (python -m insider_trading AAPL --once).
+
+Sources may also be EDGAR ownership XML: .xml documents, full submission .txt files,
+.tar / .zip archives of them, or a directory of any of these (see edgar).
+"""
+# std lib
+import argparse
+import json
+import os
+import sys
+import time
+
+COMMANDS = ("poll", "backfill", "flatten", "score", "stats")
+PROFILE_ENV = "INSIDER_TRADING_PROFILE"   # mirrors metrics.PROFILE_ENV without importing it
+
+# === Arguments ===
+def add_poll_arguments(ap: argparse.ArgumentParser) -> None:
+    ap.add_argument("symbols", nargs="*", help="ticker symbols to watch (Form 4 filings)")
+    ap.add_argument("--query", action="append", default=[], help="raw sec-api query (repeatable)")
+    ap.add_argument("--api-key", default=os.getenv("SEC_API_KEY"))
+    ap.add_argument("--url", default=None, help="sec-api endpoint (default: the insider-trading API)")
+    ap.add_argument("--interval", type=float, default=30.0, help="seconds between poll rounds")
+    ap.add_argument("--rate", type=float, default=5.0, help="max requests per second")
+    ap.add_argument("--pages", type=int, default=1, help="pages per query per round")
+    ap.add_argument("--page-size", type=int, default=50)
+    ap.add_argument("--once", action="store_true", help="poll a single round and exit")
+    ap.add_argument("--seen-db", default="seen.sqlite",
+                    help="SQLite file remembering processed filings ('' to disable)")
+    ap.add_argument("--store", default=None, help="directory of the partitioned leg store to append to")
+    ap.add_argument("--ledger", default=None, help="position ledger snapshot to load and keep updated")
+    ap.add_argument("--webhook", action="append", default=[], help="POST alerts to this URL (repeatable)")
+    ap.add_argument("--alerts-file", default=None, help="append alerts as JSON lines to this file")
+    ap.add_argument("--min-score", type=float, default=0.0, help="only alert on legs with |score| >= this")
+    ap.add_argument("--validate", action="store_true", help="check filings against the strict schema")
+    ap.add_argument("--metrics-port", type=int, default=None, help="serve /metrics and /metrics.json on this port")
+
+def add_common_arguments(ap: argparse.ArgumentParser) -> None:
+    ap.add_argument("--metrics-file", default=None,
+                    help="write metrics on exit (Prometheus text for .prom/.txt, JSON otherwise)")
+    ap.add_argument("--profile", default=None,
+                    help=f"cProfile the run and dump pstats here (or set {PROFILE_ENV})")
+
+def _add_source(ap: argparse.ArgumentParser, required: bool = True) -> None:
+    ap.add_argument("source", nargs=None if required else "?",
+                    help="sec-api payload (.json), one filing per line (.jsonl), or EDGAR XML "
+                         "(.xml / .txt / .tar / .zip / directory); '-' reads stdin")
+    ap.add_argument("--lines", action="store_true", default=None, help="treat source as JSON lines")
+
+def _add_cache(ap: argparse.ArgumentParser) -> None:
+    ap.add_argument("--cache", default=None,
+                    help="per-filing feature cache directory: only new or changed filings are flattened")
+    ap.add_argument("--cache-mb", type=int, default=1024, help="feature cache size bound in MiB")
+
+def build_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(prog="insider_trading", description="SEC Form 4 insider trading tools.")
+    sub = ap.add_subparsers(dest="command", metavar="command", required=True)
+    common = argparse.ArgumentParser(add_help=False)
+    add_common_arguments(common)
+
+    p = sub.add_parser("poll", parents=[common], help="poll sec-api.io for new filings",
+                       description="Poll sec-api.io for insider trades and score them.")
+    add_poll_arguments(p)
+
+    p = sub.add_parser("backfill", parents=[common], help="flatten a bulk download into a leg store")
+    _add_source(p)
+    p.add_argument("--store", required=True, help="leg store directory to append to")
+    p.add_argument("--ledger", default=None, help="position ledger snapshot to update as well")
+    p.add_argument("--workers", type=int, default=None, help="process pool size (default: all cores)")
+    p.add_argument("--shard-size", type=int, default=20_000, help="filings per worker shard")
+    p.add_argument("--footnotes", action="store_true", help="add the footnote flag columns")
+
+    p = sub.add_parser("flatten", parents=[common], help="flatten a payload file to a table")
+    _add_source(p)
+    p.add_argument("-o", "--output", default=None,
+                   help="output file (.csv, .parquet, .arrow, .jsonl); CSV to stdout if omitted")
+    p.add_argument("--engine", choices=("columnar", "rows"), default="columnar")
+    p.add_argument("--footnotes", action="store_true", help="add the footnote flag columns")
+    p.add_argument("--compact", action="store_true", help="categorical / nullable dtypes")
+    p.add_argument("--normalized", action="store_true",
+                   help="write filings / owners / filing_owners / legs tables into the -o directory")
+    _add_cache(p)
+
+    p = sub.add_parser("score", parents=[common], help="score legs from a payload file or a leg store")
+    _add_source(p, required=False)
+    p.add_argument("--store", default=None, help="score legs scanned from this leg store instead")
+    p.add_argument("--issuer", action="append", default=None, help="issuer symbol filter (repeatable)")
+    p.add_argument("--from", dest="filed_from", default=None, help="filedAt lower bound (inclusive)")
+    p.add_argument("--to", dest="filed_to", default=None, help="filedAt upper bound (exclusive)")
+    p.add_argument("--min-score", type=float, default=0.0, help="only keep legs with |score| >= this")
+    p.add_argument("--prices", default=None,
+                   help="price store directory (<SYMBOL>.csv / .arrow) to add premium and forward returns")
+    _add_cache(p)
+    p.add_argument("-o", "--output", default=None,
+                   help="output file (.csv, .parquet, .arrow, .jsonl); a summary table if omitted")
+
+    p = sub.add_parser("stats", parents=[common], help="summarise a leg store")
+    p.add_argument("--store", default="legs", help="leg store directory (default: %(default)s)")
+    p.add_argument("--json", action="store_true", help="print the summary as JSON")
+    p.add_argument("--verify", action="store_true",
+                   help="check the manifest against the partition directories")
+    p.add_argument("--exact", action="store_true",
+                   help="rebuild the manifest from the part files first (reads every part)")
+    return ap
+# === End Arguments ===
+
+# === Helpers ===
+def _filings(args) -> list[dict]:
+    from insider_trading import edgar
+    from insider_trading.stream import iter_filings
+
+    if args.source != "-" and not args.lines and edgar.is_edgar_source(args.source):
+        return list(edgar.iter_filings(args.source))
+    src = sys.stdin.buffer if args.source == "-" else args.source
+    lines = args.lines if args.lines is not None else str(args.source).endswith((".jsonl", ".ndjson"))
+    return list(iter_filings(src, lines=lines))
+
+def _flatten(args, filings, **kwargs):
+    """flatten_insider_payload(engine="columnar"), through the feature cache with --cache."""
+    if args.cache is not None:
+        from insider_trading.cache import FeatureCache
+        with FeatureCache(args.cache, max_bytes=args.cache_mb << 20) as cache:
+            return cache.flatten(filings, **kwargs)
+    from flattener import flatten_insider_payload
+    return flatten_insider_payload(filings, engine="columnar", **kwargs)
+
+def _write_frame(df, path: str | None) -> None:
+    """Write by suffix; no path means CSV on stdout."""
+    if path is None:
+        df.to_csv(sys.stdout, index=False)
+        return
+    suffix = os.path.splitext(path)[1].lower()
+    if suffix == ".parquet":
+        df.to_parquet(path, index=False)
+    elif suffix in (".arrow", ".feather"):
+        df.reset_index(drop=True).to_feather(path)
+    elif suffix in (".jsonl", ".ndjson"):
+        df.to_json(path, orient="records", lines=True, date_format="iso")
+    elif suffix == ".json":
+        df.to_json(path, orient="records", date_format="iso")
+    else:
+        df.to_csv(path, index=False)
+    print(f"{len(df):,} rows -> {path}", file=sys.stderr)
+# === End Helpers ===
+
+# === Commands ===
+def _cmd_poll(args) -> int:
+    from insider_trading.main import run
+    return run(args)
+
+def _cmd_backfill(args) -> int:
+    from insider_trading.backfill import parallel_flatten
+    from insider_trading.metrics import METRICS
+    from insider_trading.store import LegStore
+
+    t0 = time.perf_counter()
+    source = args.source
+    if source == "-":
+        source = _filings(args)
+    with METRICS.timer("flatten"):
+        df = parallel_flatten(source, workers=args.workers, shard_size=args.shard_size,
+                              footnotes=args.footnotes, lines=args.lines)
+    METRICS.inc("legs_total", len(df))
+    if df.empty:
+        print("no legs in source", file=sys.stderr)
+        return 1
+    parts = LegStore(args.store).append(df)
+    if args.ledger:
+        from insider_trading.ledger import Ledger
+        ledger = Ledger.load(args.ledger) if os.path.exists(args.ledger) else Ledger()
+        ledger.apply(df)
+        ledger.save(args.ledger)
+    print(f"{len(df):,} legs in {len(parts)} parts -> {args.store} ({time.perf_counter() - t0:.1f}s)")
+    return 0
+
+def _cmd_flatten(args) -> int:
+    from flattener import flatten_insider_payload
+    from insider_trading.metrics import METRICS
+
+    if args.normalized and args.output is None:
+        print("flatten: --normalized needs an -o directory", file=sys.stderr)
+        return 2
+    filings = _filings(args)
+    METRICS.inc("filings_total", len(filings))
+    if args.normalized:
+        from flattener import normalize_insider_payload
+        with METRICS.timer("flatten"):
+            norm = normalize_insider_payload(filings, footnotes=args.footnotes, compact=args.compact)
+        METRICS.inc("legs_total", len(norm))
+        os.makedirs(args.output, exist_ok=True)
+        for name, table in norm.tables().items():
+            table.to_parquet(os.path.join(args.output, f"{name}.parquet"))   # keys kept as the index
+        return 0
+    with METRICS.timer("flatten"):
+        if args.engine == "columnar":
+            df = _flatten(args, filings, footnotes=args.footnotes, compact=args.compact)
+        else:
+            df = flatten_insider_payload(filings, engine=args.engine, footnotes=args.footnotes,
+                                         compact=args.compact)
+    METRICS.inc("legs_total", len(df))
+    _write_frame(df, args.output)
+    return 0
+
+def _cmd_score(args) -> int:
+    if (args.source is None) == (args.store is None):
+        print("score: pass either a source file or --store", file=sys.stderr)
+        return 2
+    from insider_trading.metrics import METRICS
+    from insider_trading.scoring import ScoringEngine
+
+    if args.store is not None:
+        from insider_trading.store import LegStore
+        with METRICS.timer("scan"):
+            df = LegStore(args.store).scan(issuer_symbol=args.issuer, filed_from=args.filed_from,
+                                           filed_to=args.filed_to)
+    else:
+        filings = _filings(args)
+        METRICS.inc("filings_total", len(filings))
+        with METRICS.timer("flatten"):
+            df = _flatten(args, filings)
+        if args.issuer:
+            df = df[df["issuer_symbol"].isin(args.issuer)]
+    METRICS.inc("legs_total", len(df))
+    with METRICS.timer("score"):
+        df = ScoringEngine().score(df)
+    df = df[df["score"].abs() >= args.min_score].reset_index(drop=True)
+    if args.prices is not None:
+        from insider_trading.prices import PriceStore
+        with METRICS.timer("prices"):
+            df = PriceStore(args.prices, csv_dir=args.prices).enrich(df)
+    if args.output is not None:
+        _write_frame(df, args.output)
+        return 0
+    cols = ["filedAt", "issuer_symbol", "owner_name", "code", "shares", "pricePerShare", "premium",
+            "fwd_ret_20", "score", "label"]
+    print(df[[c for c in cols if c in df.columns]].to_string(index=False, max_rows=200))
+    return 0
+
+def _cmd_stats(args) -> int:
+    if not os.path.isdir(args.store):
+        print(f"stats: no leg store at {args.store}", file=sys.stderr)
+        return 2
+    if args.exact:
+        from insider_trading.store import LegStore
+        LegStore(args.store).reindex()
+    from insider_trading.manifest import summarize
+
+    s = summarize(args.store, verify=args.verify)
+    if args.json:
+        print(json.dumps(s, indent=2))
+        return 0
+    print(f"store      {s['root']}")
+    print(f"parts      {s['files']:,} ({s['bytes'] / 1e6:,.1f} MB)")
+    print(f"legs       {s['rows']:,}")
+    print(f"issuers    {s['issuers']:,}")
+    print(f"filed      {s['filed_min']} .. {s['filed_max']}")
+    if s["unindexed_files"]:
+        print(f"unindexed  {s['unindexed_files']:,} parts not in the manifest (rebuild with --exact)")
+    if s["top_issuers"]:
+        print("top issuers")
+        for sym, n in s["top_issuers"].items():
+            print(f"  {sym:<8} {n:>12,}")
+    return 0
+
+_HANDLERS = {"poll": _cmd_poll, "backfill": _cmd_backfill, "flatten": _cmd_flatten,
+             "score": _cmd_score, "stats": _cmd_stats}
+# === End Commands ===
+
+_GLOBAL_OPTIONS = ("--metrics-file", "--profile")   # add_common_arguments, each takes a value
+
+def _command_first(argv: list[str]) -> list[str]:
+    """
+    Move global options given before the command behind it (every subcommand accepts
+    them) and default to poll for pre-subcommand invocations.
+    """
+    leading, i = [], 0
+    while i < len(argv):
+        opt = argv[i].split("=", 1)[0]
+        if opt not in _GLOBAL_OPTIONS:
+            break
+        n = 1 if "=" in argv[i] else 2
+        leading += argv[i:i + n]
+        i += n
+    rest = argv[i:]
+    if rest and rest[0] in ("-h", "--help"):
+        return rest + leading
+    if (rest or leading) and (not rest or rest[0] not in COMMANDS):
+        rest.insert(0, "poll")
+    return rest[:1] + leading + rest[1:]
+
+def main(argv=None) -> int:
+    argv = _command_first(list(sys.argv[1:] if argv is None else argv))
+    args = build_parser().parse_args(argv)
+    try:
+        return _dispatch(args)
+    except BrokenPipeError:
+        # Output piped into head & co.: stop quietly, and keep the interpreter's final
+        # stdout flush from raising again
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+
+def _dispatch(args) -> int:
+    profile = args.profile or os.getenv(PROFILE_ENV)
+    if not profile and not args.metrics_file:
+        return _HANDLERS[args.command](args)
+
+    from insider_trading.metrics import METRICS, profiled
+    try:
+        with profiled(profile):
+            return _HANDLERS[args.command](args)
+    finally:
+        if args.metrics_file:
+            METRICS.write(args.metrics_file)
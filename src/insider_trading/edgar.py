@@ -0,0 +1,403 @@
+"""
+Streaming reader for raw EDGAR ownership filings (Forms 3, 4 and 5).
+
+Turns ownershipDocument XML into filings in the sec-api.io JSON shape, so everything
+downstream (flattener.flatten_insider_payload, footnote features, scoring, backfill)
+sees the same columns whichever source the filings came from. Reads:
+    - ownershipDocument .xml files
+    - full submission .txt / .nc files: the SEC header gives accessionNo and filedAt,
+      the <XML> block holds the document
+    - .tar (any compression, read as a stream) and .zip archives of either
+    - directories of any of the above
+
+XML is fed to an incremental pull parser in chunks; each owner, leg and footnote
+element is converted and cleared from the tree as soon as it closes, and archives
+are read member by member, so memory stays flat however many filings a source holds.
+
+A bare .xml file has no header: accessionNo is taken from the file or member name
+when it holds one (0000320193-25-000049 or 000032019325000049) and filedAt is None.
+
+    for filing in iter_filings("20250417.nc.tar.gz"):
+        ...
+    df = flatten_insider_payload(iter_filings("form4/"), engine="columnar")
+    df = parallel_flatten("form4/")          # shards the files across a process pool
+"""
+# std lib
+import io
+import os
+import re
+import tarfile
+import zipfile
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, NamedTuple
+from xml.etree.ElementTree import XMLPullParser
+from zoneinfo import ZoneInfo
+
+DOCUMENT_SUFFIXES = (".xml", ".txt", ".nc")
+ARCHIVE_SUFFIXES = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz", ".zip")
+SHARD_SIZE = 1_000
+CHUNK_SIZE = 1 << 16
+
+_EASTERN = ZoneInfo("America/New_York")   # EDGAR acceptance times are US Eastern
+_ACCESSION = re.compile(rb"ACCESSION[ -]NUMBER[:>]\s*(\d{10}-\d{2}-\d{6})")
+_ACCEPTED = re.compile(rb"<ACCEPTANCE-DATETIME>\s*(\d{14})")
+_FILED_DATE = re.compile(rb"FILED[ -]AS[ -]OF[ -]DATE[:>]\s*(\d{8})")
+_NAME_ACCESSION = re.compile(r"(\d{10})-?(\d{2})-?(\d{6})")
+_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+_XML_OPEN = re.compile(rb"<XML>", re.IGNORECASE)
+_XML_CLOSE = re.compile(rb"</XML>", re.IGNORECASE)
+
+# === XML -> sec-api mapping ===
+# XML tag -> sec-api key; tags not listed keep their name
+_RENAME = {
+    "transactionCoding": "coding",
+    "transactionFormType": "formType",
+    "transactionCode": "code",
+    "transactionAmounts": "amounts",
+    "transactionShares": "shares",
+    "transactionPricePerShare": "pricePerShare",
+    "transactionTotalValue": "totalValue",
+    "transactionAcquiredDisposedCode": "acquiredDisposedCode",
+    "underlyingSecurityTitle": "title",
+    "underlyingSecurityShares": "shares",
+    "underlyingSecurityValue": "value",
+    "issuerCik": "cik",
+    "issuerName": "name",
+    "issuerTradingSymbol": "tradingSymbol",
+    "rptOwnerCik": "cik",
+    "rptOwnerName": "name",
+    "rptOwnerStreet1": "street1",
+    "rptOwnerStreet2": "street2",
+    "rptOwnerCity": "city",
+    "rptOwnerState": "state",
+    "rptOwnerZipCode": "zipCode",
+    "rptOwnerStateDescription": "stateDescription",
+    "reportingOwnerAddress": "address",
+    "reportingOwnerRelationship": "relationship",
+}
+_NUMBERS = {"shares", "pricePerShare", "totalValue", "value", "conversionOrExercisePrice",
+            "sharesOwnedFollowingTransaction", "valueOwnedFollowingTransaction"}
+_FLAGS = {"isDirector", "isOfficer", "isTenPercentOwner", "isOther", "equitySwapInvolved",
+          "notSubjectToSection16", "aff10b5One"}
+_DATES = {"transactionDate", "deemedExecutionDate", "exerciseDate", "expirationDate",
+          "periodOfReport", "dateOfOriginalSubmission"}
+# leg tag -> (sec-api table key, list key)
+_LEGS = {
+    "nonDerivativeTransaction": ("nonDerivativeTable", "transactions"),
+    "nonDerivativeHolding": ("nonDerivativeTable", "holdings"),
+    "derivativeTransaction": ("derivativeTable", "transactions"),
+    "derivativeHolding": ("derivativeTable", "holdings"),
+}
+
+def _tag(elem) -> str:
+    tag = elem.tag
+    return tag.rpartition("}")[2] if tag[0] == "{" else tag
+
+def _text(elem) -> str | None:
+    text = ("".join(elem.itertext()) if len(elem) else elem.text or "").strip()
+    return text or None
+
+def _scalar(key: str, text: str | None):
+    if text is None:
+        return None
+    if key in _FLAGS:
+        return text.lower() in ("1", "true")
+    if key in _NUMBERS:
+        try:
+            num = float(text.replace(",", ""))
+        except ValueError:
+            return text
+        return int(num) if num.is_integer() and "." not in text else num
+    if key in _DATES and _DATE.match(text):
+        return text[:10]        # drop the occasional timezone suffix (2025-04-15-05:00)
+    if key == "cik":
+        return text.lstrip("0") or "0"
+    return text
+
+def _convert(elem) -> dict:
+    """
+    One element's children as a sec-api dict. <x><value>v</value></x> becomes x: v,
+    <footnoteId id="F1"/> under x becomes xFootnoteId: ["F1"] next to it, and elements
+    with children of their own become nested dicts.
+    """
+    out = {}
+    for child in elem:
+        tag = _tag(child)
+        if tag == "footnoteId":
+            continue            # collected by the parent, under the element's own key
+        key = _RENAME.get(tag, tag)
+        kids, notes = [], []
+        for c in child:
+            if _tag(c) == "footnoteId":
+                if c.get("id"):
+                    notes.append(c.get("id"))
+            else:
+                kids.append(c)
+        if kids and _tag(kids[0]) == "value":
+            value = _scalar(key, _text(kids[0]))
+        elif kids:
+            value = _convert(child)
+        else:
+            value = _scalar(key, _text(child))
+        if value is not None and value != {}:
+            out[key] = value
+        if notes:
+            out[f"{key}FootnoteId"] = notes
+    return out
+
+def _owner(elem) -> dict:
+    out = {}
+    for key, value in _convert(elem).items():
+        if key == "reportingOwnerId" and isinstance(value, dict):
+            out.update(value)   # cik, name at the owner level as in sec-api
+        else:
+            out[key] = value
+    return out
+# === End XML -> sec-api mapping ===
+
+# === Document parser ===
+class _DocumentParser:
+    """
+    Incremental ownershipDocument parser: feed() bytes, collect finished filings.
+    Owners, legs and footnotes are converted and cleared as their end tags arrive;
+    the small top-level fields are read when the document closes.
+    """
+
+    def __init__(self, meta: dict):
+        self._parser = XMLPullParser(events=("end",))
+        self._meta = meta
+        self._reset()
+        self.filings = []
+
+    def _reset(self) -> None:
+        self._owners, self._tables, self._notes = [], {}, []
+
+    def feed(self, data: bytes) -> None:
+        self._parser.feed(data)
+        self._drain()
+
+    def close(self) -> None:
+        self._parser.close()
+        self._drain()
+
+    def _drain(self) -> None:
+        for _, elem in self._parser.read_events():
+            tag = _tag(elem)
+            if tag in _LEGS:
+                table, kind = _LEGS[tag]
+                self._tables.setdefault(table, {}).setdefault(kind, []).append(_convert(elem))
+            elif tag == "footnote":
+                self._notes.append({"id": elem.get("id"), "text": _text(elem)})
+            elif tag == "reportingOwner":
+                self._owners.append(_owner(elem))
+            elif tag == "ownershipDocument":
+                self.filings.append(self._finish(elem))
+                self._reset()
+            else:
+                continue
+            elem.clear()
+
+    def _finish(self, root) -> dict:
+        filing = {"id": self._meta.get("accessionNo"), **self._meta}
+        rest = {}
+        for child in root:
+            tag = _tag(child)
+            if tag in ("reportingOwner", "nonDerivativeTable", "derivativeTable", "footnotes"):
+                continue        # already converted
+            if tag == "ownerSignature":
+                sig = _convert(child)
+                rest.setdefault("ownerSignatureName", sig.get("signatureName"))
+                rest.setdefault("ownerSignatureNameDate", sig.get("signatureDate"))
+            elif tag in ("schemaVersion", "documentType", "periodOfReport", "notSubjectToSection16"):
+                filing[tag] = _scalar(tag, _text(child))
+            else:
+                rest[tag] = _convert(child) if len(child) else _scalar(tag, _text(child))
+        if len(self._owners) == 1:
+            filing["reportingOwner"] = self._owners[0]
+        elif self._owners:
+            filing["reportingOwners"] = self._owners
+        filing.update(self._tables)
+        if self._notes:
+            filing["footnotes"] = self._notes
+        filing.update(rest)
+        return filing
+# === End Document parser ===
+
+# === Readers ===
+def _name_meta(name: str) -> dict:
+    m = _NAME_ACCESSION.search(os.path.basename(name)) or _NAME_ACCESSION.search(name)
+    return {"accessionNo": "-".join(m.groups()) if m else None, "filedAt": None}
+
+def _header_meta(header: bytes, name: str) -> dict:
+    meta = _name_meta(name)
+    if m := _ACCESSION.search(header):
+        meta["accessionNo"] = m.group(1).decode()
+    if m := _ACCEPTED.search(header):
+        when = datetime.strptime(m.group(1).decode(), "%Y%m%d%H%M%S").replace(tzinfo=_EASTERN)
+        meta["filedAt"] = when.isoformat()
+    elif m := _FILED_DATE.search(header):
+        d = m.group(1).decode()
+        meta["filedAt"] = f"{d[:4]}-{d[4:6]}-{d[6:]}"
+    return meta
+
+def _read_xml(stream: BinaryIO, name: str) -> Iterator[dict]:
+    parser = _DocumentParser(_name_meta(name))
+    while chunk := stream.read(CHUNK_SIZE):
+        parser.feed(chunk)
+        yield from parser.filings
+        parser.filings.clear()
+    parser.close()
+    yield from parser.filings
+
+def _read_submission(stream: BinaryIO, name: str) -> Iterator[dict]:
+    """A full submission: the SGML header, then documents; only <XML> blocks are parsed."""
+    meta, parser, fresh, buf = None, None, False, b""
+    while True:
+        chunk = stream.read(CHUNK_SIZE)
+        buf += chunk
+        while True:
+            if parser is None:
+                m = _XML_OPEN.search(buf)
+                if meta is None and (m or b"</SEC-HEADER>" in buf or not chunk):
+                    meta = _header_meta(buf[:m.start()] if m else buf, name)
+                if m is None:
+                    if meta is not None:
+                        buf = buf[-4:]          # non-XML documents: keep only a split tag
+                    break
+                parser, fresh, buf = _DocumentParser(meta), True, buf[m.end():]
+            if fresh:
+                buf = buf.lstrip()              # the XML declaration must come first
+                if not buf and chunk:
+                    break
+                fresh = False
+            m = _XML_CLOSE.search(buf)
+            if m is None:
+                cut = max(0, len(buf) - 5) if chunk else len(buf)
+                parser.feed(buf[:cut])
+                buf = buf[cut:]
+                if not chunk:
+                    parser.close()
+                yield from parser.filings
+                parser.filings.clear()
+                break
+            parser.feed(buf[:m.start()])
+            parser.close()
+            yield from parser.filings
+            parser, buf = None, buf[m.end():]
+        if not chunk:
+            return
+
+def _read_document(stream: BinaryIO, name: str) -> Iterator[dict]:
+    if name.lower().endswith(".xml"):
+        yield from _read_xml(stream, name)
+    else:
+        yield from _read_submission(stream, name)
+
+def _is_document(name: str) -> bool:
+    return name.lower().endswith(DOCUMENT_SUFFIXES)
+
+def is_archive(path: str | os.PathLike) -> bool:
+    return str(path).lower().endswith(ARCHIVE_SUFFIXES)
+
+def is_edgar_source(path: str | os.PathLike) -> bool:
+    """True for paths this module reads: documents, archives and directories."""
+    path = Path(path)
+    return path.is_dir() or _is_document(path.name) or is_archive(path)
+
+def _expand(source) -> Iterator[Path]:
+    """Files of source (a path or an iterable of paths), directories walked in name order."""
+    paths = [source] if isinstance(source, (str, os.PathLike)) else source
+    for p in map(Path, paths):
+        if p.is_dir():
+            yield from (f for f in sorted(p.rglob("*"))
+                        if f.is_file() and (_is_document(f.name) or is_archive(f)))
+        else:
+            yield p
+
+def _tar_members(path: Path) -> Iterator[tuple[str, BinaryIO]]:
+    with tarfile.open(path, "r|*") as tar:      # stream mode: one pass, no member index
+        for member in tar:
+            if member.isfile() and _is_document(member.name):
+                yield member.name, tar.extractfile(member)
+            tar.members = []    # TarFile keeps every header it has read otherwise
+
+def iter_filings(source: str | os.PathLike | Iterable[str | os.PathLike] | BinaryIO,
+                 name: str = "") -> Iterator[dict]:
+    """
+    Yield sec-api shaped filings one at a time from a document, archive or directory
+    path, an iterable of paths, or an open binary stream (name tells .xml from a
+    submission and may carry the accession number).
+    """
+    if hasattr(source, "read"):
+        yield from _read_document(source, name or getattr(source, "name", "") or ".xml")
+        return
+    for path in _expand(source):
+        lower = path.name.lower()
+        if lower.endswith(".zip"):
+            with zipfile.ZipFile(path) as zf:
+                for info in zf.infolist():
+                    if not info.is_dir() and _is_document(info.filename):
+                        with zf.open(info) as f:
+                            yield from _read_document(f, info.filename)
+        elif is_archive(path):
+            for member, f in _tar_members(path):
+                yield from _read_document(f, member)
+        else:
+            with open(path, "rb") as f:
+                yield from _read_document(f, str(path))
+# === End Readers ===
+
+# === Sharding ===
+class XmlShard(NamedTuple):
+    """
+    A backfill work unit: document paths, member names of one zip archive, or
+    (name, bytes) documents already read out of a tar stream.
+    """
+    archive: str | None
+    members: tuple
+
+def read_shard(shard: XmlShard) -> Iterator[dict]:
+    if shard.archive is not None:
+        with zipfile.ZipFile(shard.archive) as zf:
+            for member in shard.members:
+                with zf.open(member) as f:
+                    yield from _read_document(f, member)
+        return
+    for member in shard.members:
+        if isinstance(member, tuple):
+            yield from _read_document(io.BytesIO(member[1]), member[0])
+        else:
+            with open(member, "rb") as f:
+                yield from _read_document(f, member)
+
+def _batched(items: Iterable, size: int) -> Iterator[tuple]:
+    it = iter(items)
+    while batch := tuple(islice(it, size)):
+        yield batch
+
+def shards(source, size: int = SHARD_SIZE) -> Iterator[XmlShard]:
+    """
+    Split source into XmlShards of up to size documents. Files and zip members are
+    named and opened by the workers; tar archives cannot be seeked, so their
+    members are read here (decompression only) and shipped as bytes.
+    """
+    files = []
+    for path in _expand(source):
+        lower = path.name.lower()
+        if lower.endswith(".zip"):
+            with zipfile.ZipFile(path) as zf:
+                names = [i.filename for i in zf.infolist() if not i.is_dir() and _is_document(i.filename)]
+            yield from (XmlShard(str(path), b) for b in _batched(names, size))
+        elif is_archive(path):
+            docs = ((name, f.read()) for name, f in _tar_members(path))
+            yield from (XmlShard(None, b) for b in _batched(docs, size))
+        else:
+            files.append(str(path))
+            if len(files) == size:
+                yield XmlShard(None, tuple(files))
+                files = []
+    if files:
+        yield XmlShard(None, tuple(files))
+# === End Sharding ===
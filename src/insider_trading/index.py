@@ -0,0 +1,236 @@
+"""
+In-memory query index over flattened legs.
+
+Rows are kept in the order batches arrive, each batch reordered by (filedAt,
+accessionNo), so a filing's legs are contiguous. Index structures:
+- one posting list (filedAt, row) over all rows, for pure time-range queries
+- a posting list per issuer_symbol, issuer_cik and owner_cik value
+- accessionNo -> row slices
+- dictionary codes per key column plus direction, to verify extra filters
+
+Posting lists are numpy arrays kept sorted by filedAt. Batches arriving in time order
+only append; an older batch marks the touched lists unsorted and each is re-sorted once,
+on its next query. A query picks the shortest posting list among its key filters,
+binary-searches the filedAt range in it and checks the other filters on just those
+candidates: O(log n + k) for k candidates, independent of the history size.
+
+    index = LegIndex()
+    index.extend(flatten_insider_payload(filings, engine="columnar"))
+    index.query(issuer_symbol="AAPL", direction="BUYish", last_days=30)
+"""
+# std lib
+from typing import Iterable
+
+# packages
+import numpy as np
+import pandas as pd
+
+KEY_COLS = ("issuer_symbol", "issuer_cik", "owner_cik")
+_CODE_COLS = (*KEY_COLS, "direction")
+_NS_PER_DAY = 86_400 * 10**9
+
+def _grow(a: np.ndarray, need: int) -> np.ndarray:
+    if need <= len(a):
+        return a
+    out = np.empty(max(need, 2 * len(a), 16), dtype=a.dtype)
+    out[:len(a)] = a
+    return out
+
+def _utc_ns(values) -> np.ndarray:
+    """filedAt (ISO strings or datetimes) as int64 UTC nanoseconds; missing -> int64 min."""
+    ts = values if isinstance(getattr(values, "dtype", None), pd.DatetimeTZDtype) else \
+        pd.to_datetime(pd.Series(values, dtype=object), utc=True, errors="coerce", format="ISO8601")
+    ns = ts.dt.as_unit("ns").to_numpy(dtype="datetime64[ns]").astype(np.int64)
+    return ns
+
+def _bound_ns(ts) -> int | None:
+    if ts is None:
+        return None
+    ts = pd.Timestamp(ts)
+    ts = ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+    return ts.as_unit("ns").value
+
+class _Postings:
+    """Row positions of one key, ordered by filedAt (re-sorted lazily after late rows)."""
+
+    __slots__ = ("times", "rows", "n", "sorted")
+
+    def __init__(self):
+        self.times = np.empty(0, dtype=np.int64)
+        self.rows = np.empty(0, dtype=np.int64)
+        self.n = 0
+        self.sorted = True
+
+    def __len__(self) -> int:
+        return self.n
+
+    def extend(self, times: np.ndarray, rows: np.ndarray) -> None:
+        k = len(times)
+        if not k:
+            return
+        if self.n and times[0] < self.times[self.n - 1]:
+            self.sorted = False
+        self.times = _grow(self.times, self.n + k)
+        self.rows = _grow(self.rows, self.n + k)
+        self.times[self.n:self.n + k] = times
+        self.rows[self.n:self.n + k] = rows
+        self.n += k
+
+    def range(self, lo: int | None, hi: int | None) -> np.ndarray:
+        """Rows with lo <= filedAt < hi, in filedAt order."""
+        n = self.n
+        if not self.sorted:
+            order = np.argsort(self.times[:n], kind="stable")
+            self.times[:n] = self.times[:n][order]
+            self.rows[:n] = self.rows[:n][order]
+            self.sorted = True
+        t = self.times[:n]
+        i = 0 if lo is None else np.searchsorted(t, lo, side="left")
+        j = n if hi is None else np.searchsorted(t, hi, side="left")
+        return self.rows[i:j]
+
+class LegIndex:
+    """Append-only leg history with logarithmic lookups; see the module docstring."""
+
+    def __init__(self):
+        self._chunks: list[pd.DataFrame] = []
+        self._offsets = [0]                                     # first row of each chunk
+        self._all = _Postings()
+        self._postings = {c: {} for c in KEY_COLS}              # column -> value -> _Postings
+        self._dicts = {c: {} for c in _CODE_COLS}               # column -> value -> code
+        self._values = {c: [] for c in _CODE_COLS}              # column -> code -> value
+        self._codes = {c: np.empty(0, dtype=np.int32) for c in _CODE_COLS}
+        self._filings: dict[str, list[tuple[int, int]]] = {}    # accessionNo -> [(start, stop)]
+
+    def __len__(self) -> int:
+        return self._offsets[-1]
+
+    # --- Building ---
+    def _encode(self, col: str, values: np.ndarray) -> np.ndarray:
+        """Batch values -> stable int codes (keys compared as str, so CIKs match across schemas)."""
+        mapping, names = self._dicts[col], self._values[col]
+        codes, uniques = pd.factorize(values, use_na_sentinel=True)
+        remap = np.empty(len(uniques) + 1, dtype=np.int32)
+        remap[-1] = -1
+        for i, u in enumerate(uniques):
+            key = str(u)
+            if key not in mapping:
+                mapping[key] = len(names)
+                names.append(key)
+            remap[i] = mapping[key]
+        return remap[codes]
+
+    def extend(self, df: pd.DataFrame) -> int:
+        """Add a batch of flattened legs (default or compact schema). Returns rows added."""
+        if df is None or df.empty:
+            return 0
+        times = _utc_ns(df["filedAt"])
+        acc = df["accessionNo"].astype(object).astype(str).to_numpy()
+        order = np.lexsort((acc, times))
+        batch = df.iloc[order].reset_index(drop=True)
+        times, acc = times[order], acc[order]
+
+        start, k = len(self), len(batch)
+        rows = np.arange(start, start + k, dtype=np.int64)
+        self._all.extend(times, rows)
+        for col in _CODE_COLS:
+            codes = self._encode(col, batch[col]) if col in batch.columns else \
+                np.full(k, -1, dtype=np.int32)
+            arr = _grow(self._codes[col], start + k)
+            arr[start:start + k] = codes
+            self._codes[col] = arr
+            if col in self._postings:
+                names = self._values[col]
+                grouped = pd.Series(np.arange(k)).groupby(codes, sort=False).indices
+                for code, idx in grouped.items():
+                    if code < 0:
+                        continue
+                    self._postings[col].setdefault(names[code], _Postings()).extend(times[idx], rows[idx])
+
+        # accessionNo -> contiguous slices (the batch is ordered by filedAt, accessionNo)
+        change = np.flatnonzero(acc[1:] != acc[:-1]) + 1
+        for lo, hi in zip(np.r_[0, change], np.r_[change, k]):
+            self._filings.setdefault(acc[lo], []).append((start + int(lo), start + int(hi)))
+
+        self._chunks.append(batch)
+        self._offsets.append(start + k)
+        return k
+
+    # --- Row access ---
+    def take(self, rows: Iterable[int], columns: list[str] | None = None) -> pd.DataFrame:
+        """Rows by global position, in the order given."""
+        rows = np.asarray(rows, dtype=np.int64)
+        if not len(rows):
+            cols = columns or (list(self._chunks[0].columns) if self._chunks else [])
+            return pd.DataFrame(columns=cols)
+        chunk = np.searchsorted(self._offsets, rows, side="right") - 1
+        parts, where = [], []
+        for c in np.unique(chunk):
+            sel = np.flatnonzero(chunk == c)
+            frame = self._chunks[c] if columns is None else self._chunks[c][columns]
+            parts.append(frame.iloc[rows[sel] - self._offsets[c]])
+            where.append(sel)
+        out = pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0].reset_index(drop=True)
+        if len(parts) > 1:
+            out = out.iloc[np.argsort(np.concatenate(where), kind="stable")].reset_index(drop=True)
+        return out
+
+    def filing(self, accessionNo: str) -> pd.DataFrame:
+        """Every leg of one filing."""
+        slices = self._filings.get(accessionNo, [])
+        rows = np.concatenate([np.arange(a, b) for a, b in slices]) if slices else []
+        return self.take(rows)
+
+    # --- Queries ---
+    def positions(self, issuer_symbol=None, issuer_cik=None, owner_cik=None, direction=None,
+                  filed_from=None, filed_to=None, last_days: float | None = None, now=None) -> np.ndarray:
+        """
+        Row positions matching every given filter, newest filing first.
+        - filed_from (inclusive) / filed_to (exclusive): filedAt bounds, naive = UTC
+        - last_days: shorthand for filed_from = now - last_days (now defaults to the clock)
+        """
+        lo, hi = _bound_ns(filed_from), _bound_ns(filed_to)
+        if last_days is not None:
+            ref = _bound_ns(now if now is not None else pd.Timestamp.now(tz="UTC"))
+            since = ref - int(last_days * _NS_PER_DAY)
+            lo = since if lo is None else max(lo, since)
+
+        filters = {c: v for c, v in (("issuer_symbol", issuer_symbol), ("issuer_cik", issuer_cik),
+                                     ("owner_cik", owner_cik)) if v is not None}
+        candidates = []
+        for col, value in filters.items():
+            values = [value] if isinstance(value, (str, int)) else list(value)
+            lists = [self._postings[col].get(str(v)) for v in values]
+            candidates.append((sum(len(p) for p in lists if p is not None), col, lists))
+        if candidates:
+            _, driver, lists = min(candidates, key=lambda c: c[0])
+            runs = [p.range(lo, hi) for p in lists if p is not None]
+            rows = np.concatenate(runs) if runs else np.empty(0, dtype=np.int64)
+            if len(runs) > 1:
+                rows = np.sort(rows)   # rows of several keys: back to arrival order
+                times = self._all_times(rows)
+                rows = rows[np.argsort(times, kind="stable")]
+        else:
+            driver, rows = None, self._all.range(lo, hi)
+
+        # Remaining filters on the k candidates only
+        checks = {c: v for c, v in filters.items() if c != driver}
+        if direction is not None:
+            checks["direction"] = direction
+        for col, value in checks.items():
+            values = [value] if isinstance(value, (str, int)) else list(value)
+            codes = [self._dicts[col][str(v)] for v in values if str(v) in self._dicts[col]]
+            rows = rows[np.isin(self._codes[col][rows], codes)]
+        return rows[::-1]
+
+    def _all_times(self, rows: np.ndarray) -> np.ndarray:
+        p = self._all
+        if p.sorted and p.n and (p.rows[:p.n] == np.arange(p.n)).all():
+            return p.times[rows]
+        lookup = np.empty(p.n, dtype=np.int64)
+        lookup[p.rows[:p.n]] = p.times[:p.n]
+        return lookup[rows]
+
+    def query(self, columns: list[str] | None = None, **filters) -> pd.DataFrame:
+        """positions(**filters) as a DataFrame, newest filing first."""
+        return self.take(self.positions(**filters), columns)
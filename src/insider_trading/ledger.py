@@ -0,0 +1,316 @@
+"""
+Per-insider position ledger built from post_shares.
+
+Positions are keyed by (owner_cik, issuer_cik, securityTitle, directOrIndirect). Each
+position keeps its legs ordered by (transactionDate, filedAt, accessionNo, leg_no):
+a leg arriving in order is an amortised O(1) append; a late one is a bisect plus a list
+insert, O(legs in the position). Either way only its neighbour is rechecked. Per-year sold/acquired totals are maintained on every change,
+so "fraction of the stake sold this year" never rescans history.
+
+A gap is a leg whose post_shares differs from the previous leg's post_shares plus the
+signed shares of this leg (missing filing, unreported leg, split, ...). Holding rows
+(nonDeriv_hold / deriv_hold) only restate post_shares and are never flagged, and
+neither are derivative positions: their tranches share a securityTitle but report
+separate balances.
+An amendment (documentType ending in /A) replaces the earlier filed legs of the same
+position and transactionDate. The replaced legs are remembered (and saved with the
+snapshot), so re-applying the original filing later does not bring them back.
+"""
+# std lib
+import bisect
+import os
+from collections import defaultdict
+from pathlib import Path
+from typing import NamedTuple
+
+# packages
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+GAP_TOLERANCE = 0.01    # shares
+SELL_CODES = ("S",)
+
+class PositionKey(NamedTuple):
+    owner_cik: str
+    issuer_cik: str
+    securityTitle: str | None
+    directOrIndirect: str | None
+
+class Entry(NamedTuple):
+    transactionDate: str      # sort key first
+    filed_utc: str
+    accessionNo: str
+    leg_no: int
+    code: str | None
+    acq_disp: str | None
+    shares: float
+    post_shares: float
+    holding: bool             # holding row: restates post_shares, no change
+
+    @property
+    def delta(self) -> float:
+        if self.holding or self.shares != self.shares:
+            return 0.0
+        return -self.shares if self.acq_disp == "D" else self.shares if self.acq_disp == "A" else 0.0
+
+_ENTRY_FIELDS = Entry._fields
+_KEY_FIELDS = PositionKey._fields
+
+def _num(v) -> float:
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return float("nan")
+
+def _str(v) -> str | None:
+    return None if v is None or v != v else str(v)
+
+class Position:
+    """Legs of one key in date order, with gap flags and per-year totals."""
+
+    __slots__ = ("entries", "ids", "superseded", "gaps", "years", "derivative")
+
+    def __init__(self, derivative: bool = False):
+        self.entries: list[Entry] = []
+        self.ids: set[tuple[str, int]] = set()
+        self.superseded: set[tuple[str, int]] = set()   # legs replaced by an amendment
+        self.gaps: dict[tuple[str, int], float] = {}
+        self.years: dict[str, list[float]] = defaultdict(lambda: [0.0, 0.0])   # year -> [sold, acquired]
+        self.derivative = derivative
+
+    @property
+    def shares(self) -> float:
+        return self.entries[-1].post_shares if self.entries else 0.0
+
+    def _totals(self, e: Entry, sign: int) -> None:
+        if e.holding or e.shares != e.shares:
+            return
+        year = self.years[e.transactionDate[:4]]
+        if e.acq_disp == "D" and e.code in SELL_CODES:
+            year[0] += sign * e.shares
+        elif e.acq_disp == "A":
+            year[1] += sign * e.shares
+
+    def _check(self, i: int) -> None:
+        """Recompute the gap flag of entries[i] against entries[i - 1]."""
+        if not 0 <= i < len(self.entries):
+            return
+        e = self.entries[i]
+        ident = (e.accessionNo, e.leg_no)
+        gap = 0.0
+        if i > 0 and not e.holding and not self.derivative:
+            gap = e.post_shares - (self.entries[i - 1].post_shares + e.delta)
+        if gap == gap and abs(gap) > GAP_TOLERANCE:
+            self.gaps[ident] = gap
+        else:
+            self.gaps.pop(ident, None)
+
+    def add(self, e: Entry) -> bool:
+        ident = (e.accessionNo, e.leg_no)
+        if ident in self.ids or ident in self.superseded:
+            return False
+        if not self.entries or e >= self.entries[-1]:
+            i = len(self.entries)
+            self.entries.append(e)          # the common, in-order case
+        else:
+            i = bisect.bisect_right(self.entries, e)
+            self.entries.insert(i, e)
+        self.ids.add(ident)
+        self._totals(e, +1)
+        self._check(i)
+        self._check(i + 1)
+        return True
+
+    def remove_at(self, i: int) -> Entry:
+        e = self.entries.pop(i)
+        self.ids.discard((e.accessionNo, e.leg_no))
+        self.gaps.pop((e.accessionNo, e.leg_no), None)
+        self._totals(e, -1)
+        self._check(i)
+        return e
+
+    def supersede(self, e: Entry) -> int:
+        """Drop legs of e's transactionDate filed before e under another accession."""
+        lo = bisect.bisect_left(self.entries, (e.transactionDate,))
+        hi = bisect.bisect_left(self.entries, (e.transactionDate + "\x00",))
+        drop = [i for i in range(lo, hi)
+                if self.entries[i].accessionNo != e.accessionNo and self.entries[i].filed_utc < e.filed_utc]
+        for i in reversed(drop):
+            removed = self.remove_at(i)
+            self.superseded.add((removed.accessionNo, removed.leg_no))
+        return len(drop)
+
+    def held_before(self, date: str) -> float | None:
+        """post_shares of the last leg before date, or the holding implied by the first leg on/after it."""
+        i = bisect.bisect_left(self.entries, (date,))
+        if i > 0:
+            return self.entries[i - 1].post_shares
+        if i < len(self.entries):
+            first = self.entries[i]
+            return first.post_shares if first.holding else first.post_shares - first.delta
+        return None
+
+class Ledger:
+    """
+        ledger = Ledger.load("ledger.arrow") if os.path.exists("ledger.arrow") else Ledger()
+        ledger.apply(flatten_insider_payload(filings, engine="columnar"))
+        ledger.fraction_sold("1214156", "320193", "2025")
+        ledger.save("ledger.arrow")
+    """
+
+    def __init__(self):
+        self.positions: dict[PositionKey, Position] = {}
+        self._by_insider: dict[tuple[str, str], set[PositionKey]] = defaultdict(set)
+
+    def __len__(self) -> int:
+        return sum(len(p.entries) for p in self.positions.values())
+
+    @property
+    def superseded(self) -> int:
+        """Legs replaced by amendments."""
+        return sum(len(p.superseded) for p in self.positions.values())
+
+    # --- Updates ---
+    def add(self, key: PositionKey, entry: Entry, amendment: bool = False, derivative: bool = False) -> bool:
+        pos = self.positions.get(key)
+        if pos is None:
+            pos = self.positions[key] = Position(derivative)
+            self._by_insider[key.owner_cik, key.issuer_cik].add(key)
+        if amendment:
+            pos.supersede(entry)
+        return pos.add(entry)
+
+    def apply(self, df: pd.DataFrame) -> int:
+        """
+        Add every leg of a flattened frame; already applied legs are ignored. Legs are
+        numbered in frame order per (accessionNo, owner_cik), so pass whole filings.
+        Returns the number of legs added.
+        """
+        if df is None or df.empty:
+            return 0
+        filed = pd.to_datetime(pd.Series(df["filedAt"], dtype=object), utc=True, errors="coerce",
+                               format="ISO8601").dt.strftime("%Y-%m-%dT%H:%M:%S").fillna("")
+        # Legs keep their order within a filing; number them per (accession, owner)
+        leg_no = df.groupby([df["accessionNo"].astype(str), df["owner_cik"].astype(str)],
+                            sort=False).cumcount()
+        cols = ("owner_cik", "issuer_cik", "securityTitle", "directOrIndirect", "transactionDate",
+                "accessionNo", "code", "acq_disp", "shares", "post_shares", "table", "documentType")
+        added = 0
+        for (owner, issuer, title, doi, tdate, acc, code, ad, sh, post, table, doc), f, n in zip(
+                zip(*(df[c].to_numpy() for c in cols)), filed.to_numpy(), leg_no.to_numpy()):
+            post = _num(post)
+            if post != post or owner is None or issuer is None:
+                continue
+            key = PositionKey(str(owner), str(issuer), _str(title), _str(doi))
+            table = str(table)
+            entry = Entry(_str(tdate) or f[:10], f, str(acc), int(n), _str(code), _str(ad),
+                          _num(sh), post, table.endswith("_hold"))
+            added += self.add(key, entry, amendment=str(doc).endswith("/A"),
+                              derivative=table.startswith("deriv"))
+        return added
+
+    # --- Queries ---
+    def position(self, owner_cik, issuer_cik, securityTitle, directOrIndirect) -> Position | None:
+        return self.positions.get(PositionKey(str(owner_cik), str(issuer_cik), securityTitle, directOrIndirect))
+
+    def holdings(self, owner_cik, issuer_cik) -> dict[PositionKey, float]:
+        """Latest post_shares of every position of one insider in one issuer."""
+        keys = self._by_insider.get((str(owner_cik), str(issuer_cik)), ())
+        return {k: self.positions[k].shares for k in keys}
+
+    def fraction_sold(self, owner_cik, issuer_cik, year, securityTitle: str | None = None,
+                      derivative: bool = False) -> float:
+        """
+        Shares sold (code S) in year / (shares held at the start of year + acquired in year),
+        summed over the insider's non-derivative positions (or only securityTitle).
+        """
+        year = str(year)
+        sold = basis = 0.0
+        for k in self._by_insider.get((str(owner_cik), str(issuer_cik)), ()):
+            pos = self.positions[k]
+            if pos.derivative != derivative or (securityTitle is not None and k.securityTitle != securityTitle):
+                continue
+            if year not in pos.years:
+                continue
+            s, a = pos.years[year]
+            sold += s
+            basis += (pos.held_before(f"{year}-01-01") or 0.0) + a
+        return sold / basis if basis > 0 else 0.0
+
+    def gaps(self) -> pd.DataFrame:
+        """Every flagged leg with the unexplained difference in shares."""
+        rows = []
+        for k, pos in self.positions.items():
+            for e in pos.entries:
+                gap = pos.gaps.get((e.accessionNo, e.leg_no))
+                if gap is not None:
+                    rows.append({**k._asdict(), "transactionDate": e.transactionDate,
+                                 "accessionNo": e.accessionNo, "code": e.code, "shares": e.shares,
+                                 "post_shares": e.post_shares, "gap": gap})
+        return pd.DataFrame(rows, columns=[*_KEY_FIELDS, "transactionDate", "accessionNo", "code",
+                                           "shares", "post_shares", "gap"])
+
+    # --- Snapshots ---
+    def save(self, path: str | os.PathLike) -> None:
+        """
+        Write every position's entries, in ledger order, to one Arrow IPC file. Superseded
+        legs follow their position's entries as rows with superseded=True and only
+        accessionNo / leg_no set.
+        """
+        cols = {c: [] for c in (*_KEY_FIELDS, "derivative", "superseded", *_ENTRY_FIELDS)}
+        for k, pos in self.positions.items():
+            n, m = len(pos.entries), len(pos.superseded)
+            for c, v in zip(_KEY_FIELDS, k):
+                cols[c].extend([v] * (n + m))
+            cols["derivative"].extend([pos.derivative] * (n + m))
+            cols["superseded"].extend([False] * n + [True] * m)
+            for c, vals in zip(_ENTRY_FIELDS, zip(*pos.entries)):
+                cols[c].extend(vals)
+            for c in _ENTRY_FIELDS:
+                if c not in ("accessionNo", "leg_no"):
+                    cols[c].extend([None] * m)
+            for acc, leg_no in sorted(pos.superseded):
+                cols["accessionNo"].append(acc)
+                cols["leg_no"].append(leg_no)
+        table = pa.table({
+            **{c: pa.array(cols[c], pa.string()) for c in (*_KEY_FIELDS, "transactionDate", "filed_utc",
+                                                          "accessionNo", "code", "acq_disp")},
+            "derivative": pa.array(cols["derivative"], pa.bool_()),
+            "superseded": pa.array(cols["superseded"], pa.bool_()),
+            "leg_no": pa.array(cols["leg_no"], pa.int32()),
+            "shares": pa.array(cols["shares"], pa.float64()),
+            "post_shares": pa.array(cols["post_shares"], pa.float64()),
+            "holding": pa.array(cols["holding"], pa.bool_()),
+        })
+        path = Path(path)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with pa.OSFile(str(tmp), "wb") as sink, ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str | os.PathLike) -> "Ledger":
+        """
+        Rebuild from save(). Entries are stored sorted per position, so this is a linear
+        pass of appends; gap flags and per-year totals are recomputed on the way.
+        """
+        with pa.memory_map(str(path), "r") as source:
+            data = ipc.open_file(source).read_all().to_pydict()
+        ledger = cls()
+        keys = zip(*(data[c] for c in _KEY_FIELDS))
+        entries = zip(*(data[c] for c in _ENTRY_FIELDS))
+        superseded = data.get("superseded") or [False] * len(data["derivative"])   # older snapshots
+        last_key, pos = None, None
+        for k, e, deriv, sup in zip(keys, entries, data["derivative"], superseded):
+            if k != last_key:
+                key = PositionKey(*k)
+                pos = ledger.positions[key] = Position(deriv)
+                ledger._by_insider[key.owner_cik, key.issuer_cik].add(key)
+                last_key = k
+            e = Entry(*e)
+            if sup:
+                pos.superseded.add((e.accessionNo, e.leg_no))
+            else:
+                pos.add(e)
+        return ledger
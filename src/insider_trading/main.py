@@ -1,4 +1,149 @@
+# std lib
+import argparse
+import asyncio
+import os
+import sys
+
+# local lib
+from insider_trading.metrics import METRICS, profiled, serve_metrics
+from insider_trading.poller import PollerConfig, SecApiPoller, SEC_API_URL, symbol_query
+from insider_trading.seen import SeenIndex
+
+
+def _parse_args(argv=None) -> argparse.Namespace:
+    from insider_trading.cli import add_common_arguments, add_poll_arguments
+
+    ap = argparse.ArgumentParser(prog="insider_trading",
+                                 description="Poll sec-api.io for insider trades and score them.")
+    add_poll_arguments(ap)
+    add_common_arguments(ap)
+    return ap.parse_args(argv)
+
+def flatten_handler(sink=print, store=None, engine=None, ledger=None, dispatcher=None, index=None,
+                    validate: bool = False):
+    """
+    Handler that flattens each arriving page, appends it to the leg store and the
+    position ledger (if any), scores the new legs against the running cluster window,
+    adds the scored legs to the query index (if any) and passes one line per leg to
+    sink. With a dispatcher the handler is async and waits on the alert queue, so slow
+    delivery slows the poller down. validate=True also checks every filing against the
+    strict SECTransaction model; failures are counted and logged, the legs still flow.
+    Stage timings and counts go to METRICS.
+    """
+    from flattener import fallback_hits, flatten_insider_payload
+    from insider_trading.scoring import ScoringEngine
+
+    engine = engine or ScoringEngine()
+
+    def handle(query: str, filings: list[dict]):
+        METRICS.inc("filings_total", len(filings))
+        if validate:
+            _validate(filings)
+        before = fallback_hits()
+        with METRICS.timer("flatten"):
+            df = flatten_insider_payload(filings, engine="columnar", footnotes=True)
+        after = fallback_hits()
+        METRICS.inc("legs_total", len(df))
+        for kind in after:
+            METRICS.inc("schema_fallbacks_total", after[kind] - before[kind], lookup=kind)
+        if store is not None:
+            store.append(df)
+        if ledger is not None:
+            ledger.apply(df)
+        with METRICS.timer("score"):
+            df = engine.update(df)
+        if index is not None:
+            index.extend(df)
+        for r in df.itertuples(index=False):
+            sink(f"{r.filedAt} {r.issuer_symbol or '?':<6} {r.owner_name or '':<30} {r.direction:<11} "
+                 f"{r.shares:>12,.0f} @ {r.pricePerShare:>10.2f}  role={r.role_score:.2f}  "
+                 f"score={r.score:+.2f} {r.label}")
+        return df
+
+    if dispatcher is None:
+        return handle
+
+    async def handle_and_notify(query: str, filings: list[dict]) -> None:
+        await dispatcher.submit(handle(query, filings))
+    return handle_and_notify
+
+def _validate(filings: list[dict]) -> None:
+    from pydantic import ValidationError
+    from insider_trading.types.sec_filings import SECTransaction
+
+    with METRICS.timer("validate"):
+        for f in filings:
+            try:
+                SECTransaction.model_validate(f)
+            except ValidationError as e:
+                METRICS.inc("validation_errors_total")
+                print(f"[validate] {f.get('accessionNo')}: {e.error_count()} errors", file=sys.stderr)
+
+async def _run(config: PollerConfig, rounds: int | None, seen: SeenIndex | None,
+               store=None, ledger=None, sinks=None, notify_config=None,
+               validate: bool = False, metrics_port: int | None = None) -> None:
+    runner = await serve_metrics(port=metrics_port) if metrics_port else None
+    try:
+        if not sinks:
+            handler = flatten_handler(store=store, ledger=ledger, validate=validate)
+            async with SecApiPoller(config, handler, seen=seen) as poller:
+                await poller.run(rounds=rounds)
+            return
+        from insider_trading.notify import Dispatcher
+        async with Dispatcher(sinks, notify_config) as dispatcher:
+            handler = flatten_handler(store=store, ledger=ledger, dispatcher=dispatcher, validate=validate)
+            async with SecApiPoller(config, handler, seen=seen) as poller:
+                await poller.run(rounds=rounds)
+        for name, s in dispatcher.stats().items():
+            print(f"[notify] {name}: {s}")
+    finally:
+        if runner is not None:
+            await runner.cleanup()
+
+def run(args: argparse.Namespace) -> int:
+    """The poll command: args as built by cli.add_poll_arguments."""
+    queries = [symbol_query(s) for s in args.symbols] + args.query
+    if not queries:
+        print("nothing to poll: pass ticker symbols or --query")
+        return 2
+    config = PollerConfig(
+        api_key=args.api_key, url=args.url or SEC_API_URL, queries=queries, interval=args.interval,
+        rate_per_sec=args.rate, max_pages=args.pages, page_size=args.page_size,
+    )
+    seen = SeenIndex(args.seen_db) if args.seen_db else None
+    store = None
+    if args.store:
+        from insider_trading.store import LegStore
+        store = LegStore(args.store)
+    ledger = None
+    if args.ledger:
+        from insider_trading.ledger import Ledger
+        ledger = Ledger.load(args.ledger) if os.path.exists(args.ledger) else Ledger()
+    sinks, notify_config = [], None
+    if args.webhook or args.alerts_file:
+        from insider_trading.notify import FileSink, NotifierConfig, WebhookSink
+        sinks = [WebhookSink(url) for url in args.webhook]
+        if args.alerts_file:
+            sinks.append(FileSink(args.alerts_file))
+        notify_config = NotifierConfig(min_abs_score=args.min_score)
+    try:
+        asyncio.run(_run(config, rounds=1 if args.once else None, seen=seen, store=store,
+                         ledger=ledger, sinks=sinks, notify_config=notify_config,
+                         validate=args.validate, metrics_port=args.metrics_port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if seen is not None:
+            seen.close()
+        if ledger is not None:
+            ledger.save(args.ledger)
+    return 0
 
 def main(argv=None) -> int:
-    # parse args, wire config, construct services, run controller loop
-    return 0
\ No newline at end of file
+    args = _parse_args(argv)
+    try:
+        with profiled(args.profile):
+            return run(args)
+    finally:
+        if args.metrics_file:
+            METRICS.write(args.metrics_file)
@@ -0,0 +1,98 @@
+"""
+Leg store manifest: one JSON line per part file, written by LegStore.append.
+
+Kept free of pandas / pyarrow so `python -m insider_trading stats` can summarise a
+store from the manifest alone. A verifying summary also lists the partition
+directories: part files the manifest does not list (stores written before it
+existed, or a crash between the part rename and the manifest write) are reported as
+unindexed, and LegStore.reindex() rebuilds the manifest from the part footers.
+"""
+# std lib
+import json
+import os
+from pathlib import Path
+from typing import Iterable
+
+MANIFEST = "_manifest.jsonl"
+
+def record(root: str | os.PathLike, entries: Iterable[dict]) -> None:
+    """Append entries (path relative to root, rows, bytes, period, issuer, filed_min, filed_max)."""
+    text = "".join(json.dumps(e, separators=(",", ":")) + "\n" for e in entries)
+    if text:
+        with open(Path(root) / MANIFEST, "a", encoding="utf-8") as f:
+            f.write(text)   # one write per append call, so concurrent readers see whole lines
+
+def rewrite(root: str | os.PathLike, entries: Iterable[dict]) -> None:
+    path = Path(root) / MANIFEST
+    tmp = path.with_name(MANIFEST + ".tmp")
+    tmp.write_text("".join(json.dumps(e, separators=(",", ":")) + "\n" for e in entries), encoding="utf-8")
+    os.replace(tmp, path)
+
+def read(root: str | os.PathLike) -> dict[str, dict] | None:
+    """path -> entry (None without a manifest); a truncated last line is ignored."""
+    try:
+        with open(Path(root) / MANIFEST, encoding="utf-8") as f:
+            text = f.read()
+    except FileNotFoundError:
+        return None
+    lines = text.splitlines()
+    if lines and not text.endswith("\n"):
+        lines.pop()             # a writer is mid-line
+    try:
+        entries = json.loads("[" + ",".join(l for l in lines if l.strip()) + "]")
+    except ValueError:          # damaged line: fall back to skipping it
+        entries = []
+        for line in lines:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                continue
+    return {e["path"]: e for e in entries}
+
+def part_files(root: str | os.PathLike) -> list[str]:
+    """Part paths relative to root, from a listing of the partition directories."""
+    root = str(root)
+    out = []
+    for pdir in os.scandir(root):
+        if not (pdir.is_dir() and pdir.name.startswith("filed=")):
+            continue
+        for idir in os.scandir(pdir.path):
+            if not (idir.is_dir() and idir.name.startswith("issuer=")):
+                continue
+            out += [f"{pdir.name}/{idir.name}/{f.name}" for f in os.scandir(idir.path)
+                    if f.name.startswith("part-") and f.name.endswith(".arrow")]
+    return sorted(out)
+
+def summarize(root: str | os.PathLike, top: int = 10, verify: bool = False) -> dict:
+    """
+    Store totals, per-period rows and the issuers with the most rows, from the manifest.
+    verify=True (or no manifest at all) also lists the partition directories, dropping
+    entries whose part is gone and counting parts the manifest misses as unindexed.
+    """
+    root = Path(root)
+    entries = read(root)
+    unindexed = []
+    if entries is None or verify:
+        files = part_files(root)
+        entries = entries or {}
+        listed = [entries[p] for p in files if p in entries]
+        unindexed = [p for p in files if p not in entries]
+    else:
+        listed = list(entries.values())
+    periods, issuers = {}, {}
+    for e in listed:
+        periods[e["period"]] = periods.get(e["period"], 0) + e["rows"]
+        issuers[e["issuer"]] = issuers.get(e["issuer"], 0) + e["rows"]
+    filed = [e[k] for e in listed for k in ("filed_min", "filed_max") if e.get(k)]
+    return {
+        "root": str(root),
+        "files": len(listed) + len(unindexed),
+        "rows": sum(e["rows"] for e in listed),
+        "bytes": sum(e["bytes"] for e in listed) + sum(os.path.getsize(root / p) for p in unindexed),
+        "issuers": len(issuers),
+        "filed_min": min(filed) if filed else None,
+        "filed_max": max(filed) if filed else None,
+        "periods": dict(sorted(periods.items())),
+        "top_issuers": dict(sorted(issuers.items(), key=lambda kv: (-kv[1], kv[0]))[:top]),
+        "unindexed_files": len(unindexed),
+    }
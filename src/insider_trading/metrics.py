@@ -0,0 +1,241 @@
+"""
+Pipeline instrumentation: counters, latency histograms and an opt-in profiler.
+
+Stages are timed with METRICS.timer(stage); each timing lands in the
+insider_trading_stage_seconds histogram labelled with the stage (fetch, validate,
+flatten, score, notify), and a failing stage also bumps
+insider_trading_stage_errors_total. Everything is per page or per alert, never per
+leg, so the bookkeeping is a perf_counter pair and a bisect per call.
+
+Export as Prometheus text (to_prometheus(), or serve_metrics() for /metrics) or as
+JSON (snapshot()). profiled() wraps a run in cProfile when a path is given (--profile
+or INSIDER_TRADING_PROFILE); without one it is a no-op.
+
+    with METRICS.timer("flatten"):
+        df = flatten_insider_payload(filings, engine="columnar")
+    METRICS.inc("legs_total", len(df))
+    print(METRICS.to_prometheus())
+"""
+# std lib
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+PROFILE_ENV = "INSIDER_TRADING_PROFILE"
+
+# Seconds; wide enough for an in-memory score (~ms) and a retried HTTP fetch (~s)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# === Registry ===
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus layout."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)   # last slot: +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float | None:
+        """Estimate by linear interpolation inside the bucket holding the q-th value."""
+        if not self.count:
+            return None
+        rank, seen = q * self.count, 0
+        for i, c in enumerate(self.counts):
+            if c and seen + c >= rank:
+                lo = self.buckets[i - 1] if i else 0.0
+                hi = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lo + (hi - lo) * (rank - seen) / c
+            seen += c
+        return self.buckets[-1]
+
+def _labels(labels: dict) -> tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def _fmt_labels(labels: tuple, extra: tuple = ()) -> str:
+    items = labels + extra
+    if not items:
+        return ""
+    esc = lambda v: v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in items) + "}"
+
+class Metrics:
+    """
+        metrics = Metrics()
+        metrics.inc("filings_total", 50)
+        with metrics.timer("fetch"):
+            ...
+        metrics.snapshot()["histograms"]["stage_seconds"]
+    """
+
+    def __init__(self, prefix: str = "insider_trading", buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.prefix = prefix
+        self.buckets = buckets
+        self.counters: dict[str, dict[tuple, float]] = {}
+        self.histograms: dict[str, dict[tuple, Histogram]] = {}
+        self.help: dict[str, str] = {}
+        self.bucket_overrides: dict[str, tuple[float, ...]] = {}
+        self.started = time.time()
+
+    def describe(self, name: str, text: str, buckets: tuple[float, ...] | None = None) -> None:
+        self.help[name] = text
+        if buckets is not None:
+            self.bucket_overrides[name] = tuple(buckets)
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        series = self.counters.setdefault(name, {})
+        key = _labels(labels)
+        series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        series = self.histograms.setdefault(name, {})
+        key = _labels(labels)
+        h = series.get(key)
+        if h is None:
+            h = series[key] = Histogram(self.bucket_overrides.get(name, self.buckets))
+        h.observe(value)
+
+    @contextmanager
+    def timer(self, stage: str):
+        """Time a block into stage_seconds{stage}; exceptions count as stage errors."""
+        t0 = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.inc("stage_errors_total", stage=stage)
+            raise
+        finally:
+            self.observe("stage_seconds", time.perf_counter() - t0, stage=stage)
+
+    def reset(self) -> None:
+        self.counters.clear()
+        self.histograms.clear()
+        self.started = time.time()
+
+    # --- Export ---
+    def snapshot(self) -> dict:
+        """JSON-ready view: counters plus count / sum / p50 / p95 / p99 per histogram series."""
+        def key(labels):
+            return ",".join(f"{k}={v}" for k, v in labels) or "_"
+        return {
+            "uptime_seconds": round(time.time() - self.started, 3),
+            "counters": {name: {key(l): v for l, v in series.items()}
+                         for name, series in self.counters.items()},
+            "histograms": {name: {key(l): {"count": h.count, "sum": h.sum,
+                                           "p50": h.quantile(0.50), "p95": h.quantile(0.95),
+                                           "p99": h.quantile(0.99)}
+                                  for l, h in series.items()}
+                           for name, series in self.histograms.items()},
+        }
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(self.snapshot(), **kwargs)
+
+    def to_prometheus(self) -> str:
+        """Text exposition format 0.0.4."""
+        out = []
+        for name, series in sorted(self.counters.items()):
+            full = f"{self.prefix}_{name}"
+            if name in self.help:
+                out.append(f"# HELP {full} {self.help[name]}")
+            out.append(f"# TYPE {full} counter")
+            out += [f"{full}{_fmt_labels(l)} {v:g}" for l, v in sorted(series.items())]
+        for name, series in sorted(self.histograms.items()):
+            full = f"{self.prefix}_{name}"
+            if name in self.help:
+                out.append(f"# HELP {full} {self.help[name]}")
+            out.append(f"# TYPE {full} histogram")
+            for l, h in sorted(series.items()):
+                running = 0
+                for bound, c in zip((*h.buckets, "+Inf"), h.counts):
+                    running += c
+                    le = bound if bound == "+Inf" else f"{bound:g}"
+                    out.append(f"{full}_bucket{_fmt_labels(l, (('le', le),))} {running}")
+                out.append(f"{full}_sum{_fmt_labels(l)} {h.sum:.6f}")
+                out.append(f"{full}_count{_fmt_labels(l)} {h.count}")
+        return "\n".join(out) + "\n"
+
+    def write(self, path: str | Path) -> None:
+        """Prometheus text for *.prom / *.txt (node_exporter textfile style), else JSON."""
+        path = Path(path)
+        text = self.to_prometheus() if path.suffix in (".prom", ".txt") else self.to_json(indent=2)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(text)
+        os.replace(tmp, path)
+
+METRICS = Metrics()
+METRICS.describe("stage_seconds", "Wall time per pipeline stage call.")
+METRICS.describe("stage_errors_total", "Stage calls that raised.")
+METRICS.describe("poll_errors_total", "Query rounds that failed and will be retried.")
+METRICS.describe("filings_total", "Filings handed to the pipeline.")
+METRICS.describe("legs_total", "Legs produced by the flattener.")
+METRICS.describe("schema_fallbacks_total", "Field values served from a non-primary alias path.")
+METRICS.describe("validation_errors_total", "Filings rejected by SECFilingJSON validation.")
+METRICS.describe("feature_cache_filings_total", "Filings served by the feature cache, per outcome.")
+METRICS.describe("feature_cache_evictions_total", "Feature cache entries evicted.")
+METRICS.describe("alerts_total", "Alerts delivered (or failed) per sink.")
+METRICS.describe("alert_latency_seconds", "filedAt to sink acknowledgement.",
+                 buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600, 4 * 3600, 86400))
+# === End Registry ===
+
+# === Export endpoints ===
+async def serve_metrics(metrics: Metrics = METRICS, host: str = "127.0.0.1", port: int = 9108):
+    """Serve /metrics (Prometheus) and /metrics.json; returns the aiohttp runner to clean up."""
+    from aiohttp import web
+
+    async def prom(request):
+        return web.Response(text=metrics.to_prometheus(), content_type="text/plain", charset="utf-8",
+                            headers={"X-Content-Type-Options": "nosniff"})
+
+    async def as_json(request):
+        return web.json_response(metrics.snapshot())
+
+    app = web.Application()
+    app.router.add_get("/metrics", prom)
+    app.router.add_get("/metrics.json", as_json)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
+# === End Export endpoints ===
+
+# === Profiling ===
+@contextmanager
+def _cprofile(path: Path, top: int):
+    prof = cProfile.Profile()
+    prof.enable()
+    try:
+        yield prof
+    finally:
+        prof.disable()
+        prof.dump_stats(str(path))
+        buf = io.StringIO()
+        pstats.Stats(prof, stream=buf).sort_stats("cumulative").print_stats(top)
+        print(f"[profile] {path}\n{buf.getvalue()}", file=sys.stderr)
+
+def profiled(path: str | Path | None = None, top: int = 25):
+    """
+    cProfile the enclosed block and dump pstats to path (or $INSIDER_TRADING_PROFILE),
+    printing the top entries by cumulative time to stderr. With neither set this
+    returns a nullcontext, so the disabled hook costs nothing.
+    """
+    path = path or os.getenv(PROFILE_ENV)
+    if not path:
+        return nullcontext()
+    return _cprofile(Path(path), top)
+# === End Profiling ===
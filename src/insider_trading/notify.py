@@ -0,0 +1,321 @@
+"""
+Alert delivery for scored legs.
+
+Scored legs are coalesced into one Alert per accessionNo and put on a bounded queue.
+A single dispatch loop fans each alert out to every sink; each sink has its own
+concurrency limit, and the loop waits for a free slot before taking the next alert.
+A slow sink therefore fills the queue, and a full queue makes submit() wait, which in
+turn holds up the poller's handler: memory stays bounded and polling slows instead.
+
+Latency is measured from the filing's filedAt to the moment a sink acknowledged it.
+"""
+# std lib
+import asyncio
+import random
+import sys
+import time
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, TextIO
+
+# packages
+import aiohttp
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel, Field
+
+# local lib
+from insider_trading.metrics import METRICS
+from insider_trading.poller import RetryableStatus
+
+# === Config ===
+class NotifierConfig(BaseModel):
+    queue_size:    int = 1000         # alerts waiting for delivery
+    min_abs_score: float = 0.0        # legs below this |score| do not alert
+    labels:        list[str] | None = None   # only alert on these labels (None = all)
+    max_samples:   int = 10_000       # latency samples kept per sink
+# === End Config ===
+
+# === Alerts ===
+class Alert(BaseModel):
+    accessionNo:   str
+    filedAt:       str | None = None
+    issuer_symbol: str | None = None
+    owners:        list[str] = Field(default_factory=list)
+    score:         float = 0.0        # leg with the largest |score|
+    label:         str | None = None
+    legs:          list[dict[str, Any]] = Field(default_factory=list)
+    enqueued:      float = 0.0        # time.time() when queued
+
+    def text(self) -> str:
+        owners = ", ".join(self.owners[:3]) + (" ..." if len(self.owners) > 3 else "")
+        return (f"{self.filedAt} {self.issuer_symbol or '?':<6} {self.label or '':<11} "
+                f"score={self.score:+.2f} legs={len(self.legs)} {owners} [{self.accessionNo}]")
+
+    def merge(self, other: "Alert") -> None:
+        """Fold another alert for the same filing into this one."""
+        self.owners += [o for o in other.owners if o not in self.owners]
+        self.legs += other.legs
+        if abs(other.score) > abs(self.score):
+            self.score, self.label = other.score, other.label
+
+_LEG_FIELDS = ("owner_name", "code", "direction", "shares", "pricePerShare", "value_usd", "score", "label")
+
+def alerts_from_frame(df: pd.DataFrame, config: NotifierConfig | None = None) -> list[Alert]:
+    """Coalesce scored legs (ScoringEngine output) into one Alert per accessionNo."""
+    config = config or NotifierConfig()
+    if df is None or df.empty:
+        return []
+    keep = np.abs(df["score"].to_numpy(dtype=float)) >= config.min_abs_score
+    if config.labels is not None:
+        keep &= df["label"].isin(config.labels).to_numpy()
+    df = df[keep]
+    alerts = []
+    for acc, g in df.groupby(df["accessionNo"].astype(str), sort=False):
+        top = int(np.argmax(np.abs(g["score"].to_numpy(dtype=float))))
+        fields = [c for c in _LEG_FIELDS if c in g.columns]
+        legs = g[fields].astype(object).where(g[fields].notna(), None).to_dict("records")
+        alerts.append(Alert(
+            accessionNo=acc, filedAt=_iso(g["filedAt"].iloc[0]), issuer_symbol=_text(g["issuer_symbol"].iloc[0]),
+            owners=list(dict.fromkeys(g["owner_name"].dropna().astype(str))),
+            score=float(g["score"].iloc[top]), label=g["label"].iloc[top], legs=legs,
+        ))
+    return alerts
+
+def _text(v) -> str | None:
+    """Frame cell as str; None for missing values (NaN, NaT, pd.NA)."""
+    return None if v is None or pd.isna(v) else str(v)
+
+def _iso(v) -> str | None:
+    """filedAt as ISO text: compact frames carry it as a UTC pd.Timestamp."""
+    if isinstance(v, pd.Timestamp) and not pd.isna(v):
+        return v.isoformat()
+    return _text(v)
+
+def _epoch(filed_at: str | None) -> float | None:
+    if not filed_at:
+        return None
+    try:
+        dt = datetime.fromisoformat(filed_at)
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+# === End Alerts ===
+
+# === Sinks ===
+class Sink:
+    """Delivery target. send() raises on failure; concurrency caps in-flight sends."""
+
+    name = "sink"
+
+    def __init__(self, concurrency: int = 1):
+        self.concurrency = max(1, concurrency)
+
+    async def open(self) -> None:
+        pass
+
+    async def send(self, alert: Alert) -> None:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+class StdoutSink(Sink):
+    name = "stdout"
+
+    def __init__(self, stream: TextIO | None = None):
+        super().__init__(concurrency=1)
+        self.stream = stream
+
+    async def send(self, alert: Alert) -> None:
+        print(alert.text(), file=self.stream or sys.stdout, flush=True)
+
+class FileSink(Sink):
+    """One JSON line per alert, appended to path."""
+
+    name = "file"
+
+    def __init__(self, path: str | Path):
+        super().__init__(concurrency=1)   # one writer keeps lines whole
+        self.path = Path(path)
+        self._fh = None
+
+    async def open(self) -> None:
+        self._fh = open(self.path, "a", encoding="utf-8")
+
+    async def send(self, alert: Alert) -> None:
+        self._fh.write(alert.model_dump_json(exclude={"enqueued"}) + "\n")
+        self._fh.flush()
+
+    async def close(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+class WebhookSink(Sink):
+    """POST each alert as JSON; retries connection errors and 429/5xx with jittered backoff."""
+
+    name = "webhook"
+
+    def __init__(self, url: str, concurrency: int = 4, timeout: float = 10.0, max_retries: int = 3,
+                 backoff_base: float = 0.5, headers: dict[str, str] | None = None):
+        super().__init__(concurrency)
+        self.url = url
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.headers = headers or {}
+        self._session: aiohttp.ClientSession | None = None
+
+    async def open(self) -> None:
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.concurrency),
+            timeout=aiohttp.ClientTimeout(total=self.timeout), headers=self.headers,
+        )
+
+    async def send(self, alert: Alert) -> None:
+        body = {**alert.model_dump(exclude={"enqueued"}), "text": alert.text()}
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self._session.post(self.url, json=body) as resp:
+                    if resp.status == 429 or resp.status >= 500:
+                        raise RetryableStatus(resp.status)
+                    resp.raise_for_status()
+                    return
+            except (RetryableStatus, aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt == self.max_retries:
+                    raise
+                await asyncio.sleep(random.uniform(0, self.backoff_base * 2 ** attempt))
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+# === End Sinks ===
+
+# === Stats ===
+class LatencyStats:
+    """filedAt -> delivery latency samples (seconds) of one sink."""
+
+    def __init__(self, max_samples: int = 10_000):
+        self.samples = deque(maxlen=max_samples)
+        self.delivered = 0
+        self.failed = 0
+
+    def add(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def summary(self) -> dict[str, float | int | None]:
+        a = np.fromiter(self.samples, dtype=float)
+        pct = [float(v) for v in np.percentile(a, [50, 95, 99])] if len(a) else [None] * 3
+        return {"delivered": self.delivered, "failed": self.failed,
+                "p50": pct[0], "p95": pct[1], "p99": pct[2], "max": float(a.max()) if len(a) else None}
+# === End Stats ===
+
+class Dispatcher:
+    """
+        async with Dispatcher([StdoutSink(), WebhookSink(url)]) as dispatcher:
+            await dispatcher.submit(engine.update(df))    # waits while the queue is full
+    """
+
+    def __init__(self, sinks: list[Sink], config: NotifierConfig | None = None, clock=time.time):
+        self.sinks = list(sinks)
+        self.config = config or NotifierConfig()
+        self.clock = clock
+        self.latency = {id(s): LatencyStats(self.config.max_samples) for s in self.sinks}
+        self.coalesced = 0
+        self._queue: asyncio.Queue | None = None
+        self._pending: dict[str, Alert] = {}     # queued, not yet dispatched
+        self._slots: dict[int, asyncio.Semaphore] = {}
+        self._inflight: set[asyncio.Task] = set()
+        self._loop_task: asyncio.Task | None = None
+
+    async def __aenter__(self) -> "Dispatcher":
+        self._queue = asyncio.Queue(maxsize=max(1, self.config.queue_size))
+        self._slots = {id(s): asyncio.Semaphore(s.concurrency) for s in self.sinks}
+        for s in self.sinks:
+            await s.open()
+        self._loop_task = asyncio.create_task(self._dispatch())
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.drain()
+        self._loop_task.cancel()
+        await asyncio.gather(self._loop_task, return_exceptions=True)
+        for s in self.sinks:
+            await s.close()
+
+    # --- Producer side ---
+    async def submit(self, df: pd.DataFrame) -> int:
+        """Coalesce scored legs into alerts and queue them. Returns alerts queued."""
+        n = 0
+        for alert in alerts_from_frame(df, self.config):
+            n += await self.put(alert)
+        return n
+
+    async def put(self, alert: Alert) -> bool:
+        """Queue one alert, or fold it into a queued alert of the same filing."""
+        queued = self._pending.get(alert.accessionNo)
+        if queued is not None:
+            queued.merge(alert)
+            self.coalesced += 1
+            return False
+        alert.enqueued = self.clock()
+        self._pending[alert.accessionNo] = alert
+        await self._queue.put(alert)     # backpressure: waits while the queue is full
+        return True
+
+    async def drain(self) -> None:
+        """Wait until every queued alert has been delivered (or failed) on every sink."""
+        await self._queue.join()
+        # Wait only on unfinished tasks: on 3.12 gathering already-done tasks does not
+        # yield, so the discard callbacks never run and a `while _inflight` loop spins.
+        pending = {t for t in self._inflight if not t.done()}
+        if pending:
+            await asyncio.wait(pending)
+        self._inflight.clear()
+
+    # --- Delivery ---
+    async def _dispatch(self) -> None:
+        while True:
+            alert = await self._queue.get()
+            self._pending.pop(alert.accessionNo, None)
+            try:
+                for s in self.sinks:
+                    await self._slots[id(s)].acquire()   # a busy sink holds the loop here
+                    task = asyncio.create_task(self._send(s, alert))
+                    self._inflight.add(task)
+                    task.add_done_callback(self._inflight.discard)
+            finally:
+                self._queue.task_done()
+
+    async def _send(self, sink: Sink, alert: Alert) -> None:
+        stats = self.latency[id(sink)]
+        try:
+            with METRICS.timer("notify"):
+                await sink.send(alert)
+        except Exception as e:
+            stats.failed += 1
+            METRICS.inc("alerts_total", sink=sink.name, outcome="failed")
+            print(f"[notify] {sink.name} failed for {alert.accessionNo}: {e!r}", file=sys.stderr)
+        else:
+            stats.delivered += 1
+            METRICS.inc("alerts_total", sink=sink.name, outcome="delivered")
+            filed = _epoch(alert.filedAt)
+            if filed is not None:
+                stats.add(self.clock() - filed)
+                METRICS.observe("alert_latency_seconds", self.clock() - filed)
+        finally:
+            self._slots[id(sink)].release()
+
+    def stats(self) -> dict[str, dict]:
+        """Per-sink delivery counts and filedAt -> delivery latency percentiles (seconds)."""
+        out = {}
+        for s in self.sinks:
+            name = s.name if s.name not in out else f"{s.name}#{len(out)}"
+            out[name] = self.latency[id(s)].summary()
+        out["queue"] = {"size": self._queue.qsize() if self._queue else 0, "coalesced": self.coalesced}
+        return out
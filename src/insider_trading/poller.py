@@ -0,0 +1,264 @@
+"""
+Async poller for the sec-api.io insider-trading endpoint.
+
+One pooled aiohttp session serves every request. Queries (e.g. issuer.tradingSymbol:AAPL)
+and their from/size pages are fetched concurrently, a global token bucket caps the
+request rate, and 429/5xx answers are retried with jittered exponential backoff.
+Each page's filings are handed to the handler as soon as that page arrives.
+With a SeenIndex attached, queries only ask for filings since the query's filedAt
+high-water mark, oldest first, and already-processed filings are dropped before the
+handler. A backlog larger than one round is then worked off over the next rounds.
+"""
+# std lib
+import asyncio
+import inspect
+import random
+import sys
+import time
+from typing import Any, Awaitable, Callable
+
+# packages
+import aiohttp
+from pydantic import BaseModel, Field
+
+# local lib
+from insider_trading.metrics import METRICS
+from insider_trading.seen import SeenIndex, filing_key, since_query
+
+SEC_API_URL = "https://api.sec-api.io/insider-trading"
+SEC_API_MAX_FROM = 10_000   # sec-api refuses deeper pagination
+
+FilingsHandler = Callable[[str, list[dict]], Awaitable[Any] | Any]
+
+# === Config ===
+class PollerConfig(BaseModel):
+    api_key:         str | None = None
+    url:             str = SEC_API_URL
+    queries:         list[str] = Field(default_factory=list)
+    page_size:       int = 50
+    max_pages:       int = 1          # pages per query per round
+    rate_per_sec:    float = 5.0      # global request rate
+    burst:           int = 5
+    max_connections: int = 8          # pooled connections == max in-flight requests
+    max_retries:     int = 5
+    backoff_base:    float = 0.5
+    backoff_cap:     float = 30.0
+    timeout:         float = 20.0
+    interval:        float = 30.0     # seconds between poll rounds
+
+def symbol_query(symbol: str, document_type: str | None = "4") -> str:
+    q = f"issuer.tradingSymbol:{symbol}"
+    return f"{q} AND documentType:{document_type}" if document_type else q
+# === End Config ===
+
+# === Rate limiting ===
+class RateLimiter:
+    """Token bucket shared by every request of a poller."""
+
+    def __init__(self, rate_per_sec: float, burst: int = 1):
+        self.rate = rate_per_sec
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+# === End Rate limiting ===
+
+class PollerStats(BaseModel):
+    requests: int = 0
+    retries:  int = 0
+    pages:    int = 0
+    filings:  int = 0
+    skipped:  int = 0   # already seen
+    errors:   int = 0   # query rounds that failed
+
+class RetryableStatus(Exception):
+    def __init__(self, status: int, retry_after: float | None = None):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+        self.retry_after = retry_after
+
+def _retry_after(headers) -> float | None:
+    try:
+        return float(headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+class SecApiPoller:
+    """
+    Use as an async context manager so the pooled session is opened and closed once:
+
+        async with SecApiPoller(config, handler) as poller:
+            await poller.run()
+    """
+
+    def __init__(self, config: PollerConfig, handler: FilingsHandler | None = None,
+                 seen: SeenIndex | None = None):
+        self.config = config
+        self.handler = handler
+        self.seen = seen
+        self.limiter = RateLimiter(config.rate_per_sec, config.burst)
+        self.stats = PollerStats()
+        self._session: aiohttp.ClientSession | None = None
+        # Keys handed to the handler but not yet marked seen (overlapping pages/queries)
+        self._inflight: set[str] = set()
+
+    async def __aenter__(self) -> "SecApiPoller":
+        headers = {"Content-Type": "application/json"}
+        if self.config.api_key:
+            headers["Authorization"] = self.config.api_key
+        connector = aiohttp.TCPConnector(limit=self.config.max_connections, keepalive_timeout=60)
+        self._session = aiohttp.ClientSession(
+            connector=connector, headers=headers,
+            timeout=aiohttp.ClientTimeout(total=self.config.timeout),
+        )
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    # --- HTTP ---
+    def _backoff(self, attempt: int, retry_after: float | None) -> float:
+        # "Full jitter": uniform in [0, min(cap, base * 2**attempt)]
+        delay = random.uniform(0, min(self.config.backoff_cap, self.config.backoff_base * 2 ** attempt))
+        return max(delay, retry_after or 0.0)
+
+    async def fetch_page(self, query: str, offset: int = 0, size: int | None = None,
+                         order: str = "desc") -> dict:
+        """POST one page, retrying 429/5xx and connection errors with jittered backoff."""
+        body = {
+            "query": query,
+            "from":  offset,
+            "size":  size or self.config.page_size,
+            "sort":  [{"filedAt": {"order": order}}],
+        }
+        for attempt in range(self.config.max_retries + 1):
+            await self.limiter.acquire()
+            self.stats.requests += 1
+            try:
+                with METRICS.timer("fetch"):
+                    async with self._session.post(self.config.url, json=body) as resp:
+                        METRICS.inc("http_responses_total", status=resp.status)
+                        if resp.status == 429 or resp.status >= 500:
+                            raise RetryableStatus(resp.status, _retry_after(resp.headers))
+                        resp.raise_for_status()
+                        return await resp.json(content_type=None)
+            except (RetryableStatus, aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt == self.config.max_retries:
+                    raise
+                self.stats.retries += 1
+                METRICS.inc("http_retries_total")
+                await asyncio.sleep(self._backoff(attempt, getattr(e, "retry_after", None)))
+        raise AssertionError("unreachable")
+
+    # --- Polling ---
+    async def _deliver(self, query: str, filings: list[dict]) -> None:
+        self.stats.pages += 1
+        self.stats.filings += len(filings)
+        new = filings
+        keys: list[str] = []
+        if self.seen is not None:
+            # Claimed synchronously, before the handler can suspend, so a concurrent page
+            # carrying the same accessionNo is filtered instead of delivered twice.
+            new = [f for f in self.seen.unseen(filings) if filing_key(f) not in self._inflight]
+            keys = [filing_key(f) for f in new]
+            self._inflight.update(keys)
+            self.stats.skipped += len(filings) - len(new)
+        try:
+            if self.handler is not None and new:
+                result = self.handler(query, new)
+                if inspect.isawaitable(result):
+                    await result
+            # Marked only after the handler succeeded: a crash re-delivers, never drops
+            if self.seen is not None and new:
+                self.seen.mark_seen(new)
+        finally:
+            self._inflight.difference_update(keys)
+
+    async def poll_query(self, query: str, max_pages: int | None = None) -> int:
+        """
+        Fetch up to max_pages pages of one query. The first page tells us the total;
+        the remaining pages are then requested concurrently and delivered as they land.
+
+        Without a mark the newest filings are fetched and polling starts from "now".
+        With one, filings since the mark come oldest first, so a truncated round covers
+        the oldest part of the backlog and the mark can still move past it.
+        """
+        size = self.config.page_size
+        max_pages = max_pages or self.config.max_pages
+        request, order = query, "desc"
+        if self.seen is not None:
+            mark = self.seen.watermark(query)
+            if mark is not None:
+                request, order = since_query(query, mark), "asc"
+
+        first = await self.fetch_page(request, 0, size, order)
+        filings = first.get("transactions") or []
+        await self._deliver(query, filings)
+        total = ((first.get("total") or {}).get("value")) or len(filings)
+
+        last = min(total, size * max_pages, SEC_API_MAX_FROM)
+        offsets = range(size, last, size)
+        pages = [filings]
+
+        async def page(offset: int) -> int:
+            got = (await self.fetch_page(request, offset, size, order)).get("transactions") or []
+            pages.append(got)
+            await self._deliver(query, got)
+            return len(got)
+
+        n = len(filings) + sum(await asyncio.gather(*(page(o) for o in offsets)))
+        # Advance only once every page of the round is in, so a failed page is retried
+        if self.seen is not None:
+            self.seen.advance(query, (f for p in pages for f in p))
+        return n
+
+    async def poll_once(self, queries: list[str] | None = None) -> int:
+        """
+        One round over every query, all running concurrently. A failing query is logged
+        and counted; its mark stays put so the next round retries it, and the other
+        queries carry on.
+        """
+        queries = queries if queries is not None else self.config.queries
+        results = await asyncio.gather(*(self.poll_query(q) for q in queries), return_exceptions=True)
+        n = 0
+        for q, r in zip(queries, results):
+            if isinstance(r, BaseException):
+                if not isinstance(r, Exception):
+                    raise r
+                self.stats.errors += 1
+                METRICS.inc("poll_errors_total")
+                print(f"[poll] {q} failed: {r!r}", file=sys.stderr)
+            else:
+                n += r
+        return n
+
+    async def run(self, stop: asyncio.Event | None = None, rounds: int | None = None) -> None:
+        """Poll every config.interval seconds until stop is set (or rounds are done)."""
+        stop = stop or asyncio.Event()
+        done = 0
+        while not stop.is_set() and (rounds is None or done < rounds):
+            started = time.monotonic()
+            await self.poll_once()
+            done += 1
+            if rounds is not None and done >= rounds:
+                break
+            wait = max(0.0, self.config.interval - (time.monotonic() - started))
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
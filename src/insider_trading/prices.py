@@ -0,0 +1,224 @@
+"""
+Local daily price store and an as-of join that puts legs in market context.
+
+Daily OHLCV bars come from one CSV per ticker (<SYMBOL>.csv with Date, Open, High,
+Low, Close and Volume columns; Yahoo / Stooq style headers in any case). Each CSV is
+converted once into an uncompressed Arrow IPC file, <root>/<SYMBOL>.arrow, which is
+memory-mapped on use. Series stay in a per-store LRU cache across calls, so
+repeated joins do not reopen files.
+
+enrich() joins legs on (issuer_symbol, trade day): the trade day is transactionDate,
+falling back to the filing date as in scoring. Each leg gets the last bar on or
+before that day, provided it is at most max_stale_days old. Legs are grouped by
+symbol with one radix argsort; each symbol's slice then maps trade days to bars
+through a per-series calendar-day lookup table, built once when the series is
+loaded. That is O(n) gathers for n legs plus one cached lookup per distinct symbol.
+Columns added:
+- close_date, close: the matched bar
+- premium: pricePerShare / close - 1 (NaN without a positive price)
+- fwd_ret_<k>: close k trading days after the matched bar / close - 1, for each horizon
+
+    prices = PriceStore("data/prices", csv_dir="data/csv")
+    legs = prices.enrich(flatten_insider_payload(payload, engine="columnar"))
+"""
+# std lib
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterable, NamedTuple
+
+# packages
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+# local lib
+from insider_trading.scoring import _NO_DAY, _days
+
+BAR_COLS = ("date", "open", "high", "low", "close", "volume")
+HORIZONS = (5, 20, 60)
+_CSV_NAMES = {"date": "date", "timestamp": "date", "open": "open", "high": "high", "low": "low",
+              "close": "close", "adj close": "adj_close", "adj_close": "adj_close",
+              "volume": "volume", "vol": "volume"}
+
+def price_cols(horizons: Iterable[int] = HORIZONS) -> tuple[str, ...]:
+    return ("close_date", "close", "premium", *(f"fwd_ret_{k}" for k in horizons))
+
+class PriceSeries(NamedTuple):
+    """One ticker's bars; arrays are views of the memory-mapped file where possible."""
+    days:   np.ndarray   # int64 days since the epoch, ascending
+    open:   np.ndarray
+    high:   np.ndarray
+    low:    np.ndarray
+    close:  np.ndarray
+    volume: np.ndarray
+    asof:   np.ndarray   # per calendar day from days[0] to days[-1]: index of the last bar on or before it
+
+    def bar_index(self, day: np.ndarray) -> np.ndarray:
+        """Index of the last bar on or before each day (-1 before the first bar)."""
+        if not len(self.days):
+            return np.full(len(day), -1, dtype=np.int64)
+        offset = np.clip(day - self.days[0], 0, len(self.asof) - 1)
+        return np.where(day < self.days[0], -1, self.asof[offset])
+
+def read_csv_bars(path: str | os.PathLike) -> pd.DataFrame:
+    """A per-ticker CSV as BAR_COLS, sorted by date, one bar per day (the last wins)."""
+    raw = pd.read_csv(path)
+    raw.columns = [_CSV_NAMES.get(str(c).strip().lower(), str(c).strip().lower()) for c in raw.columns]
+    missing = {"date", "close"} - set(raw.columns)
+    if missing:
+        raise ValueError(f"{path}: missing column(s) {sorted(missing)}")
+    out = pd.DataFrame({"date": pd.to_datetime(raw["date"].astype(str).str.slice(0, 10),
+                                                errors="coerce", format="%Y-%m-%d")})
+    for c in BAR_COLS[1:]:
+        out[c] = pd.to_numeric(raw[c], errors="coerce") if c in raw.columns else np.nan
+    out["close"] = out["close"].where(out["close"] > 0)
+    out = out.dropna(subset=["date", "close"])
+    return out.drop_duplicates("date", keep="last").sort_values("date").reset_index(drop=True)
+
+class PriceStore:
+    """
+        prices = PriceStore("data/prices", csv_dir="data/csv")
+        prices.import_csv()                       # optional: otherwise converted on first use
+        legs = prices.enrich(legs, horizons=(5, 20, 60))
+    """
+
+    def __init__(self, root: str | os.PathLike, csv_dir: str | os.PathLike | None = None,
+                 cache_size: int = 4096):
+        self.root = Path(root)
+        self.csv_dir = Path(csv_dir) if csv_dir is not None else None
+        self.cache_size = cache_size
+        self._cache: OrderedDict[str, PriceSeries | None] = OrderedDict()
+        self.hits = self.misses = 0
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    # --- Writing ---
+    def _path(self, symbol: str) -> Path:
+        return self.root / f"{symbol.upper()}.arrow"
+
+    def write(self, symbol: str, bars: pd.DataFrame) -> Path:
+        """Store bars (BAR_COLS, as read_csv_bars returns them) for symbol."""
+        table = pa.table({
+            "date": pa.array(bars["date"].to_numpy(dtype="datetime64[D]")),
+            **{c: pa.array(bars[c].to_numpy(dtype="float64")) for c in BAR_COLS[1:]},
+        })
+        path = self._path(symbol)
+        tmp = path.with_suffix(".tmp")
+        with pa.OSFile(str(tmp), "wb") as sink, ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp, path)
+        self._cache.pop(symbol.upper(), None)
+        return path
+
+    def import_csv(self, paths: Iterable[str | os.PathLike] | None = None) -> int:
+        """Convert CSVs (default: every *.csv in csv_dir) into the store; returns files written."""
+        if paths is None:
+            if self.csv_dir is None:
+                raise ValueError("no csv_dir configured and no paths given")
+            paths = sorted(self.csv_dir.glob("*.csv"))
+        n = 0
+        for p in paths:
+            self.write(Path(p).stem, read_csv_bars(p))
+            n += 1
+        return n
+
+    # --- Reading ---
+    def symbols(self) -> list[str]:
+        return sorted(p.stem for p in self.root.glob("*.arrow"))
+
+    def _load(self, symbol: str) -> PriceSeries | None:
+        path = self._path(symbol)
+        if not path.exists():
+            csv = self.csv_dir / f"{symbol}.csv" if self.csv_dir is not None else None
+            if csv is None or not csv.exists():
+                return None
+            self.write(symbol, read_csv_bars(csv))
+        with pa.memory_map(str(path), "r") as source:
+            table = ipc.open_file(source).read_all()
+        table = table.combine_chunks()
+
+        def col(name):
+            arr = table.column(name).chunk(0) if table.num_rows else pa.array([], pa.float64())
+            return arr.to_numpy(zero_copy_only=arr.null_count == 0 and pa.types.is_floating(arr.type))
+
+        days = col("date").astype("datetime64[D]").astype(np.int64) if table.num_rows \
+            else np.empty(0, dtype=np.int64)
+        asof = np.searchsorted(days, np.arange(days[0], days[-1] + 1), side="right").astype(np.int32) - 1 \
+            if len(days) else np.empty(0, dtype=np.int32)
+        return PriceSeries(days, col("open"), col("high"), col("low"), col("close"), col("volume"), asof)
+
+    def series(self, symbol: str) -> PriceSeries | None:
+        """Bars for symbol (None if unknown), through the LRU cache."""
+        key = str(symbol).upper()
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return self._cache[key]
+        self.misses += 1
+        s = self._load(key)
+        self._cache[key] = s
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return s
+
+    def cache_info(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._cache), "max": self.cache_size}
+
+    # --- As-of join ---
+    def enrich(self, df: pd.DataFrame, horizons: Iterable[int] = HORIZONS,
+               max_stale_days: int = 7) -> pd.DataFrame:
+        """Copy of df with price_cols(horizons) added; see the module docstring."""
+        horizons = tuple(horizons)
+        n = len(df)
+        close_day = np.full(n, _NO_DAY, dtype=np.int64)
+        close = np.full(n, np.nan)
+        fwd = {k: np.full(n, np.nan) for k in horizons}
+
+        if n:
+            day = _days(df)
+            codes, symbols = pd.factorize(df["issuer_symbol"])
+            # Small code dtype so the stable sort is a radix sort; legs of one symbol are
+            # then a contiguous slice of the sorted arrays
+            codes = codes.astype(np.int16 if len(symbols) < 2**15 else np.int32)
+            order = np.argsort(codes, kind="stable")
+            bounds = np.searchsorted(codes[order], np.arange(len(symbols) + 1), side="left")
+            day_s = day[order]
+            cday_s = np.full(n, _NO_DAY, dtype=np.int64)
+            close_s = np.full(n, np.nan)
+            fwd_s = {k: np.full(n, np.nan) for k in horizons}
+            for c, sym in enumerate(symbols):
+                lo, hi = bounds[c], bounds[c + 1]
+                s = self.series(str(sym)) if hi > lo else None
+                if s is None or not len(s.days):
+                    continue
+                d = day_s[lo:hi]
+                i = s.bar_index(d)
+                ok = i >= 0
+                ok[ok] = (d[ok] - s.days[i[ok]] <= max_stale_days) & (d[ok] != _NO_DAY)
+                idx = np.where(ok, i, 0)
+                cday_s[lo:hi] = np.where(ok, s.days[idx], _NO_DAY)
+                base = np.where(ok, s.close[idx], np.nan)
+                close_s[lo:hi] = base
+                last = len(s.days) - 1
+                for k in horizons:
+                    j = np.minimum(idx + k, last)
+                    fwd_s[k][lo:hi] = np.where(idx + k <= last, s.close[j] / base - 1.0, np.nan)
+            close_day[order], close[order] = cday_s, close_s
+            for k in horizons:
+                fwd[k][order] = fwd_s[k]
+
+        price = pd.to_numeric(df["pricePerShare"], errors="coerce").to_numpy(dtype=float, na_value=np.nan) \
+            if "pricePerShare" in df.columns else np.full(n, np.nan)
+        premium = np.full(n, np.nan)
+        ok = (price > 0) & ~np.isnan(close)
+        premium[ok] = price[ok] / close[ok] - 1.0
+
+        dates = np.where(close_day == _NO_DAY, np.iinfo(np.int64).min, close_day).astype("datetime64[D]")
+        out = df.copy()
+        out["close_date"] = dates.astype("datetime64[ns]")
+        out["close"] = close
+        out["premium"] = premium
+        for k in horizons:
+            out[f"fwd_ret_{k}"] = fwd[k]
+        return out
@@ -0,0 +1,243 @@
+"""
+Vectorized trade scoring over flattened legs.
+
+A leg's score is sign * strength, in [-1, 1]:
+    sign      +1 open-market buy (code P), -1 open-market sale (code S); other
+              BUYish/SELLish legs (grants, exercises, ...) get a reduced weight
+    strength  weighted mix of role_score, log-scaled value_usd, stake_change and
+              membership of an insider buying cluster; 10b5-1 plan legs are damped
+Scores map to labels through configurable thresholds ("strong buy", "maybe", ...).
+
+A cluster is several distinct owner_cik buying the same issuer_cik within
+window_days. A leg's cluster_size counts the distinct buyers in [t - window_days, t],
+so it only looks backwards and the same number comes out of batch and incremental
+scoring.
+"""
+# std lib
+import bisect
+from collections import defaultdict
+
+# packages
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel, Field
+
+SCORE_COLS = ("cluster_size", "is_cluster", "score", "label")
+
+# === Config ===
+class ScoringConfig(BaseModel):
+    w_role:    float = 0.35
+    w_value:   float = 0.30
+    w_stake:   float = 0.15
+    w_cluster: float = 0.20
+
+    value_floor: float = 1e4       # $ value scoring 0
+    value_cap:   float = 1e7       # $ value scoring 1 (log scale in between)
+    stake_cap:   float = 0.5       # stake_change scoring 1
+
+    other_buy_sign:  float = 0.3   # BUYish legs that are not code P
+    other_sell_sign: float = 0.3   # SELLish legs that are not code S
+    plan_factor:     float = 0.5   # multiplier for legs under a 10b5-1 plan
+
+    cluster_window_days: int = 14
+    cluster_min_owners:  int = 3
+    cluster_codes:       tuple[str, ...] = ("P",)
+
+    # (minimum score, label), checked from the top; below all of them -> floor_label
+    labels: list[tuple[float, str]] = Field(default_factory=lambda: [
+        (0.70, "strong buy"), (0.50, "buy"), (0.30, "maybe"),
+        (-0.30, "neutral"), (-0.60, "sell"),
+    ])
+    floor_label: str = "strong sell"
+# === End Config ===
+
+_NO_DAY = np.iinfo(np.int64).min // 2
+
+def _parse_days(values) -> np.ndarray:
+    """Dates (datetime or ISO-ish strings) as datetime64[D]; each distinct string is parsed once."""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return pd.Series(values).to_numpy(dtype="datetime64[D]")
+    codes, uniques = pd.factorize(values if isinstance(values, pd.Series) else pd.Series(values, dtype=object))
+    parsed = pd.to_datetime(pd.Series(np.asarray(uniques, dtype=object)).astype(str).str.slice(0, 10),
+                            errors="coerce", format="%Y-%m-%d").to_numpy(dtype="datetime64[D]")
+    out = np.append(parsed, np.datetime64("NaT", "D"))[codes]   # code -1 -> NaT
+    return out
+
+def _days(df: pd.DataFrame) -> np.ndarray:
+    """Trade day (transactionDate, else filing date) as integer days since the epoch."""
+    when = _parse_days(df["transactionDate"])
+    missing = np.isnat(when)
+    if missing.any():
+        filed = df["filedAt"][missing]
+        if isinstance(filed.dtype, pd.DatetimeTZDtype):     # compact schema: UTC -> EDGAR local date
+            filed = filed.dt.tz_convert("America/New_York").dt.tz_localize(None)
+        when[missing] = _parse_days(filed)
+    out = when.astype("int64")
+    out[np.isnat(when)] = _NO_DAY
+    return out
+
+def _cluster_mask(df: pd.DataFrame, day: np.ndarray, config: ScoringConfig) -> np.ndarray:
+    """Legs that can be part of a cluster: the configured codes, with an issuer and a date."""
+    code = pd.Series(df["code"], dtype=object).fillna("").astype(str).str.upper().to_numpy()
+    issuer = pd.notna(pd.Series(df["issuer_cik"], dtype=object)).to_numpy()
+    return np.isin(code, list(config.cluster_codes)) & issuer & (day != _NO_DAY)
+
+def cluster_sizes(issuer, owner, day, window_days: int) -> np.ndarray:
+    """
+    Distinct owners per issuer within [day - window_days, day] for every row.
+    A buy counts for the windows ending in [day, day + window_days] that do not also
+    hold the owner's previous buy, i.e. from max(day, prev_day + window_days + 1).
+    Those windows are a contiguous run in (issuer, day) order, found with searchsorted,
+    so the counts are a difference array and one cumsum: O(n log n), no Python loop.
+    """
+    n = len(day)
+    out = np.zeros(n, dtype=np.int64)
+    if n == 0:
+        return out
+    g, _ = pd.factorize(pd.Series(issuer, dtype=object).astype(str))
+    o, _ = pd.factorize(pd.Series(owner, dtype=object).astype(str))
+    d = np.asarray(day, dtype=np.int64)
+
+    # Previous buy of the same (issuer, owner)
+    by_owner = np.lexsort((d, o, g))
+    same = (g[by_owner][1:] == g[by_owner][:-1]) & (o[by_owner][1:] == o[by_owner][:-1])
+    first = np.ones(n, dtype=bool)
+    prev = np.zeros(n, dtype=np.int64)
+    first[by_owner[1:]] = ~same
+    prev[by_owner[1:]] = d[by_owner][:-1]
+
+    # Window ends this buy counts for: [lo_day, hi_day], as (issuer, day) keys
+    lo_day = np.where(first, d, np.maximum(d, prev + window_days + 1))
+    hi_day = d + window_days
+    base = d.min()
+    span = int(d.max() - base) + window_days + 2
+    order = np.lexsort((d, g))
+    keys = g[order] * span + (d[order] - base)
+    a = np.searchsorted(keys, g * span + (lo_day - base), side="left")
+    b = np.searchsorted(keys, g * span + (hi_day - base), side="right")
+    live = a < b
+
+    diff = np.zeros(n + 1, dtype=np.int64)
+    np.add.at(diff, a[live], 1)
+    np.add.at(diff, b[live], -1)
+    out[order] = np.cumsum(diff[:n])
+    return out
+
+class _ClusterWindow:
+    """Per-issuer sorted (day, owner) buys kept for incremental cluster counts."""
+
+    def __init__(self, window_days: int, retain_days: int):
+        self.window_days = window_days
+        self.retain_days = max(retain_days, window_days)
+        self._buys = defaultdict(list)    # issuer -> sorted [(day, owner)]
+        self.newest = None
+
+    def __len__(self) -> int:
+        return sum(len(b) for b in self._buys.values())
+
+    def add(self, issuer: str, owner: str, day: int) -> None:
+        bisect.insort(self._buys[issuer], (day, owner))
+        self.newest = day if self.newest is None else max(self.newest, day)
+
+    def count(self, issuer: str, day: int) -> int:
+        buys = self._buys.get(issuer, ())
+        lo = bisect.bisect_left(buys, (day - self.window_days,))
+        hi = bisect.bisect_left(buys, (day + 1,))
+        return len({o for _, o in buys[lo:hi]})
+
+    def evict(self) -> None:
+        """Forget buys older than retain_days before the newest one seen."""
+        if self.newest is None:
+            return
+        cutoff = (self.newest - self.retain_days,)
+        for issuer in list(self._buys):
+            buys = self._buys[issuer]
+            del buys[:bisect.bisect_left(buys, cutoff)]
+            if not buys:
+                del self._buys[issuer]
+
+class ScoringEngine:
+    """
+        engine = ScoringEngine()
+        scored = engine.score(df)          # whole frame, fresh window
+        fresh  = engine.update(new_legs)   # only new legs, against the running window
+    """
+
+    def __init__(self, config: ScoringConfig | None = None, retain_days: int | None = None):
+        self.config = config or ScoringConfig()
+        # Legs arriving late by up to retain_days - window_days still see their full window
+        retain = retain_days or 2 * self.config.cluster_window_days
+        self._window = _ClusterWindow(self.config.cluster_window_days, retain)
+
+    # --- Vectorized parts ---
+    def _sign(self, df: pd.DataFrame) -> np.ndarray:
+        c = self.config
+        code = pd.Series(df["code"], dtype=object).fillna("").astype(str).str.upper().to_numpy()
+        direction = pd.Series(df["direction"], dtype=object).fillna("").astype(str).to_numpy()
+        return np.select(
+            [code == "P", code == "S", direction == "BUYish", direction == "SELLish"],
+            [1.0, -1.0, c.other_buy_sign, -c.other_sell_sign],
+            default=0.0,
+        )
+
+    def _score(self, df: pd.DataFrame, cluster_size: np.ndarray) -> pd.DataFrame:
+        c = self.config
+        value = pd.to_numeric(df["value_usd"], errors="coerce").fillna(0).to_numpy(dtype=float)
+        lo, hi = np.log10(c.value_floor), np.log10(c.value_cap)
+        value_n = np.clip((np.log10(np.maximum(value, 1.0)) - lo) / (hi - lo), 0, 1)
+        stake_n = np.clip(pd.to_numeric(df["stake_change"], errors="coerce").fillna(0).to_numpy(dtype=float)
+                          / c.stake_cap, 0, 1)
+        role = pd.to_numeric(df["role_score"], errors="coerce").fillna(0).to_numpy(dtype=float)
+        is_cluster = cluster_size >= c.cluster_min_owners
+
+        strength = c.w_role * role + c.w_value * value_n + c.w_stake * stake_n + c.w_cluster * is_cluster
+        if "fn_10b5_1" in df.columns:
+            strength = np.where(df["fn_10b5_1"].fillna(False).astype(bool).to_numpy(),
+                                strength * c.plan_factor, strength)
+        score = np.clip(self._sign(df) * strength, -1, 1)
+
+        out = df.copy()
+        out["cluster_size"] = cluster_size
+        out["is_cluster"] = is_cluster
+        out["score"] = score
+        out["label"] = self.label(score)
+        return out
+
+    def label(self, score) -> np.ndarray:
+        """Map scores to labels with the configured thresholds."""
+        labels = sorted(self.config.labels, key=lambda t: t[0])
+        bounds = np.array([t[0] for t in labels])
+        names = np.array([self.config.floor_label] + [t[1] for t in labels], dtype=object)
+        return names[np.searchsorted(bounds, np.asarray(score, dtype=float), side="right")]
+
+    # --- Entry points ---
+    def score(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Score a whole flattened frame; clusters are computed within the frame only."""
+        if df.empty:
+            return df.assign(**{c: pd.Series(dtype=object) for c in SCORE_COLS})
+        day = _days(df)
+        mask = _cluster_mask(df, day, self.config)
+        sizes = np.zeros(len(df), dtype=np.int64)
+        sizes[mask] = cluster_sizes(df["issuer_cik"].to_numpy()[mask], df["owner_cik"].to_numpy()[mask],
+                                    day[mask], self.config.cluster_window_days)
+        return self._score(df, sizes)
+
+    def update(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Score newly arrived legs against the running cluster window without rescoring
+        history. Only the new cluster-eligible legs touch the window (a bisect per leg).
+        """
+        if df.empty:
+            return df.assign(**{c: pd.Series(dtype=object) for c in SCORE_COLS})
+        day = _days(df)
+        idx = np.flatnonzero(_cluster_mask(df, day, self.config))
+        issuer = pd.Series(df["issuer_cik"], dtype=object).astype(str).to_numpy()
+        owner = pd.Series(df["owner_cik"], dtype=object).astype(str).to_numpy()
+        # Add the whole batch first so same-day legs see each other, as in the batch sweep
+        for i in idx:
+            self._window.add(issuer[i], owner[i], int(day[i]))
+        sizes = np.zeros(len(df), dtype=np.int64)
+        for i in idx:
+            sizes[i] = self._window.count(issuer[i], int(day[i]))
+        self._window.evict()
+        return self._score(df, sizes)
@@ -0,0 +1,177 @@
+"""
+Persistent record of processed filings, for continuous refresh.
+
+SeenIndex keeps every processed filing key (accessionNo, falling back to id) in SQLite,
+fronted by an in-memory Bloom filter: a negative answer means "definitely new" and
+skips the database entirely. The filter's bits are saved alongside the keys, so a
+restart reloads them instead of rescanning. Each query also has a filedAt high-water
+mark, which lets the poller ask sec-api only for filings at or after it.
+"""
+# std lib
+import hashlib
+import math
+import sqlite3
+from datetime import datetime, timezone
+from typing import Iterable
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen       (key TEXT PRIMARY KEY, filedAt TEXT);
+CREATE TABLE IF NOT EXISTS watermarks (query TEXT PRIMARY KEY, filedAt TEXT NOT NULL, utc TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS meta       (name TEXT PRIMARY KEY, value BLOB);
+"""
+
+# === Bloom filter ===
+class BloomFilter:
+    """Fixed-size Bloom filter with double hashing over one blake2b digest."""
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.001, bits: bytes | None = None):
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        self.size = max(8, int(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray(bits) if bits is not None else bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        d = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1, h2 = int.from_bytes(d[:8], "little"), int.from_bytes(d[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key: str) -> None:
+        for p in self._positions(key):
+            self.bits[p >> 3] |= 1 << (p & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+# === End Bloom filter ===
+
+def filing_key(filing: dict) -> str | None:
+    return filing.get("accessionNo") or filing.get("id")
+
+def _utc(filed_at: str) -> str:
+    """Normalize an ISO timestamp with offset to UTC so marks compare correctly."""
+    dt = datetime.fromisoformat(filed_at)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc).isoformat()
+
+class SeenIndex:
+    """
+    Dedup layer for the poller.
+
+        with SeenIndex("seen.sqlite") as seen:
+            new = seen.claim(filings)              # unseen filings, now marked seen
+            seen.advance(query, filings)           # move the filedAt high-water mark
+    """
+
+    def __init__(self, path: str = ":memory:", capacity: int = 1_000_000, error_rate: float = 0.001):
+        self.path = path
+        self._db = sqlite3.connect(path)
+        self._db.executescript(_SCHEMA)
+        self._error_rate = error_rate
+        self.bloom_hits = 0      # Bloom said "maybe" and SQLite was consulted
+        self.bloom_skips = 0     # Bloom said "new", no SQLite lookup
+        self._load_bloom(capacity)
+
+    # --- Bloom persistence ---
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+
+    def _load_bloom(self, capacity: int) -> None:
+        n = len(self)
+        meta = dict(self._db.execute("SELECT name, value FROM meta WHERE name LIKE 'bloom%'"))
+        if meta.get("bloom_count") is not None and int(meta["bloom_count"]) == n:
+            self._bloom = BloomFilter(int(meta["bloom_capacity"]), float(meta["bloom_error_rate"]),
+                                      bits=meta["bloom_bits"])
+            self._bloom.count = n
+            return
+        self._rebuild_bloom(max(capacity, 2 * n))
+
+    def _rebuild_bloom(self, capacity: int) -> None:
+        self._bloom = BloomFilter(capacity, self._error_rate)
+        for (key,) in self._db.execute("SELECT key FROM seen"):
+            self._bloom.add(key)
+
+    def checkpoint(self) -> None:
+        """Save the Bloom filter so the next start can skip rebuilding it."""
+        b = self._bloom
+        b.count = len(self)
+        self._db.executemany(
+            "INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)",
+            [("bloom_bits", bytes(b.bits)), ("bloom_count", str(b.count)),
+             ("bloom_capacity", str(b.capacity)), ("bloom_error_rate", str(b.error_rate))],
+        )
+        self._db.commit()
+
+    def close(self) -> None:
+        self.checkpoint()
+        self._db.close()
+
+    def __enter__(self) -> "SeenIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # --- Seen filings ---
+    def __contains__(self, key: str) -> bool:
+        if key not in self._bloom:
+            self.bloom_skips += 1
+            return False
+        self.bloom_hits += 1
+        return self._db.execute("SELECT 1 FROM seen WHERE key = ?", (key,)).fetchone() is not None
+
+    def unseen(self, filings: Iterable[dict]) -> list[dict]:
+        """Filings whose key has not been marked seen (also de-duplicated within the batch)."""
+        out, batch = [], set()
+        for f in filings:
+            key = filing_key(f)
+            if key is None or key in batch or key in self:
+                continue
+            batch.add(key)
+            out.append(f)
+        return out
+
+    def mark_seen(self, filings: Iterable[dict]) -> None:
+        rows = [(filing_key(f), f.get("filedAt")) for f in filings if filing_key(f) is not None]
+        cur = self._db.executemany("INSERT OR IGNORE INTO seen (key, filedAt) VALUES (?, ?)", rows)
+        self._db.commit()
+        for key, _ in rows:
+            self._bloom.add(key)
+        if cur.rowcount and self._bloom.count > self._bloom.capacity:
+            self._rebuild_bloom(2 * self._bloom.count)
+
+    def claim(self, filings: Iterable[dict]) -> list[dict]:
+        """unseen() + mark_seen() in one step."""
+        new = self.unseen(filings)
+        self.mark_seen(new)
+        return new
+
+    # --- High-water marks ---
+    def watermark(self, query: str) -> str | None:
+        """Newest filedAt processed for this query (as sent by sec-api), or None."""
+        row = self._db.execute("SELECT filedAt FROM watermarks WHERE query = ?", (query,)).fetchone()
+        return row[0] if row else None
+
+    def advance(self, query: str, filings: Iterable[dict]) -> str | None:
+        """Raise the query's mark to the newest filedAt among filings; never lowers it."""
+        best = self._db.execute("SELECT filedAt, utc FROM watermarks WHERE query = ?", (query,)).fetchone()
+        for f in filings:
+            filed = f.get("filedAt")
+            if not filed:
+                continue
+            utc = _utc(filed)
+            if best is None or utc > best[1]:
+                best = (filed, utc)
+        if best is not None:
+            self._db.execute("INSERT OR REPLACE INTO watermarks (query, filedAt, utc) VALUES (?, ?, ?)",
+                             (query, *best))
+            self._db.commit()
+        return best[0] if best else None
+
+def since_query(query: str, filed_at: str | None) -> str:
+    """Restrict a sec-api query to filings at or after filed_at (inclusive; dedup handles ties)."""
+    if not filed_at:
+        return query
+    return f'({query}) AND filedAt:["{filed_at}" TO *]'
@@ -0,0 +1,190 @@
+"""
+Append-only, partitioned columnar store for flattened legs.
+
+Layout (one Arrow IPC file per append per partition, uncompressed so it can be
+memory-mapped without copying):
+
+    <root>/filed=2025-08/issuer=AAPL/part-<uuid>.arrow
+
+Partitions are the UTC filing month (or day) and the issuer symbol. A scan prunes
+directories on issuer_symbol and the filedAt range first, memory-maps only the
+surviving files, projects the requested columns and then filters rows on
+owner_cik and the exact filedAt bounds. Every part is also listed in
+_manifest.jsonl (see manifest.py) so store statistics need no Arrow reads.
+"""
+# std lib
+import os
+import uuid
+from pathlib import Path
+from typing import Iterable
+from urllib.parse import quote, unquote
+
+# packages
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.ipc as ipc
+
+# local lib
+from insider_trading import manifest
+
+FILED_UTC = "_filed_utc"    # hidden timestamp column used for range filters
+_NULL_ISSUER = "__null__"
+_GRAINS = {"month": 7, "day": 10}
+
+def _to_utc(values) -> pd.Series:
+    return pd.to_datetime(pd.Series(values, dtype=object), utc=True, errors="coerce", format="ISO8601")
+
+def _bound(ts) -> pd.Timestamp | None:
+    if ts is None:
+        return None
+    ts = pd.Timestamp(ts)
+    return ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+
+class LegStore:
+    """
+        store = LegStore("data/legs")
+        store.append(flatten_insider_payload(payload, engine="columnar"))
+        df = store.scan(columns=["filedAt", "owner_name", "shares"], issuer_symbol="AAPL",
+                        filed_from="2025-04-01", filed_to="2025-07-01")
+    """
+
+    def __init__(self, root: str | os.PathLike, grain: str = "month"):
+        if grain not in _GRAINS:
+            raise ValueError(f"grain must be one of {sorted(_GRAINS)}")
+        self.root = Path(root)
+        self.grain = grain
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    # --- Writing ---
+    def append(self, df: pd.DataFrame) -> list[Path]:
+        """Write one new part file per (filing period, issuer) partition present in df."""
+        if df is None or df.empty:
+            return []
+        filed = _to_utc(df["filedAt"]).reset_index(drop=True)
+        period = filed.dt.strftime("%Y-%m-%d").str.slice(0, _GRAINS[self.grain]).fillna("unknown")
+        issuer = pd.Series(df["issuer_symbol"], dtype=object).reset_index(drop=True)
+        issuer = issuer.where(issuer.notna(), _NULL_ISSUER).astype(str)
+
+        data = df.reset_index(drop=True).assign(**{FILED_UTC: filed})
+        written, entries = [], []
+        for (p, sym), idx in data.groupby([period, issuer], sort=False).indices.items():
+            table = pa.Table.from_pandas(data.iloc[idx], preserve_index=False)
+            part_dir = self.root / f"filed={p}" / f"issuer={quote(sym, safe='')}"
+            part_dir.mkdir(parents=True, exist_ok=True)
+            path = part_dir / f"part-{uuid.uuid4().hex}.arrow"
+            tmp = path.with_suffix(".tmp")
+            with pa.OSFile(str(tmp), "wb") as sink, ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+            os.replace(tmp, path)   # readers never see half-written parts
+            written.append(path)
+            entries.append(self._entry(path, p, sym, len(idx), filed.iloc[idx]))
+        manifest.record(self.root, entries)
+        return written
+
+    def _entry(self, path: Path, period: str, issuer: str, rows: int, filed: pd.Series) -> dict:
+        lo, hi = filed.min(), filed.max()
+        iso = lambda ts: None if pd.isna(ts) else ts.isoformat()
+        return {"path": path.relative_to(self.root).as_posix(), "rows": int(rows),
+                "bytes": path.stat().st_size, "period": period, "issuer": issuer,
+                "filed_min": iso(lo), "filed_max": iso(hi)}
+
+    def reindex(self) -> int:
+        """Rebuild the manifest from the part files' own footers; returns the part count."""
+        entries = []
+        for period, sym, d in self.partitions():
+            for path in sorted(d.glob("part-*.arrow")):
+                with pa.memory_map(str(path), "r") as source:
+                    table = ipc.open_file(source).read_all()
+                filed = table.column(FILED_UTC).to_pandas() if FILED_UTC in table.column_names \
+                    else pd.Series([], dtype="datetime64[ns, UTC]")
+                entries.append(self._entry(path, period, sym, table.num_rows, filed))
+        manifest.rewrite(self.root, entries)
+        return len(entries)
+
+    def stats(self, verify: bool = False) -> dict:
+        """manifest.summarize() for this store."""
+        return manifest.summarize(self.root, verify=verify)
+
+    # --- Reading ---
+    def partitions(self) -> list[tuple[str, str, Path]]:
+        """(period, issuer_symbol, directory) for every partition on disk."""
+        out = []
+        for pdir in sorted(self.root.glob("filed=*")):
+            for idir in sorted(pdir.glob("issuer=*")):
+                out.append((pdir.name[6:], unquote(idir.name[7:]), idir))
+        return out
+
+    def files(self, issuer_symbol=None, filed_from=None, filed_to=None) -> list[Path]:
+        """Part files that can contain matches; pruning on the partition names only."""
+        symbols = None
+        if issuer_symbol is not None:
+            symbols = {issuer_symbol} if isinstance(issuer_symbol, str) else set(issuer_symbol)
+        n = _GRAINS[self.grain]
+        lo = _bound(filed_from).strftime("%Y-%m-%d")[:n] if filed_from is not None else None
+        # filed_to is exclusive, so a bound on a period boundary does not pull in that period
+        hi = (_bound(filed_to) - pd.Timedelta(1, "us")).strftime("%Y-%m-%d")[:n] \
+            if filed_to is not None else None
+        out = []
+        for period, sym, d in self.partitions():
+            if symbols is not None and sym not in symbols:
+                continue
+            if period != "unknown" and ((lo and period < lo) or (hi and period > hi)):
+                continue
+            out.extend(sorted(d.glob("part-*.arrow")))
+        return out
+
+    def scan_table(self, columns: Iterable[str] | None = None, issuer_symbol=None, owner_cik=None,
+                   filed_from=None, filed_to=None) -> pa.Table:
+        """
+        Memory-mapped scan returning an Arrow table.
+        - columns: projection (None = all stored columns)
+        - issuer_symbol / owner_cik: a value or a collection of values
+        - filed_from (inclusive) / filed_to (exclusive): filedAt bounds, naive = UTC
+        """
+        lo, hi = _bound(filed_from), _bound(filed_to)
+        columns = list(columns) if columns is not None else None
+        tables = []
+        for path in self.files(issuer_symbol, filed_from, filed_to):
+            with pa.memory_map(str(path), "r") as source:
+                table = ipc.open_file(source).read_all()   # zero-copy view of the mapping
+            if columns is not None:
+                # Project before filtering so untouched columns' pages are never read
+                keep = set(columns) | ({"owner_cik"} if owner_cik is not None else set()) \
+                       | ({FILED_UTC} if lo is not None or hi is not None else set())
+                table = table.select([c for c in table.column_names if c in keep])
+            mask = None
+            if owner_cik is not None:
+                ciks = [owner_cik] if isinstance(owner_cik, (str, int)) else list(owner_cik)
+                col = table.column("owner_cik")
+                m = pc.is_in(pc.cast(col, pa.string()), value_set=pa.array([str(c) for c in ciks]))
+                mask = m if mask is None else pc.and_(mask, m)
+            if lo is not None or hi is not None:
+                ts = table.column(FILED_UTC)
+                if lo is not None:
+                    m = pc.greater_equal(ts, pa.scalar(lo.to_pydatetime(), ts.type))
+                    mask = m if mask is None else pc.and_(mask, m)
+                if hi is not None:
+                    m = pc.less(ts, pa.scalar(hi.to_pydatetime(), ts.type))
+                    mask = m if mask is None else pc.and_(mask, m)
+            if mask is not None:
+                table = table.filter(mask)
+            if columns is not None:
+                table = table.select([c for c in columns if c in table.column_names])
+            if table.num_rows:
+                tables.append(table)
+        if not tables:
+            return pa.table({c: pa.array([], pa.null()) for c in (columns or [])})
+        return pa.concat_tables(tables, promote_options="permissive")
+
+    def scan(self, columns: Iterable[str] | None = None, issuer_symbol=None, owner_cik=None,
+             filed_from=None, filed_to=None) -> pd.DataFrame:
+        """scan_table() as a pandas frame, newest filings first; the hidden column is dropped."""
+        wanted = None if columns is None else list(columns)
+        projection = None if wanted is None else wanted + [FILED_UTC]
+        df = self.scan_table(projection, issuer_symbol, owner_cik, filed_from, filed_to).to_pandas()
+        if FILED_UTC in df.columns:
+            df = df.sort_values(FILED_UTC, ascending=False, kind="stable")
+            if wanted is None or FILED_UTC not in wanted:
+                df = df.drop(columns=FILED_UTC)
+        return df.reset_index(drop=True)
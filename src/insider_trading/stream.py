@@ -0,0 +1,216 @@
+"""
+Streaming reader for sec-api insider-trading payloads.
+
+Yields one filing at a time from a file path or an open text/byte stream, so only the
+current filing (plus one read chunk) is ever held in memory. Understands:
+    - the API response shape   {"total": {...}, "transactions": [ {...}, ... ]}
+    - a bare top-level list    [ {...}, ... ]
+    - JSON Lines (lines=True)  one filing object per line, as in bulk archives
+"""
+# std lib
+import codecs
+import json
+import os
+import re
+from typing import Any, BinaryIO, Iterator, TextIO
+
+# local lib
+from insider_trading.types.sec_filings import SECTransaction, ValidationMode, parse_filing
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+_WS = re.compile(r"[ \t\n\r]*")
+_STRUCT = re.compile(r'["\[\]{}]')    # outside strings: what changes the nesting
+_STR_END = re.compile(r'["\\]')       # inside strings: closing quote or escape
+_SCALAR_END = re.compile(r"[ \t\n\r,\]}:]")
+_DECODER = json.JSONDecoder()
+
+# === Incremental scanner ===
+class _Scanner:
+    """
+    Pull-based JSON scanner over a text read() callable with a sliding buffer.
+
+    A value that is not complete yet is found by a structural scan (nesting depth,
+    string and escape state) that resumes where the previous chunk left off, so each
+    character is scanned once and the value is decoded once, however many chunks it spans.
+    """
+
+    def __init__(self, read, chunk_size: int):
+        self._read = read
+        self._chunk_size = chunk_size
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        chunk = self._read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        # Drop everything already consumed so the buffer stays bounded
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character without consuming it ('' at EOF)."""
+        while True:
+            self._pos = _WS.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, ch: str) -> None:
+        got = self.peek()
+        if got != ch:
+            raise ValueError(f"expected {ch!r} at offset {self._pos}, got {got!r}")
+        self._pos += 1
+
+    def _scan(self, text: str, i: int) -> int | None:
+        """Advance the scan state over text[i:]; the value's end offset in text, or None."""
+        if self._scalar:
+            m = _SCALAR_END.search(text, i)
+            return m.start() if m else None
+        n = len(text)
+        while i < n:
+            if self._in_str:
+                if self._esc:                       # escape split across chunks
+                    self._esc = False
+                    i += 1
+                    continue
+                m = _STR_END.search(text, i)
+                if m is None:
+                    return None
+                i = m.end()
+                if m.group() == "\\":
+                    self._esc = True
+                    continue
+                self._in_str = False
+                if self._depth == 0:                # a top-level string value
+                    return i
+                continue
+            m = _STRUCT.search(text, i)
+            if m is None:
+                return None
+            c, i = m.group(), m.end()
+            if c == '"':
+                self._in_str = True
+            elif c in "{[":
+                self._depth += 1
+            else:
+                self._depth -= 1
+                if self._depth == 0:
+                    return i
+        return None
+
+    def value(self) -> Any:
+        """Decode one complete JSON value, reading more input until it fits."""
+        if not self.peek():
+            raise json.JSONDecodeError("Expecting value", self._buf, self._pos)
+        first = self._buf[self._pos]
+        self._scalar = first not in '{["'
+        self._depth, self._in_str, self._esc = 0, False, False
+        if first == '"':
+            self._in_str, start = True, self._pos + 1
+        elif not self._scalar:
+            self._depth, start = 1, self._pos + 1
+        else:
+            start = self._pos
+        if self._scan(self._buf, start) is None:
+            # Collect chunks until the value ends, scanning each only once
+            parts = [self._buf[self._pos:]]
+            while True:
+                chunk = "" if self._eof else self._read(self._chunk_size)
+                if not chunk:
+                    self._eof = True
+                    break
+                parts.append(chunk)
+                if self._scan(chunk, 0) is not None:
+                    break
+            self._buf, self._pos = "".join(parts), 0
+        obj, end = _DECODER.raw_decode(self._buf, self._pos)
+        self._pos = end
+        return obj
+
+    def array_items(self) -> Iterator[Any]:
+        """Yield the items of the array starting at the cursor, one at a time."""
+        self.expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self.value()
+            sep = self.peek()
+            self._pos += 1
+            if sep == "]":
+                return
+            if sep != ",":
+                raise ValueError(f"expected ',' or ']' in array, got {sep!r}")
+# === End Incremental scanner ===
+
+def _text_reader(stream):
+    """Return a read(n) -> str callable for a text or binary stream."""
+    probe = stream.read(0)
+    if isinstance(probe, str):
+        return stream.read
+    decoder = codecs.getincrementaldecoder("utf-8")()
+
+    def read(n: int) -> str:
+        data = stream.read(n)
+        return decoder.decode(data, final=not data)
+    return read
+
+def _iter_from_stream(stream: TextIO | BinaryIO, lines: bool, chunk_size: int) -> Iterator[dict]:
+    if lines:
+        for line in stream:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+        return
+
+    scanner = _Scanner(_text_reader(stream), chunk_size)
+    first = scanner.peek()
+    if first == "[":
+        yield from scanner.array_items()
+    elif first == "{":
+        scanner.expect("{")
+        if scanner.peek() == "}":
+            return
+        while True:
+            key = scanner.value()
+            scanner.expect(":")
+            if key == "transactions":
+                yield from scanner.array_items()
+            else:
+                scanner.value()  # small top-level fields such as 'total'
+            if scanner.peek() == "}":
+                return
+            scanner.expect(",")
+    elif first:
+        raise ValueError(f"unexpected top-level JSON token {first!r}")
+
+def iter_filings(
+    source: str | os.PathLike | TextIO | BinaryIO,
+    *,
+    as_model: bool = False,
+    mode: ValidationMode = "strict",
+    lines: bool = False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[dict] | Iterator[SECTransaction]:
+    """
+    Yield filings one at a time from a path or an open text/byte stream.
+
+    Filings are plain dicts (ready for flattener.flatten_insider_payload and its chunked
+    variant) unless as_model=True, in which case each is built with the given
+    validation mode ('strict', 'lazy' or 'trusted'; see types.sec_filings).
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            yield from iter_filings(f, as_model=as_model, mode=mode, lines=lines, chunk_size=chunk_size)
+        return
+
+    for filing in _iter_from_stream(source, lines, chunk_size):
+        yield parse_filing(filing, mode) if as_model else filing
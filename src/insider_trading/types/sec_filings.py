@@ -1,8 +1,12 @@
 # std lib
 from datetime import datetime, date
+from functools import lru_cache
+from types import UnionType
+from typing import Literal, Union, get_args, get_origin
 
 # packages
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, TypeAdapter, create_model
+from pydantic_core import from_json
 
 # === Top level JSON === 
 class SECTotal(BaseModel):
@@ -89,4 +93,156 @@ class SECTransaction(BaseModel):
 
 class SECFilingJSON(BaseModel):
     total: SECTotal
-    transactions: list[SECTransaction]
\ No newline at end of file
+    transactions: list[SECTransaction]
+
+# === Validation modes ===
+# strict:  full SECFilingJSON / SECTransaction validation (the default)
+# lazy:    top-level filing fields are validated; the two tables and the footnotes are
+#          kept raw and validated on first access
+# trusted: for data already validated on ingest. Nothing is validated: the top level is
+#          built construct-style and the tables/footnotes are constructed on first access.
+#          Values keep their JSON types (e.g. filedAt stays a str).
+ValidationMode = Literal["strict", "lazy", "trusted"]
+
+@lru_cache(maxsize=None)
+def _adapter(tp) -> TypeAdapter:
+    return TypeAdapter(tp)
+
+def _lazy_field(name: str):
+    field = SECTransaction.model_fields[name]
+
+    def get(self):
+        cache = self._validated
+        if name not in cache:
+            extra = self.__pydantic_extra__ or {}
+            if name in extra:
+                cache[name] = self._build(field.annotation, extra[name])
+            else:
+                cache[name] = field.get_default(call_default_factory=True)
+        return cache[name]
+    return property(get, doc=f"SECTransaction.{name}, built on first access")
+
+# Kept raw until first access; everything else is declared exactly as on SECTransaction
+_LAZY_FIELDS = ("nonDerivativeTable", "derivativeTable", "footnotes")
+
+class _LazySECTransactionBase(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    _validated: dict = PrivateAttr(default_factory=dict)
+
+    nonDerivativeTable = _lazy_field("nonDerivativeTable")
+    derivativeTable    = _lazy_field("derivativeTable")
+    footnotes          = _lazy_field("footnotes")
+
+    @staticmethod
+    def _build(annotation, raw):
+        return _adapter(annotation).validate_python(raw)
+
+    def to_strict(self) -> SECTransaction:
+        return SECTransaction.model_validate({**self.model_dump(), **(self.__pydantic_extra__ or {})})
+
+LazySECTransaction = create_model(
+    "LazySECTransaction",
+    __base__=_LazySECTransactionBase,
+    __module__=__name__,
+    **{name: (field.annotation, field) for name, field in SECTransaction.model_fields.items()
+       if name not in _LAZY_FIELDS},
+)
+
+class TrustedSECTransaction(LazySECTransaction):
+    @staticmethod
+    def _build(annotation, raw):
+        return _construct_value(annotation, raw)
+
+class LazySECFilingJSON(BaseModel):
+    total: SECTotal
+    transactions: list[LazySECTransaction]
+
+class TrustedSECFilingJSON(BaseModel):
+    total: SECTotal
+    transactions: list[TrustedSECTransaction]
+
+def _model_shape(tp):
+    """('model' | 'list' | None, nested model class) for a field annotation."""
+    args = [a for a in get_args(tp) if a is not type(None)] if get_origin(tp) in (Union, UnionType) else [tp]
+    if len(args) == 1:
+        inner = args[0]
+        if isinstance(inner, type) and issubclass(inner, BaseModel):
+            return "model", inner
+        if get_origin(inner) is list:
+            (item,) = get_args(inner) or (None,)
+            if isinstance(item, type) and issubclass(item, BaseModel):
+                return "list", item
+    return None, None
+
+def _construct_value(annotation, v):
+    kind, sub = _model_shape(annotation)
+    if kind == "model" and type(v) is dict:
+        return construct_trusted(sub, v)
+    if kind == "list" and type(v) is list:
+        return [construct_trusted(sub, x) if type(x) is dict else x for x in v]
+    return v
+
+@lru_cache(maxsize=None)
+def _construct_plan(cls: type[BaseModel]) -> tuple:
+    """(field names, [(name, annotation)] of nested fields, [(name, default factory)], keeps extras)."""
+    nested, defaults = [], []
+    for name, field in cls.model_fields.items():
+        if _model_shape(field.annotation)[0] is not None:
+            nested.append((name, field.annotation))
+        if not field.is_required():
+            defaults.append((name, lambda f=field: f.get_default(call_default_factory=True, validated_data={})))
+    return frozenset(cls.model_fields), tuple(nested), tuple(defaults), cls.model_config.get("extra") == "allow"
+
+_set = object.__setattr__
+
+def construct_trusted(cls: type[BaseModel], data: dict) -> BaseModel:
+    """
+    Construct-style build without validation: nested dicts become model instances.
+    Only nested and defaulted fields are visited per object, and the instance slots
+    are filled directly instead of going through model_construct.
+    """
+    names, nested, defaults, keep_extra = _construct_plan(cls)
+    extra = None
+    if data.keys() <= names:
+        values = dict(data)
+    else:
+        values = {k: v for k, v in data.items() if k in names}
+        if keep_extra:
+            extra = {k: v for k, v in data.items() if k not in names}
+    fields_set = set(values)
+    for name, annotation in nested:
+        if name in values:
+            values[name] = _construct_value(annotation, values[name])
+    for name, default in defaults:
+        if name not in values:
+            values[name] = default()
+    obj = cls.__new__(cls)
+    _set(obj, "__dict__", values)
+    _set(obj, "__pydantic_fields_set__", fields_set)
+    _set(obj, "__pydantic_extra__", extra if keep_extra else None)
+    _set(obj, "__pydantic_private__", {k: p.get_default(call_default_factory=True)
+                                          for k, p in cls.__private_attributes__.items()}
+         if cls.__private_attributes__ else None)
+    return obj
+
+def parse_filing(data: dict, mode: ValidationMode = "strict") -> BaseModel:
+    """One filing dict as SECTransaction, LazySECTransaction or TrustedSECTransaction."""
+    if mode == "strict":
+        return _adapter(SECTransaction).validate_python(data)
+    if mode == "lazy":
+        return _adapter(LazySECTransaction).validate_python(data)
+    if mode == "trusted":
+        return construct_trusted(TrustedSECTransaction, data)
+    raise ValueError(f"unknown validation mode: {mode!r}")
+
+def parse_filings_json(raw: str | bytes, mode: ValidationMode = "strict") -> BaseModel:
+    """A whole sec-api response as SECFilingJSON, LazySECFilingJSON or TrustedSECFilingJSON."""
+    if mode == "strict":
+        return _adapter(SECFilingJSON).validate_json(raw)
+    if mode == "lazy":
+        return _adapter(LazySECFilingJSON).validate_json(raw)
+    if mode == "trusted":
+        return construct_trusted(TrustedSECFilingJSON, from_json(raw))
+    raise ValueError(f"unknown validation mode: {mode!r}")
+# === End Validation modes ===
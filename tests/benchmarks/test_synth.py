@@ -0,0 +1,60 @@
+import json
+
+import pandas as pd
+
+from benchmarks.suite import regressions, slow_startups
+from benchmarks.synth import iter_synthetic_filings, synthetic_payload, write_payload
+from flattener import flatten_insider_payload
+from insider_trading.stream import iter_filings
+from insider_trading.types.sec_filings import SECFilingJSON
+
+
+def test_same_seed_same_payload():
+    assert synthetic_payload(50, seed=3) == synthetic_payload(50, seed=3)
+    assert synthetic_payload(50, seed=3) != synthetic_payload(50, seed=4)
+
+
+def test_payload_validates_and_engines_agree():
+    payload = synthetic_payload(1500, seed=1)
+    SECFilingJSON.model_validate_json(json.dumps(payload))
+
+    rows = flatten_insider_payload(payload, engine="rows")
+    columnar = flatten_insider_payload(payload, engine="columnar")
+    pd.testing.assert_frame_equal(rows, columnar)
+    # The mix the generator promises is actually there
+    assert set(rows["table"]) == {"nonDeriv", "deriv", "nonDeriv_hold", "deriv_hold"}
+    assert any("reportingOwners" in f for f in payload["transactions"])
+    assert any(f["footnotes"] for f in payload["transactions"])
+
+
+def test_owners_are_distinct_within_a_filing():
+    multi = [f for f in synthetic_payload(1500, seed=1)["transactions"] if "reportingOwners" in f]
+    assert multi
+    for f in multi:
+        ciks = [o["cik"] for o in f["reportingOwners"]]
+        assert len(ciks) == len(set(ciks))
+
+
+def test_written_file_streams_back(tmp_path):
+    path = write_payload(tmp_path / "synth.jsonl", 200, seed=2, jsonl=True)
+    assert list(iter_filings(path, lines=True)) == list(iter_synthetic_filings(200, seed=2))
+
+
+def test_regressions_use_thresholds():
+    baseline = {"results": [{"case": "score", "filings": 10, "us_per_filing": 10.0, "peak_mb": 1.0},
+                            {"case": "flatten_rows", "filings": 10, "us_per_filing": 10.0}],
+                "thresholds": {"flatten_rows": {"time": 1.0}}}
+    current = {"results": [{"case": "score", "filings": 10, "us_per_filing": 13.0, "peak_mb": 1.1},
+                           {"case": "flatten_rows", "filings": 10, "us_per_filing": 19.0}]}
+    failed = regressions(current, baseline)
+    assert len(failed) == 1 and failed[0].startswith("score@10")
+
+
+def test_startup_cases_compare_seconds():
+    baseline = {"results": [{"case": "startup_stats", "filings": 10, "seconds": 0.040}]}
+    current = {"results": [{"case": "startup_stats", "filings": 10, "seconds": 0.060},
+                           {"case": "startup_help", "filings": 0, "seconds": 0.120},
+                           {"case": "startup_python", "filings": 0, "seconds": 0.150}]}
+    failed = regressions(current, baseline)
+    assert len(failed) == 1 and failed[0].startswith("startup_stats@10")
+    assert [f.split(":")[0] for f in slow_startups(current, 100)] == ["startup_help@0"]
@@ -0,0 +1,101 @@
+import json
+import os
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+
+from flattener import flatten_insider_payload
+from insider_trading import manifest
+from insider_trading.cli import main
+from insider_trading.store import LegStore
+
+SAMPLE = "insider_trades.json"
+HEAVY = ("pandas", "numpy", "pyarrow", "pydantic", "aiohttp")
+
+
+def _fresh(code: str) -> str:
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(["src", "."])}
+    return subprocess.run([sys.executable, "-c", code], env=env, check=True,
+                          capture_output=True, text=True).stdout
+
+
+@pytest.fixture
+def store(tmp_path):
+    root = tmp_path / "legs"
+    assert main(["backfill", SAMPLE, "--store", str(root), "--workers", "1"]) == 0
+    return root
+
+
+def test_help_and_stats_skip_heavy_imports(store):
+    out = _fresh(
+        "import contextlib, io, sys\n"
+        "from insider_trading.cli import main\n"
+        "with contextlib.redirect_stdout(io.StringIO()):\n"
+        "    try:\n"
+        "        main(['--help'])\n"
+        "    except SystemExit:\n"
+        "        pass\n"
+        f"    assert main(['stats', '--store', {str(store)!r}, '--json']) == 0\n"
+        f"print(','.join(m for m in {HEAVY!r} if m in sys.modules))\n")
+    assert out.strip() == ""
+
+
+def test_backfill_then_stats(store, capsys):
+    capsys.readouterr()
+    assert main(["stats", "--store", str(store), "--json"]) == 0
+    s = json.loads(capsys.readouterr().out)
+    assert s["rows"] == 46 and s["files"] == 4 and s["issuers"] == 1
+    assert s["top_issuers"] == {"AAPL": 46} and s["unindexed_files"] == 0
+    assert s["filed_min"] < s["filed_max"]
+
+
+def test_manifest_verify_and_reindex(store):
+    legs = LegStore(store)
+    (store / manifest.MANIFEST).unlink()
+    assert legs.stats()["unindexed_files"] == 4           # no manifest: listing only
+    with open(store / manifest.MANIFEST, "w") as f:
+        f.write('{"path": "filed=2025-0')                 # a writer died mid-line
+    assert legs.stats(verify=True)["rows"] == 0
+    assert legs.reindex() == 4
+    assert legs.stats(verify=True)["rows"] == 46
+
+
+def test_flatten_and_score(tmp_path, capsys):
+    out = tmp_path / "legs.parquet"
+    assert main(["flatten", SAMPLE, "-o", str(out), "--compact"]) == 0
+    with open(SAMPLE) as f:
+        expected = flatten_insider_payload(json.load(f), engine="columnar")
+    got = pd.read_parquet(out)
+    assert len(got) == len(expected) and list(got.columns) == list(expected.columns)
+
+    scored = tmp_path / "scored.jsonl"
+    metrics = tmp_path / "metrics.prom"
+    assert main(["score", SAMPLE, "--min-score", "0.3", "-o", str(scored),
+                 "--metrics-file", str(metrics)]) == 0
+    rows = pd.read_json(scored, lines=True)
+    assert len(rows) and (rows["score"].abs() >= 0.3).all()
+    assert 'insider_trading_stage_seconds_count{stage="score"}' in metrics.read_text()
+
+
+def test_score_from_store(store, capsys):
+    assert main(["score", "--store", str(store), "--issuer", "AAPL", "--from", "2025-05-01"]) == 0
+    out = capsys.readouterr().out
+    assert "AAPL" in out and "2025-04-" not in out
+    assert main(["score"]) == 2
+
+
+def test_legacy_arguments_route_to_poll(capsys):
+    assert main(["--once", "--seen-db", ""]) == 2     # no symbols: poll refuses
+    assert "nothing to poll" in capsys.readouterr().out
+    with pytest.raises(SystemExit):
+        main(["nope-command-with-bad-flag", "--bogus"])
+
+
+def test_global_options_before_the_command(store, tmp_path, capsys):
+    metrics = tmp_path / "m.json"
+    assert main(["--metrics-file", str(metrics), "stats", "--store", str(store), "--json"]) == 0
+    assert metrics.exists()
+    assert main([f"--metrics-file={metrics}", "--once", "--seen-db", ""]) == 2
+    assert "nothing to poll" in capsys.readouterr().out
@@ -0,0 +1,79 @@
+import json
+import re
+
+import pytest
+from aiohttp import web
+
+
+with open("./insider_trades.json", "r") as file:
+    FILINGS = json.load(file)["transactions"]
+
+
+class _LocalEndpoint:
+    """aiohttp app on a free local port serving POST /insider-trading with self.handle."""
+
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_post("/insider-trading", self.handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}/insider-trading"
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._runner.cleanup()
+
+
+class StubSecApi(_LocalEndpoint):
+    """Local stand-in for sec-api: pages over FILINGS, fails the first calls on demand."""
+
+    def __init__(self, fail_first: list[int] | None = None):
+        self.fail_first = list(fail_first or [])
+        self.bodies = []
+
+    async def handle(self, request):
+        body = await request.json()
+        self.bodies.append(body)
+        if "bad" in body["query"]:
+            return web.json_response({"message": "invalid query"}, status=400)
+        if self.fail_first:
+            return web.Response(status=self.fail_first.pop(0), headers={"Retry-After": "0"})
+        start, size = int(body["from"]), int(body["size"])
+        return web.json_response({"total": {"value": len(FILINGS), "relation": "eq"},
+                                  "transactions": FILINGS[start:start + size]})
+
+
+class FeedStub(_LocalEndpoint):
+    """sec-api stand-in over a mutable filing list that honours the filedAt lower bound and the sort order."""
+
+    def __init__(self, filings):
+        self.filings = filings
+        self.bodies = []
+
+    async def handle(self, request):
+        body = await request.json()
+        self.bodies.append(body)
+        rows = self.filings
+        since = re.search(r'filedAt:\["([^"]+)" TO \*\]', body["query"])
+        if since:
+            rows = [f for f in rows if f["filedAt"] >= since.group(1)]
+        desc = body["sort"][0]["filedAt"]["order"] == "desc"
+        rows = sorted(rows, key=lambda f: f["filedAt"], reverse=desc)
+        start, size = int(body["from"]), int(body["size"])
+        return web.json_response({"total": {"value": len(rows), "relation": "eq"},
+                                  "transactions": rows[start:start + size]})
+
+
+@pytest.fixture
+def sec_api():
+    """StubSecApi class: `async with sec_api(fail_first=[503]) as api: ... api.url`."""
+    return StubSecApi
+
+
+@pytest.fixture
+def sec_feed():
+    """FeedStub class: `async with sec_feed(filings) as api: api.filings += more`."""
+    return FeedStub
@@ -0,0 +1,65 @@
+import copy
+import json
+
+import pandas as pd
+import pytest
+
+from flattener import flatten_insider_payload
+
+
+with open("./insider_trades.json", "r") as file:
+    PAYLOAD = json.load(file)
+
+
+def _edge_case_filings():
+    """Filings that exercise holdings, plural owners, alias paths and missing numbers."""
+    base = copy.deepcopy(PAYLOAD["transactions"][0])
+
+    holdings = copy.deepcopy(base)
+    holdings["id"] = "hold-1"
+    holdings["nonDerivativeTable"] = {"holdings": [
+        {"securityTitle": "Common Stock", "amountOwned": 100,
+         "ownershipNature": {"directOrIndirectOwnership": "I"}},
+    ]}
+    holdings["derivativeTable"] = {"holdings": [
+        {"securityTitle": "Option", "postTransactionAmounts": {"sharesOwnedFollowing": 5},
+         "underlyingSecurity": {"title": "Common Stock", "shares": "5"}},
+    ]}
+
+    plural = copy.deepcopy(base)
+    plural["id"] = "plural-1"
+    owner = plural.pop("reportingOwner")
+    other = copy.deepcopy(owner)
+    other["name"], other["relationship"] = "ZZ FUND LP", {"isTenPercentOwner": True}
+    plural["reportingOwners"] = [owner, other]
+
+    aliases = copy.deepcopy(base)
+    aliases["id"] = "alias-1"
+    aliases["nonDerivativeTable"] = {"transactions": [
+        {"transactionCoding": {"transactionCode": "g"}, "amounts": {"shares": None},
+         "postTransactionAmounts": {"sharesOwnedFollowing": 10}},
+        {"transactionCode": {"code": None}, "transactionAcquiredDisposedCode": "a",
+         "amounts": {"shares": "x", "pricePerShare": 3.0}},
+        {"amounts": {"shares": 0}, "postTransactionAmounts": {"sharesOwnedFollowingTransaction": 0}},
+    ]}
+    return [holdings, plural, aliases]
+
+
+@pytest.mark.parametrize("payload", [
+    PAYLOAD,
+    PAYLOAD["transactions"] + _edge_case_filings(),
+])
+def test_columnar_matches_rows(payload):
+    rows = flatten_insider_payload(payload, engine="rows")
+    columnar = flatten_insider_payload(payload, engine="columnar")
+    pd.testing.assert_frame_equal(rows, columnar)
+
+
+def test_columnar_empty_payload():
+    assert flatten_insider_payload({"transactions": []}, engine="columnar").empty
+    assert flatten_insider_payload(None, engine="columnar").empty
+
+
+def test_unknown_engine():
+    with pytest.raises(ValueError):
+        flatten_insider_payload(PAYLOAD, engine="nope")
@@ -0,0 +1,50 @@
+import json
+
+import pandas as pd
+
+from flattener import (
+    COMPACT_DTYPES, flatten_insider_payload, iter_flatten_insider_payload, memory_report, to_compact,
+)
+from insider_trading.scoring import ScoringEngine
+
+
+with open("./insider_trades.json", "r") as file:
+    PAYLOAD = json.load(file)
+
+
+def test_columnar_builds_the_compact_schema():
+    df = flatten_insider_payload(PAYLOAD, engine="columnar", footnotes=True, compact=True)
+    for col, dtype in COMPACT_DTYPES.items():
+        assert str(df[col].dtype) == dtype, col
+    # Same rows and values as the default schema, converted afterwards
+    default = flatten_insider_payload(PAYLOAD, engine="columnar", footnotes=True)
+    pd.testing.assert_frame_equal(df, to_compact(default))
+
+
+def test_rows_engine_matches():
+    pd.testing.assert_frame_equal(flatten_insider_payload(PAYLOAD, engine="rows", compact=True),
+                                  flatten_insider_payload(PAYLOAD, engine="columnar", compact=True))
+
+
+def test_parsed_values():
+    df = flatten_insider_payload(PAYLOAD, engine="columnar", compact=True)
+    first = df.iloc[0]
+    assert first["filedAt"] == pd.Timestamp("2025-08-12T22:30:19Z")
+    assert first["transactionDate"] == pd.Timestamp("2025-08-08")
+    assert first["issuer_cik"] == 320193 and first["owner_cik"] == 1767094
+    assert df["isOfficer"].dtype == "boolean" and bool(first["isOfficer"])
+
+
+def test_smaller_and_still_scoreable():
+    default = flatten_insider_payload(PAYLOAD, engine="columnar")
+    compact = flatten_insider_payload(PAYLOAD, engine="columnar", compact=True)
+    assert memory_report(compact)["total"] < memory_report(default)["total"]
+    scored = ScoringEngine().score(compact)
+    expected = ScoringEngine().score(default)
+    assert (scored["score"].to_numpy() == expected["score"].to_numpy()).all()
+
+
+def test_chunked_compact_batches():
+    batches = list(iter_flatten_insider_payload(PAYLOAD, batch_size=10, compact=True))
+    assert sum(len(b) for b in batches) == 46
+    assert all(str(b["direction"].dtype) == "category" for b in batches)
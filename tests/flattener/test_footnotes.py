@@ -0,0 +1,62 @@
+import json
+import math
+
+import pandas as pd
+import pytest
+
+from flattener import flatten_insider_payload
+from footnotes import FOOTNOTE_COLS, footnote_features, leg_footnote_columns
+from helpers import has_10b5_1, has_weighted_avg
+
+
+with open("./insider_trades.json", "r") as file:
+    PAYLOAD = json.load(file)
+
+
+def test_single_pass_features():
+    f = footnote_features("Executed at prices ranging from $1,223.19 to $1,224.24; the weighted "
+                          "average price is shown. Rule 10b5-1 plan. Held by the Smith Family Trust.")
+    assert (f.plan_10b5_1, f.weighted_avg, f.gift, f.trust) == (True, True, False, True)
+    assert (f.price_low, f.price_high) == (1223.19, 1224.24)
+    assert footnote_features("Bona fide gift to a charity.").gift
+    assert math.isnan(footnote_features(None).price_low)
+
+
+def test_boilerplate_is_cached():
+    footnote_features.cache_clear()
+    for _ in range(50):
+        footnote_features("Signed by attorney-in-fact.")
+    assert footnote_features.cache_info().misses == 1
+
+
+def test_features_follow_footnote_ids():
+    filing = {
+        "footnotes": [{"id": "F1", "text": "Pursuant to a Rule 10b5-1 trading plan."},
+                      {"id": "F2", "text": "Prices ranging from $10.00 to $11.50."}],
+        "nonDerivativeTable": {"transactions": [
+            {"securityTitleFootnoteId": ["F1"], "amounts": {"pricePerShareFootnoteId": ["F2"]}},
+            {"amounts": {}},
+        ]},
+    }
+    cols = leg_footnote_columns(filing)
+    assert cols["fn_10b5_1"] == [True, False]
+    assert cols["fn_price_low"][0] == 10.0 and cols["fn_price_high"][0] == 11.5
+    assert math.isnan(cols["fn_price_low"][1])
+
+
+def test_flattened_frame_columns():
+    df = flatten_insider_payload(PAYLOAD, engine="columnar", footnotes=True)
+    assert list(df.columns[-len(FOOTNOTE_COLS):]) == list(FOOTNOTE_COLS)
+    # Columns without footnotes are unchanged
+    base = flatten_insider_payload(PAYLOAD)
+    pd.testing.assert_frame_equal(df.drop(columns=list(FOOTNOTE_COLS)), base)
+    # Leg-level flags never claim more than the filing-wide helpers
+    for acc, g in df.groupby("accessionNo"):
+        fns = next(f for f in PAYLOAD["transactions"] if f["accessionNo"] == acc).get("footnotes")
+        assert not g["fn_10b5_1"].any() or has_10b5_1(fns)
+        assert not g["fn_weighted_avg"].any() or has_weighted_avg(fns)
+
+
+def test_rows_engine_rejects_footnotes():
+    with pytest.raises(ValueError):
+        flatten_insider_payload(PAYLOAD, footnotes=True)
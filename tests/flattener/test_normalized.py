@@ -0,0 +1,76 @@
+import copy
+import json
+
+import pandas as pd
+import pytest
+
+from benchmarks.synth import synthetic_payload
+from flattener import flatten_insider_payload, normalize_insider_payload
+from insider_trading.cli import main
+
+
+with open("./insider_trades.json", "r") as file:
+    PAYLOAD = json.load(file)
+
+
+def _joint_filing():
+    """Sample filing reported by three owners, one of whom also files alone elsewhere."""
+    filing = copy.deepcopy(PAYLOAD["transactions"][0])
+    filing["id"] = filing["accessionNo"] = "joint"
+    solo = filing.pop("reportingOwner")
+    filing["reportingOwners"] = [
+        solo,
+        {"cik": "900001", "name": "Fund LP", "relationship": {"isTenPercentOwner": True}},
+        {"cik": "900002", "name": None, "relationship": {"isOther": True}},
+    ]
+    return filing
+
+
+@pytest.mark.parametrize("footnotes", [False, True])
+@pytest.mark.parametrize("compact", [False, True])
+def test_wide_matches_flatten(footnotes, compact):
+    norm = normalize_insider_payload(PAYLOAD, footnotes=footnotes, compact=compact)
+    expected = flatten_insider_payload(PAYLOAD, engine="columnar", footnotes=footnotes, compact=compact)
+    pd.testing.assert_frame_equal(norm.wide(), expected)
+    assert len(norm) == len(expected) and norm.columns() == list(expected.columns)
+
+
+def test_joint_filers_stored_once():
+    no_owner = copy.deepcopy(PAYLOAD["transactions"][1])
+    no_owner.pop("reportingOwner")
+    no_legs = {"id": "empty", "reportingOwner": {"cik": "1"}}
+    filings = PAYLOAD["transactions"] + [_joint_filing(), no_owner, no_legs]
+    norm = normalize_insider_payload(filings)
+    pd.testing.assert_frame_equal(norm.wide(), flatten_insider_payload(filings, engine="columnar"))
+
+    assert len(norm.filings) == 12                          # the filing without legs is dropped
+    assert len(norm.filing_owners) == 14                    # 10 + 3 joint filers + 1 ownerless
+    assert norm.filings.index.name == "filing_key" and norm.owners.index.name == "owner_key"
+    joint = norm.filings.index[norm.filings["id"] == "joint"][0]
+    n_legs = (norm.legs["filing_key"] == joint).sum()
+    assert (norm.wide()["id"] == "joint").sum() == 3 * n_legs   # legs stored once, not per owner
+    links = norm.filing_owners[norm.filing_owners["filing_key"] == joint]
+    assert (norm.filing_owners["owner_key"] == links["owner_key"].iloc[0]).sum() > 1   # shared owner key
+
+
+def test_synthetic_and_projection():
+    payload = synthetic_payload(500, seed=11)
+    norm = normalize_insider_payload(payload)
+    wide = flatten_insider_payload(payload, engine="columnar")
+    pd.testing.assert_frame_equal(norm.wide(), wide)
+    part = norm.wide(["owner_name", "shares", "filing_key"])
+    assert list(part.columns) == ["owner_name", "shares", "filing_key"]
+    pd.testing.assert_frame_equal(part[["owner_name", "shares"]], wide[["owner_name", "shares"]])
+    assert (norm.filings["id"].to_numpy()[part["filing_key"]] == wide["id"].to_numpy()).all()
+    with pytest.raises(KeyError):
+        norm.wide(["nope"])
+    assert normalize_insider_payload([]).wide().empty
+
+
+def test_cli_normalized(tmp_path):
+    out = tmp_path / "norm"
+    assert main(["flatten", "insider_trades.json", "--normalized", "-o", str(out)]) == 0
+    tables = {p.stem: pd.read_parquet(p) for p in out.iterdir()}
+    assert sorted(tables) == ["filing_owners", "filings", "legs", "owners"]
+    pd.testing.assert_frame_equal(tables["legs"], normalize_insider_payload(PAYLOAD).legs)
+    assert main(["flatten", "insider_trades.json", "--normalized"]) == 2
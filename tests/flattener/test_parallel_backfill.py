@@ -0,0 +1,52 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synth import synthetic_payload, write_payload
+from flattener import flatten_insider_payload
+from insider_trading.backfill import _line_ranges, _read_lines, kway_merge, parallel_flatten, sort_keys
+
+
+@pytest.fixture(scope="module")
+def payload():
+    return synthetic_payload(600, seed=5)
+
+
+def test_parallel_matches_single_process(payload):
+    expected = flatten_insider_payload(payload, engine="columnar", footnotes=True)
+    got = parallel_flatten(payload, workers=2, shard_size=70, footnotes=True)
+    pd.testing.assert_frame_equal(got, expected)
+
+
+def test_jsonl_byte_ranges(tmp_path, payload):
+    path = write_payload(tmp_path / "synth.jsonl", 600, seed=5, jsonl=True)
+    ranges = _line_ranges(path, 7)
+    ids = [f["id"] for r in ranges for f in _read_lines(*r)]
+    assert ids == [f["id"] for f in payload["transactions"]]
+
+    got = parallel_flatten(path, workers=2)
+    pd.testing.assert_frame_equal(got, flatten_insider_payload(payload, engine="columnar"))
+
+
+def test_json_file_and_empty_input(tmp_path):
+    with open("insider_trades.json") as f:
+        sample = json.load(f)
+    got = parallel_flatten("insider_trades.json", workers=1, shard_size=3)
+    pd.testing.assert_frame_equal(got, flatten_insider_payload(sample, engine="columnar"))
+    assert parallel_flatten([], workers=1).empty
+
+
+def test_sort_keys_order_like_sort_values():
+    df = pd.DataFrame({"a": ["b", None, "a", "b", "c", None], "b": [1.0, 2.0, np.nan, 0.0, 1.0, 1.0]})
+    key = sort_keys(df, ["a", "b"], [False, True])
+    expected = df.sort_values(["a", "b"], ascending=[False, True]).index.to_numpy()
+    assert (np.argsort(key, kind="stable") == expected).all()
+
+
+def test_kway_merge_is_a_stable_sort():
+    rng = np.random.default_rng(0)
+    runs = [np.sort(rng.integers(0, 20, rng.integers(0, 40))) for _ in range(7)]
+    order = kway_merge(runs)
+    assert (order == np.argsort(np.concatenate(runs), kind="stable")).all()
@@ -0,0 +1,83 @@
+import json
+
+from flattener import SchemaResolver, _first
+
+
+LEG_A = {"coding": {"code": "S"}, "amounts": {"acquiredDisposedCode": "D"}}
+LEG_B = {"transactionCoding": {"transactionCode": "P"}, "transactionAcquiredDisposedCode": "A"}
+
+
+def test_learns_variant_once_per_schema():
+    r = SchemaResolver()
+    get = r.bind("X0508")
+    assert get(LEG_A, "code") == "S"
+    assert r.probes == 1
+    for _ in range(10):
+        assert get(LEG_A, "code") == "S"
+    assert r.probes == 1
+    assert r.variants() == {"X0508": {"code": "coding.code"}}
+
+
+def test_mismatched_document_falls_back_and_relearns():
+    r = SchemaResolver()
+    get = r.bind("X0306")
+    assert get(LEG_A, "code") == "S"
+    assert get(LEG_B, "code") == _first(LEG_B, "coding.code", "transactionCode.code",
+                                        "transactionCoding.transactionCode")
+    assert r.variants()["X0306"]["code"] == "transactionCoding.transactionCode"
+    assert get(LEG_B, "acq_disp") == "A"
+
+
+def test_primary_path_wins_over_learned_alias():
+    r = SchemaResolver()
+    get = r.bind("X0306")
+    assert get(LEG_B, "code") == "P"          # learns transactionCoding.transactionCode
+    both = {"coding": {"code": "S"}, "transactionCoding": {"transactionCode": "P"}}
+    paths = ("coding.code", "transactionCode.code", "transactionCoding.transactionCode")
+    assert get(both, "code") == _first(both, *paths) == "S"
+    assert get(LEG_B, "code") == "P"
+
+
+def test_missing_field_returns_default():
+    r = SchemaResolver()
+    assert r.get({}, "X0508", "transactionDate", default="2025-01-01") == "2025-01-01"
+    assert r.get({"amounts": [1]}, "X0508", "shares") is None
+
+
+def test_absent_field_is_cached_until_it_appears():
+    r = SchemaResolver()
+    get = r.bind("X0508")
+    holding = {"securityTitle": "Common Stock", "postTransactionAmounts": {}}
+    for _ in range(10):
+        assert get(holding, "transactionDate", "n/a") == "n/a"
+    assert r.probes == 1
+    assert get({"transactionDate": "2025-01-02"}, "transactionDate") == "2025-01-02"
+    assert r.probes == 2
+    assert get({"transactionDate": "2025-01-03"}, "transactionDate") == "2025-01-03"
+    assert get(holding, "transactionDate") is None
+    assert r.probes == 3
+
+
+def test_fallbacks_count_only_alias_hits():
+    r = SchemaResolver()
+    get = r.bind("X0508")
+    for _ in range(3):
+        get(LEG_A, "code"), get(LEG_A, "transactionDate")
+    assert r.fallbacks == 0
+    for _ in range(3):
+        assert get(LEG_B, "code") == "P"
+    assert r.fallbacks == 3
+
+
+def test_primary_paths_payload_has_no_fallbacks():
+    with open("./insider_trades.json", "r") as file:
+        payload = json.load(file)
+    r = SchemaResolver()
+    for filing in payload["transactions"]:
+        get = r.bind(filing.get("schemaVersion"))
+        for table in ("nonDerivativeTable", "derivativeTable"):
+            for leg in (filing.get(table) or {}).get("transactions") or []:
+                for field in ("securityTitle", "transactionDate", "code", "acq_disp", "shares",
+                              "pricePerShare", "post_shares", "directOrIndirect"):
+                    get(leg, field)
+    assert r.probes > 0 and r.fallbacks == 0
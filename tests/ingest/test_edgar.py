@@ -0,0 +1,123 @@
+import io
+import json
+import tarfile
+import tracemalloc
+import zipfile
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from flattener import flatten_insider_payload
+from insider_trading import edgar
+from insider_trading.backfill import parallel_flatten
+from insider_trading.cli import main
+
+
+FIXTURES = Path(__file__).parent / "fixtures"
+SUBMISSIONS = FIXTURES / "edgar"            # the sample payload's filings as EDGAR submissions
+BARE_XML = FIXTURES / "000112760225000012.xml"
+
+with open("./insider_trades.json", "r") as file:
+    FILINGS = json.load(file)["transactions"]
+
+
+def _archive(tmp_path: Path, kind: str, copies: int = 1) -> Path:
+    docs = sorted(SUBMISSIONS.iterdir())
+    if kind == "zip":
+        path = tmp_path / "form4.zip"
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+            for i in range(copies):
+                for d in docs:
+                    zf.write(d, f"{i}/{d.name}")
+        return path
+    path = tmp_path / "form4.nc.tar.gz"
+    with tarfile.open(path, "w:gz") as tar:
+        for i in range(copies):
+            for d in docs:
+                tar.add(d, f"{i}/{d.name}")
+    return path
+
+
+def test_submissions_match_sec_api_filings():
+    got = {f["accessionNo"]: f for f in edgar.iter_filings(SUBMISSIONS)}
+    assert len(got) == len(FILINGS)
+    for f in FILINGS:
+        g = got[f["accessionNo"]]
+        assert g["id"] == f["accessionNo"]
+        assert {k: v for k, v in g.items() if k in f and k != "id"} == {k: v for k, v in f.items() if k != "id"}
+
+    expected = flatten_insider_payload(FILINGS, engine="columnar", footnotes=True)
+    parsed = flatten_insider_payload(list(got.values()), engine="columnar", footnotes=True)
+    pd.testing.assert_frame_equal(parsed.drop(columns="id"), expected.drop(columns="id"))
+
+
+def test_bare_xml_owners_holdings_and_footnotes():
+    (filing,) = edgar.iter_filings(BARE_XML)
+    assert filing["accessionNo"] == "0001127602-25-000012" and filing["filedAt"] is None
+    assert filing["issuer"] == {"cik": "1045810", "name": "NVIDIA CORP", "tradingSymbol": "NVDA"}
+    assert [o["cik"] for o in filing["reportingOwners"]] == ["1197647", "1566064"]
+    sale = filing["nonDerivativeTable"]["transactions"][0]
+    assert sale["transactionDate"] == "2025-03-03" and sale["amounts"]["shares"] == 1250
+    assert sale["codingFootnoteId"] == ["F1"] and sale["amounts"]["pricePerShareFootnoteId"] == ["F2"]
+    assert filing["derivativeTable"]["holdings"][0]["exerciseDateFootnoteId"] == ["F4"]
+    assert filing["footnotes"][0]["text"].endswith("on September 20, 2024.")   # inline markup kept as text
+
+    df = flatten_insider_payload([filing], engine="columnar", footnotes=True)
+    assert len(df) == 6                                      # 2 owners x (sale, 2 holdings)
+    assert sorted(df["table"].unique()) == ["deriv_hold", "nonDeriv", "nonDeriv_hold"]
+    sale_rows = df[df["table"] == "nonDeriv"]
+    assert sale_rows["fn_10b5_1"].all() and sale_rows["fn_trust"].all()
+    assert (sale_rows["fn_price_low"] == 114.01).all()
+    assert (df.loc[df["table"] == "deriv_hold", "underlying_shares"] == 20000).all()
+
+
+def test_streams_and_small_reads(monkeypatch):
+    sub = SUBMISSIONS / "0000320193-25-000049.txt"
+    xml, txt = list(edgar.iter_filings(BARE_XML)), list(edgar.iter_filings(sub))
+    monkeypatch.setattr(edgar, "CHUNK_SIZE", 7)             # tags and <XML> markers split across reads
+    assert list(edgar.iter_filings(io.BytesIO(BARE_XML.read_bytes()), name=BARE_XML.name)) == xml
+    with open(sub, "rb") as f:
+        assert list(edgar.iter_filings(f)) == txt
+    assert list(edgar.iter_filings(io.BytesIO(b"<ownershipDocument></ownershipDocument>")))[0]["id"] is None
+
+
+@pytest.mark.parametrize("kind", ["tar", "zip"])
+def test_archives_match_directory(tmp_path, kind):
+    expected = list(edgar.iter_filings(SUBMISSIONS))
+    assert list(edgar.iter_filings(_archive(tmp_path, kind))) == expected
+
+
+def test_memory_stays_flat_across_filings(tmp_path):
+    def peak(copies: int) -> int:
+        (tmp_path / str(copies)).mkdir()
+        path = _archive(tmp_path / str(copies), "tar", copies)
+        tracemalloc.start()
+        n = sum(1 for _ in edgar.iter_filings(path))
+        _, top = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        assert n == copies * len(FILINGS)
+        return top
+
+    peak(1)                                                  # warm up imports and caches
+    small, large = peak(10), peak(100)
+    assert large < small * 1.25
+
+
+@pytest.mark.parametrize("kind", ["dir", "tar", "zip"])
+def test_parallel_backfill(tmp_path, monkeypatch, kind):
+    source = SUBMISSIONS if kind == "dir" else _archive(tmp_path, kind, copies=2)
+    monkeypatch.setattr(edgar, "SHARD_SIZE", 3)             # several shards per source
+    assert len(list(edgar.shards(source, 3))) > 1
+    expected = flatten_insider_payload(list(edgar.iter_filings(source)), engine="columnar")
+    got = parallel_flatten(source, workers=2, tmpdir=str(tmp_path))
+    pd.testing.assert_frame_equal(got, expected)
+
+
+def test_cli_reads_edgar_sources(tmp_path):
+    out = tmp_path / "legs.parquet"
+    assert main(["flatten", str(SUBMISSIONS), "-o", str(out)]) == 0
+    assert len(pd.read_parquet(out)) == 46
+    store = tmp_path / "legs"
+    assert main(["backfill", str(_archive(tmp_path, "zip")), "--store", str(store), "--workers", "1"]) == 0
+    assert main(["stats", "--store", str(store), "--json"]) == 0
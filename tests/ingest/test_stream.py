@@ -0,0 +1,72 @@
+import io
+import json
+
+import pandas as pd
+
+from flattener import flatten_insider_payload, iter_flatten_insider_payload
+from insider_trading import stream
+from insider_trading.stream import iter_filings
+from insider_trading.types.sec_filings import SECTransaction
+
+
+with open("./insider_trades.json", "rb") as file:
+    RAW = file.read()
+PAYLOAD = json.loads(RAW)
+FILINGS = PAYLOAD["transactions"]
+
+
+def test_payload_file_small_chunks():
+    # A chunk far smaller than one filing forces every value to be read piecewise
+    assert list(iter_filings("./insider_trades.json", chunk_size=7)) == FILINGS
+
+
+def test_values_split_at_every_offset():
+    # Escapes, quotes and brackets inside strings, split across chunk boundaries
+    tricky = [{"a": "x\\\"}]{[,", "b": [1, 2.5e3, None, True], "c": "\\"}, {"d": 123456}]
+    text = json.dumps({"total": {"value": 2}, "transactions": tricky})
+    for size in (1, 2, 3, 5):
+        assert list(iter_filings(io.StringIO(text), chunk_size=size)) == tricky
+
+
+def test_filing_spanning_many_chunks_is_decoded_once(monkeypatch):
+    decodes = []
+
+    class CountingDecoder(json.JSONDecoder):
+        def raw_decode(self, s, idx=0):
+            decodes.append(idx)
+            return super().raw_decode(s, idx)
+
+    monkeypatch.setattr(stream, "_DECODER", CountingDecoder())
+    big = {"id": "x", "notes": ["y" * 50] * 4000}      # ~200 kB: ~800 chunks of 256
+    assert list(iter_filings(io.StringIO(json.dumps([big])), chunk_size=256)) == [big]
+    assert len(decodes) == 1
+
+
+def test_byte_and_text_streams():
+    assert list(iter_filings(io.BytesIO(RAW), chunk_size=64)) == FILINGS
+    assert list(iter_filings(io.StringIO(json.dumps(FILINGS)))) == FILINGS
+
+
+def test_json_lines_and_empty():
+    jsonl = "\n".join(json.dumps(f) for f in FILINGS).encode()
+    assert list(iter_filings(io.BytesIO(jsonl), lines=True)) == FILINGS
+    assert list(iter_filings(io.StringIO('{"total": {"value": 0}, "transactions": []}'))) == []
+
+
+def test_as_model():
+    filings = list(iter_filings("./insider_trades.json", as_model=True))
+    assert all(isinstance(f, SECTransaction) for f in filings)
+    assert filings[0].accessionNo == FILINGS[0]["accessionNo"]
+
+
+def test_chunked_flatten_matches_full():
+    full = flatten_insider_payload(PAYLOAD)
+    batches = list(iter_flatten_insider_payload(iter_filings("./insider_trades.json"), batch_size=5))
+    assert len(batches) > 1
+    assert all(len(b) < 5 + 10 for b in batches)
+    combined = (pd.concat(batches)
+                  .sort_values(["filedAt", "issuer_symbol", "owner_name", "transactionDate"],
+                               ascending=[False, True, True, True], kind="stable")
+                  .reset_index(drop=True))
+    # Per-batch dtype inference can differ (e.g. an all-None owner_title is object)
+    pd.testing.assert_frame_equal(full, combined.astype(full.dtypes.to_dict()))
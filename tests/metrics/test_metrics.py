@@ -0,0 +1,131 @@
+import asyncio
+import contextlib
+import json
+import pstats
+
+import aiohttp
+
+import flattener
+from insider_trading.main import flatten_handler
+from insider_trading.metrics import METRICS, Histogram, Metrics, profiled, serve_metrics
+from insider_trading.poller import PollerConfig, SecApiPoller
+
+
+with open("./insider_trades.json", "r") as file:
+    FILINGS = json.load(file)["transactions"]
+
+
+def test_handler_sink_tolerates_missing_symbol_and_owner():
+    f = json.loads(json.dumps(FILINGS[0]))
+    f["issuer"]["tradingSymbol"] = None
+    f["reportingOwner"]["name"] = None
+    lines = []
+    df = flatten_handler(sink=lines.append)("q", [f])
+    assert len(lines) == len(df) > 0
+    assert all(" ? " in line for line in lines)
+
+
+def test_prometheus_text_and_json():
+    m = Metrics(prefix="t", buckets=(0.1, 1.0))
+    m.describe("stage_seconds", "Stage time.")
+    m.inc("legs_total", 3)
+    m.inc("legs_total", 2)
+    m.inc("alerts_total", sink='we"b', outcome="failed")
+    for v in (0.05, 0.1, 0.5, 3.0):
+        m.observe("stage_seconds", v, stage="flatten")
+
+    text = m.to_prometheus()
+    assert "t_legs_total 5\n" in text
+    assert 't_alerts_total{outcome="failed",sink="we\\"b"} 1' in text
+    assert "# HELP t_stage_seconds Stage time.\n# TYPE t_stage_seconds histogram" in text
+    assert 't_stage_seconds_bucket{stage="flatten",le="0.1"} 2' in text      # le is inclusive
+    assert 't_stage_seconds_bucket{stage="flatten",le="1"} 3' in text
+    assert 't_stage_seconds_bucket{stage="flatten",le="+Inf"} 4' in text
+    assert 't_stage_seconds_count{stage="flatten"} 4' in text
+
+    snap = json.loads(m.to_json())
+    assert snap["counters"]["legs_total"] == {"_": 5}
+    series = snap["histograms"]["stage_seconds"]["stage=flatten"]
+    assert series["count"] == 4 and abs(series["sum"] - 3.65) < 1e-9
+    assert 0.1 <= series["p50"] <= 1.0
+
+
+def test_histogram_quantile_and_timer_errors():
+    h = Histogram((1, 2, 4))
+    for v in (0.5, 1.5, 1.5, 3):
+        h.observe(v)
+    assert h.quantile(0.5) == 1.5 and h.quantile(1.0) == 4
+    assert Histogram().quantile(0.5) is None
+
+    m = Metrics()
+    with contextlib.suppress(ValueError), m.timer("score"):
+        raise ValueError
+    assert m.counters["stage_errors_total"] == {(("stage", "score"),): 1}
+    assert next(iter(m.histograms["stage_seconds"].values())).count == 1
+
+
+def test_pipeline_stages_are_instrumented(sec_api):
+    METRICS.reset()
+    lines = []
+
+    async def scenario():
+        async with sec_api(fail_first=[503]) as api:
+            config = PollerConfig(url=api.url, page_size=5, max_pages=10, rate_per_sec=0, backoff_base=0.001)
+            handler = flatten_handler(sink=lines.append, validate=True)
+            async with SecApiPoller(config, handler) as poller:
+                await poller.poll_once(["issuer.tradingSymbol:AAPL"])
+
+    asyncio.run(scenario())
+    snap = METRICS.snapshot()
+    stages = snap["histograms"]["stage_seconds"]
+    assert stages["stage=fetch"]["count"] == 3            # 503, then two pages
+    assert stages["stage=validate"]["count"] == stages["stage=flatten"]["count"] == 2
+    assert stages["stage=score"]["count"] == 2
+    assert snap["counters"]["filings_total"] == {"_": len(FILINGS)}
+    assert snap["counters"]["legs_total"] == {"_": len(lines)} == {"_": 46}
+    assert snap["counters"]["http_retries_total"] == {"_": 1}
+    assert snap["counters"]["http_responses_total"] == {"status=503": 1, "status=200": 2}
+    assert "validation_errors_total" not in snap["counters"]
+    assert set(snap["counters"]["schema_fallbacks_total"]) == {"lookup=first", "lookup=resolver"}
+
+
+def test_first_counts_alias_hits():
+    before = flattener.fallback_hits()["first"]
+    assert flattener._first({"a": 1}, "a", "b") == 1
+    assert flattener._first({"b": 2}, "a", "b") == 2
+    assert flattener._first({}, "a", "b", default=0) == 0
+    assert flattener.fallback_hits()["first"] == before + 1
+
+
+def test_profile_hook(tmp_path, monkeypatch):
+    monkeypatch.delenv("INSIDER_TRADING_PROFILE", raising=False)
+    assert isinstance(profiled(), contextlib.nullcontext)
+
+    out = tmp_path / "run.prof"
+    monkeypatch.setenv("INSIDER_TRADING_PROFILE", str(out))
+    with profiled(top=5):
+        flattener.flatten_insider_payload({"transactions": FILINGS}, engine="columnar")
+    stats = pstats.Stats(str(out))
+    assert any(fn == "flatten_insider_payload" for (_, _, fn) in stats.stats)
+
+
+def test_metrics_endpoint():
+    m = Metrics()
+    m.inc("filings_total", 7)
+
+    async def scenario():
+        runner = await serve_metrics(m, port=0)
+        port = runner.addresses[0][1]
+        try:
+            async with aiohttp.ClientSession() as s:
+                async with s.get(f"http://127.0.0.1:{port}/metrics") as r:
+                    text = await r.text()
+                async with s.get(f"http://127.0.0.1:{port}/metrics.json") as r:
+                    data = await r.json()
+        finally:
+            await runner.cleanup()
+        return text, data
+
+    text, data = asyncio.run(scenario())
+    assert "insider_trading_filings_total 7" in text
+    assert data["counters"]["filings_total"] == {"_": 7}
@@ -0,0 +1,70 @@
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from insider_trading.stream import iter_filings
+from insider_trading.types.sec_filings import (
+    LazySECTransaction, SECTransaction, TransactionNonDerivativeTable, TrustedSECTransaction,
+    parse_filing, parse_filings_json,
+)
+
+
+with open("./insider_trades.json", "rb") as file:
+    RAW = file.read()
+FILINGS = json.loads(RAW)["transactions"]
+
+
+def test_lazy_matches_strict():
+    strict = parse_filings_json(RAW, "strict")
+    lazy = parse_filings_json(RAW, "lazy")
+    for s, l in zip(strict.transactions, lazy.transactions):
+        assert isinstance(l, LazySECTransaction)
+        assert l.accessionNo == s.accessionNo and l.filedAt == s.filedAt
+        assert l.nonDerivativeTable == s.nonDerivativeTable
+        assert l.footnotes == s.footnotes
+        assert l.to_strict() == s
+
+
+def test_lazy_defers_table_validation():
+    bad = dict(FILINGS[0], nonDerivativeTable={"transactions": [{"securityTitle": 1}]})
+    filing = parse_filing(bad, "lazy")       # top level is fine, table not checked yet
+    assert filing.issuer.tradingSymbol == "AAPL"
+    with pytest.raises(ValidationError):
+        filing.nonDerivativeTable
+    with pytest.raises(ValidationError):
+        parse_filing(bad, "strict")
+    with pytest.raises(ValidationError):
+        parse_filing(dict(FILINGS[0], filedAt="not a date"), "lazy")
+
+
+def test_lazy_missing_tables_use_defaults():
+    filing = parse_filing({k: v for k, v in FILINGS[0].items() if k != "footnotes"}, "lazy")
+    assert filing.footnotes == [] and filing.derivativeTable is None
+
+
+def test_lazy_fields_follow_strict_model():
+    lazy = set(LazySECTransaction.model_fields)
+    assert lazy == set(SECTransaction.model_fields) - {"nonDerivativeTable", "derivativeTable", "footnotes"}
+    for name in lazy:
+        assert LazySECTransaction.model_fields[name].annotation == SECTransaction.model_fields[name].annotation
+
+
+def test_trusted_builds_nested_models_without_validation():
+    trusted = parse_filings_json(RAW, "trusted")
+    t = trusted.transactions[0]
+    assert isinstance(t, TrustedSECTransaction)
+    assert t.reportingOwner.relationship.officerTitle == "Senior Vice President"
+    assert isinstance(t.nonDerivativeTable, TransactionNonDerivativeTable)
+    assert t.nonDerivativeTable.transactions[0].amounts.shares == 34821
+    assert t.filedAt == FILINGS[0]["filedAt"]    # kept as sent, not coerced
+    assert t.footnotes[0].id == "F1"
+    # Nothing is checked, so even bad data goes through
+    assert parse_filing(dict(FILINGS[0], filedAt="not a date"), "trusted").filedAt == "not a date"
+
+
+def test_stream_modes():
+    for mode, cls in (("strict", SECTransaction), ("lazy", LazySECTransaction), ("trusted", TrustedSECTransaction)):
+        assert all(isinstance(f, cls) for f in iter_filings("./insider_trades.json", as_model=True, mode=mode))
+    with pytest.raises(ValueError):
+        parse_filing(FILINGS[0], "sloppy")
@@ -0,0 +1,167 @@
+import asyncio
+import json
+
+import pandas as pd
+import pytest
+from aiohttp import web
+
+from flattener import flatten_insider_payload
+from insider_trading.notify import (
+    Alert, Dispatcher, FileSink, NotifierConfig, Sink, WebhookSink, alerts_from_frame,
+)
+from insider_trading.scoring import ScoringEngine
+
+
+with open("./insider_trades.json", "r") as file:
+    SCORED = ScoringEngine().score(flatten_insider_payload(json.load(file), engine="columnar"))
+
+
+def run(coro, timeout: float = 5.0):
+    """Run a scenario with a deadline so a stuck drain fails the test instead of hanging."""
+    return asyncio.run(asyncio.wait_for(coro, timeout))
+
+
+class Receiver:
+    """Local stand-in for a webhook endpoint: records bodies, can be slow or fail first."""
+
+    def __init__(self, delay: float = 0.0, fail_first: list[int] | None = None):
+        self.delay = delay
+        self.fail_first = list(fail_first or [])
+        self.bodies = []
+        self.active = self.max_active = 0
+
+    async def handle(self, request):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.fail_first:
+                return web.Response(status=self.fail_first.pop(0))
+            self.bodies.append(await request.json())
+            return web.json_response({"ok": True})
+        finally:
+            self.active -= 1
+
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_post("/hook", self.handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}/hook"
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._runner.cleanup()
+
+
+class GatedSink(Sink):
+    """Delivers only while the gate is open."""
+
+    name = "gated"
+
+    def __init__(self):
+        super().__init__(concurrency=1)
+        self.gate = asyncio.Event()
+        self.got = []
+
+    async def send(self, alert):
+        await self.gate.wait()
+        self.got.append(alert.accessionNo)
+
+
+def test_legs_coalesce_into_one_alert_per_filing():
+    alerts = alerts_from_frame(SCORED)
+    assert len(alerts) == SCORED["accessionNo"].nunique()
+    assert sum(len(a.legs) for a in alerts) == len(SCORED)
+    for a in alerts:
+        legs = SCORED[SCORED["accessionNo"] == a.accessionNo]
+        assert abs(a.score) == legs["score"].abs().max()
+
+
+def test_webhook_and_file_delivery(tmp_path):
+    async def scenario():
+        async with Receiver() as hook:
+            sinks = [WebhookSink(hook.url, concurrency=2), FileSink(tmp_path / "alerts.jsonl")]
+            async with Dispatcher(sinks) as d:
+                queued = await d.submit(SCORED)
+            return queued, hook.bodies, d.stats()
+
+    queued, bodies, stats = run(scenario())
+    lines = (tmp_path / "alerts.jsonl").read_text().splitlines()
+    assert queued == len(bodies) == len(lines) == SCORED["accessionNo"].nunique()
+    assert {b["accessionNo"] for b in bodies} == {json.loads(l)["accessionNo"] for l in lines}
+    assert stats["webhook"]["delivered"] == stats["file"]["delivered"] == queued
+    assert stats["webhook"]["p50"] > 0     # filedAt is in the past
+
+
+def test_webhook_concurrency_limit_and_retry():
+    async def scenario():
+        async with Receiver(delay=0.05, fail_first=[503]) as hook:
+            async with Dispatcher([WebhookSink(hook.url, concurrency=2, backoff_base=0.001)]) as d:
+                await d.submit(SCORED)
+            return hook, d.stats()
+
+    hook, stats = run(scenario())
+    assert hook.max_active == 2
+    assert len(hook.bodies) == SCORED["accessionNo"].nunique()
+    assert stats["webhook"]["failed"] == 0
+
+
+def test_backpressure_bounds_queue_and_coalesces_pending():
+    async def scenario():
+        sink = GatedSink()
+        async with Dispatcher([sink], NotifierConfig(queue_size=2)) as d:
+            producer = asyncio.create_task(d.submit(SCORED))
+            await asyncio.sleep(0.05)
+            blocked = not producer.done()
+            size = d._queue.qsize()
+            # A late leg of a filing still waiting in the queue joins its alert
+            waiting = next(iter(d._pending.values()))
+            await d.put(Alert(accessionNo=waiting.accessionNo, owners=["LATE"], score=0.0))
+            sink.gate.set()
+            await producer
+        return blocked, size, sink.got, d.coalesced, waiting
+
+    blocked, size, got, coalesced, waiting = run(scenario())
+    assert blocked and size == 2
+    assert len(got) == SCORED["accessionNo"].nunique()
+    assert coalesced == 1 and "LATE" in waiting.owners
+
+
+def test_compact_frame_alerts_carry_iso_filed_at():
+    with open("./insider_trades.json", "r") as file:
+        compact = ScoringEngine().score(
+            flatten_insider_payload(json.load(file), engine="columnar", compact=True))
+    assert isinstance(compact["filedAt"].iloc[0], pd.Timestamp)
+
+    async def scenario():
+        sink = GatedSink()
+        sink.gate.set()
+        async with Dispatcher([sink]) as d:
+            queued = await d.submit(compact)
+        return queued, d.stats()["gated"]
+
+    queued, stats = run(scenario())
+    assert queued == stats["delivered"] == compact["accessionNo"].nunique()
+    assert stats["p50"] > 0
+    alert = alerts_from_frame(compact)[0]
+    assert pd.Timestamp(alert.filedAt) == compact["filedAt"].iloc[0]
+
+
+def test_latency_measured_from_filed_at():
+    filed = "2025-01-02T10:00:00-05:00"
+    now = 1735830000.0 + 7.5   # 15:00:07.5 UTC
+
+    async def scenario():
+        sink = GatedSink()
+        sink.gate.set()
+        async with Dispatcher([sink], clock=lambda: now) as d:
+            await d.put(Alert(accessionNo="a", filedAt=filed))
+        return d.stats()["gated"]
+
+    stats = run(scenario())
+    assert stats["delivered"] == 1
+    assert stats["p50"] == pytest.approx(7.5)
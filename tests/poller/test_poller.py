@@ -0,0 +1,106 @@
+import asyncio
+import json
+import time
+
+from insider_trading.poller import PollerConfig, RateLimiter, SecApiPoller
+from insider_trading.seen import SeenIndex
+
+
+with open("./insider_trades.json", "r") as file:
+    FILINGS = json.load(file)["transactions"]
+
+
+def _config(url, **kw):
+    return PollerConfig(url=url, page_size=3, max_pages=10, rate_per_sec=0,
+                        backoff_base=0.001, **kw)
+
+
+def test_pages_are_fetched_and_delivered(sec_api):
+    async def scenario():
+        got = []
+        async with sec_api() as api:
+            async with SecApiPoller(_config(api.url), lambda q, f: got.extend(f)) as poller:
+                n = await poller.poll_once(["issuer.tradingSymbol:AAPL"])
+        return n, got, api.bodies, poller.stats
+
+    n, got, bodies, stats = asyncio.run(scenario())
+    assert n == len(FILINGS) == stats.filings
+    assert sorted(f["id"] for f in got) == sorted(f["id"] for f in FILINGS)
+    assert sorted(b["from"] for b in bodies) == [0, 3, 6, 9]
+
+
+def test_retries_429_and_5xx(sec_api):
+    async def scenario():
+        async with sec_api(fail_first=[429, 503, 502]) as api:
+            async with SecApiPoller(_config(api.url, max_retries=3)) as poller:
+                page = await poller.fetch_page("q", 0)
+        return page, poller.stats
+
+    page, stats = asyncio.run(scenario())
+    assert len(page["transactions"]) == 3
+    assert stats.retries == 3 and stats.requests == 4
+
+
+def test_failing_query_does_not_stop_the_round(sec_api):
+    async def scenario():
+        got = []
+        async with sec_api() as api:
+            async with SecApiPoller(_config(api.url), lambda q, f: got.extend(f)) as poller:
+                n = await poller.poll_once(["bad query", "issuer.tradingSymbol:AAPL"])
+        return n, got, poller.stats
+
+    n, got, stats = asyncio.run(scenario())
+    assert n == len(got) == len(FILINGS)
+    assert stats.errors == 1
+
+
+def test_async_handler_and_rate_limit(sec_api):
+    async def scenario():
+        seen = []
+
+        async def handler(query, filings):
+            seen.append(query)
+
+        async with sec_api() as api:
+            config = _config(api.url)
+            config.rate_per_sec, config.burst = 20.0, 1
+            async with SecApiPoller(config, handler) as poller:
+                t0 = time.monotonic()
+                await poller.poll_once(["a", "b"])
+                return seen, time.monotonic() - t0, poller.stats.requests
+
+    seen, elapsed, requests = asyncio.run(scenario())
+    assert sorted(set(seen)) == ["a", "b"]
+    # 8 requests at 20/s with a burst of 1 need at least 7 refill intervals
+    assert requests == 8 and elapsed >= 7 / 20 * 0.9
+
+
+def test_overlapping_pages_deliver_each_filing_once():
+    async def scenario():
+        got = []
+
+        async def slow_handler(query, filings):
+            await asyncio.sleep(0.02)     # both pages pass unseen() while this is suspended
+            got.extend(f["accessionNo"] for f in filings)
+
+        with SeenIndex() as seen:
+            poller = SecApiPoller(_config("http://unused"), slow_handler, seen)
+            await asyncio.gather(poller._deliver("q", FILINGS[0:4]),
+                                 poller._deliver("q", FILINGS[2:6]))
+            return got, poller._inflight, poller.stats
+
+    got, inflight, stats = asyncio.run(scenario())
+    expected = {f["accessionNo"] for f in FILINGS[0:6]}
+    assert sorted(got) == sorted(expected)
+    assert not inflight and stats.skipped == 8 - len(expected)
+
+
+def test_rate_limiter_disabled_is_free():
+    async def scenario():
+        limiter = RateLimiter(0)
+        t0 = time.monotonic()
+        for _ in range(1000):
+            await limiter.acquire()
+        return time.monotonic() - t0
+
+    assert asyncio.run(scenario()) < 0.5
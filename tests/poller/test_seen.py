@@ -0,0 +1,85 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+from insider_trading.poller import PollerConfig, SecApiPoller
+from insider_trading.seen import BloomFilter, SeenIndex, since_query
+
+
+with open("./insider_trades.json", "r") as file:
+    FILINGS = json.load(file)["transactions"]
+
+
+def test_bloom_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    keys = [f"0001-25-{i:06d}" for i in range(1000)]
+    for k in keys:
+        bloom.add(k)
+    assert all(k in bloom for k in keys)
+    false_pos = sum(f"other-{i}" in bloom for i in range(10_000))
+    assert false_pos < 300
+
+
+def test_claim_and_restart(tmp_path):
+    db = str(tmp_path / "seen.sqlite")
+    with SeenIndex(db) as seen:
+        assert len(seen.claim(FILINGS[:6])) == 6
+        assert seen.claim(FILINGS[:6]) == []
+        seen.advance("q", FILINGS[:6])
+
+    with SeenIndex(db) as seen:
+        # Bloom bits came back from disk: old keys are still "maybe", new keys skip SQLite
+        assert [f["id"] for f in seen.unseen(FILINGS)] == [f["id"] for f in FILINGS[6:]]
+        assert seen.bloom_skips >= 4
+        assert seen.watermark("q") == max(FILINGS[:6], key=lambda f: f["filedAt"])["filedAt"]
+
+
+def test_watermark_compares_in_utc():
+    with SeenIndex() as seen:
+        seen.advance("q", [{"filedAt": "2025-01-01T20:00:00-05:00"}])   # 01:00Z next day
+        seen.advance("q", [{"filedAt": "2025-01-01T23:00:00+00:00"}])   # earlier in UTC
+        assert seen.watermark("q") == "2025-01-01T20:00:00-05:00"
+    assert since_query("q", None) == "q"
+    assert since_query("q", "2025-01-01T20:00:00-05:00").endswith('filedAt:["2025-01-01T20:00:00-05:00" TO *]')
+
+
+def test_poller_skips_seen_filings(sec_api):
+    async def scenario():
+        delivered = []
+        async with sec_api() as api:
+            config = PollerConfig(url=api.url, page_size=5, max_pages=2, rate_per_sec=0)
+            with SeenIndex() as seen:
+                async with SecApiPoller(config, lambda q, f: delivered.append(len(f)), seen=seen) as poller:
+                    await poller.poll_once(["q"])
+                    await poller.poll_once(["q"])
+                return delivered, api.bodies, poller.stats
+
+    delivered, bodies, stats = asyncio.run(scenario())
+    assert sum(delivered) == len(FILINGS)
+    assert stats.skipped == len(FILINGS)
+    assert bodies[0]["query"] == "q" and "filedAt:[" in bodies[-1]["query"]
+
+
+def _feed(start, n):
+    t0 = datetime(2025, 1, 2, 14, tzinfo=timezone.utc)
+    return [{"accessionNo": f"a-{i:04d}", "filedAt": (t0 + timedelta(minutes=i)).isoformat()}
+            for i in range(start, start + n)]
+
+
+def test_backlog_larger_than_a_round_is_caught_up(sec_feed):
+    async def scenario():
+        delivered = []
+        async with sec_feed(_feed(0, 5)) as api:
+            config = PollerConfig(url=api.url, page_size=5, max_pages=2, rate_per_sec=0)
+            with SeenIndex() as seen:
+                async with SecApiPoller(config, lambda q, f: delivered.extend(f), seen=seen) as poller:
+                    await poller.poll_once(["q"])
+                    api.filings += _feed(5, 25)     # downtime: more than one round's 10
+                    for _ in range(4):
+                        await poller.poll_once(["q"])
+                    return delivered, seen.watermark("q")
+
+    delivered, mark = asyncio.run(scenario())
+    keys = [f["accessionNo"] for f in delivered]
+    assert len(keys) == len(set(keys)) == 30
+    assert mark == _feed(29, 1)[0]["filedAt"]
@@ -0,0 +1,105 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from flattener import flatten_insider_payload
+from insider_trading.cli import main
+from insider_trading.prices import PriceStore, price_cols, read_csv_bars
+
+
+with open("./insider_trades.json", "r") as file:
+    PAYLOAD = json.load(file)
+LEGS = flatten_insider_payload(PAYLOAD, engine="columnar")
+
+
+@pytest.fixture
+def csv_dir(tmp_path):
+    days = pd.bdate_range("2024-10-01", "2025-12-31")
+    close = np.round(200 + np.cumsum(np.random.default_rng(3).normal(0, 2, len(days))), 2)
+    bars = pd.DataFrame({"Date": days.strftime("%Y-%m-%d"), "Open": close, "High": close + 1,
+                         "Low": close - 1, "Close": close, "Adj Close": close, "Volume": 1_000_000})
+    bars = pd.concat([bars.iloc[::-1], bars.iloc[[5]]])     # unsorted, one duplicate day
+    d = tmp_path / "csv"
+    d.mkdir()
+    bars.to_csv(d / "AAPL.csv", index=False)
+    return d
+
+
+def _reference(legs: pd.DataFrame, bars: pd.DataFrame, horizons, max_stale_days: int = 7) -> pd.DataFrame:
+    """pd.merge_asof on the trade day, forward closes by shifting the bar series."""
+    bars = bars.reset_index(drop=True)
+    for k in horizons:
+        bars[f"fwd_{k}"] = bars["close"].shift(-k)
+    day = pd.to_datetime(legs["transactionDate"].str.slice(0, 10))
+    left = pd.DataFrame({"day": day, "pos": np.arange(len(legs))}).sort_values("day")
+    m = pd.merge_asof(left, bars.rename(columns={"date": "day_bar"}), left_on="day", right_on="day_bar",
+                      tolerance=pd.Timedelta(days=max_stale_days)).sort_values("pos")
+    out = pd.DataFrame({"close": m["close"].to_numpy(),
+                        "premium": legs["pricePerShare"].where(legs["pricePerShare"] > 0).to_numpy()
+                        / m["close"].to_numpy() - 1})
+    for k in horizons:
+        out[f"fwd_ret_{k}"] = (m[f"fwd_{k}"] / m["close"]).to_numpy() - 1
+    return out
+
+
+def test_csv_import_normalises_bars(csv_dir, tmp_path):
+    bars = read_csv_bars(csv_dir / "AAPL.csv")
+    assert list(bars.columns) == ["date", "open", "high", "low", "close", "volume"]
+    assert bars["date"].is_monotonic_increasing and bars["date"].is_unique
+
+    store = PriceStore(tmp_path / "px", csv_dir=csv_dir)
+    assert store.import_csv() == 1 and store.symbols() == ["AAPL"]
+    s = store.series("aapl")
+    assert np.array_equal(s.close, bars["close"].to_numpy())
+    assert store.series("MSFT") is None
+
+
+def test_enrich_matches_merge_asof(csv_dir, tmp_path):
+    store = PriceStore(tmp_path / "px", csv_dir=csv_dir)    # converted lazily on first use
+    out = store.enrich(LEGS, horizons=(1, 5, 20, 60))
+    assert set(price_cols((1, 5, 20, 60))) <= set(out.columns)
+    assert list(out.columns[:len(LEGS.columns)]) == list(LEGS.columns)
+
+    ref = _reference(LEGS, read_csv_bars(csv_dir / "AAPL.csv"), (1, 5, 20, 60))
+    for c in ref.columns:
+        np.testing.assert_allclose(out[c].to_numpy(), ref[c].to_numpy(), equal_nan=True, err_msg=c)
+    assert out["close"].notna().all()
+    assert (out["close_date"] <= pd.to_datetime(LEGS["transactionDate"])).all()
+
+
+def test_enrich_misses_and_cache(csv_dir, tmp_path):
+    legs = LEGS.head(6).copy()
+    legs.loc[legs.index[0], "issuer_symbol"] = "ZZZZ"                 # no prices
+    legs.loc[legs.index[1], "transactionDate"] = "2023-01-03"          # before the first bar
+    legs.loc[legs.index[2], "transactionDate"] = "2026-03-02"          # last bar is > 7 days old
+    legs.loc[legs.index[3], "pricePerShare"] = 0.0                     # gift: no premium
+    store = PriceStore(tmp_path / "px", csv_dir=csv_dir, cache_size=1)
+    out = store.enrich(legs)
+    assert out["close"].isna().tolist()[:3] == [True, True, True]
+    assert np.isnan(out["premium"].iloc[3]) and not np.isnan(out["close"].iloc[3])
+    assert out["close_date"].iloc[:3].isna().all()
+
+    store.enrich(legs)
+    assert store.cache_info() == {"hits": 0, "misses": 4, "size": 1, "max": 1}   # ZZZZ evicts AAPL
+
+    store.cache_size = 2
+    store.enrich(legs)
+    store.enrich(legs)
+    assert store.cache_info()["hits"] == 3           # AAPL on the first pass, both on the second
+
+
+def test_enrich_compact_schema(csv_dir, tmp_path):
+    compact = flatten_insider_payload(PAYLOAD, engine="columnar", compact=True)
+    store = PriceStore(tmp_path / "px", csv_dir=csv_dir)
+    a = store.enrich(compact)
+    b = store.enrich(LEGS)
+    np.testing.assert_allclose(a["fwd_ret_20"].to_numpy(), b["fwd_ret_20"].to_numpy(), equal_nan=True)
+
+
+def test_score_command_adds_prices(csv_dir, tmp_path):
+    out = tmp_path / "scored.parquet"
+    assert main(["score", "insider_trades.json", "--prices", str(csv_dir), "-o", str(out)]) == 0
+    df = pd.read_parquet(out)
+    assert {"premium", "fwd_ret_5", "score"} <= set(df.columns) and df["close"].notna().all()
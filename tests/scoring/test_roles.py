@@ -0,0 +1,61 @@
+import json
+
+import numpy as np
+import pytest
+
+from flattener import flatten_insider_payload
+from roles import ROLE_MAP, RoleScorer, role_score, role_scores
+
+
+def _linear_scan(rel):
+    """The original per-row scan the compiled matcher must reproduce."""
+    title = (rel.get("officerTitle") or "").lower()
+    for k, s in ROLE_MAP.items():
+        if k in title:
+            return s
+    if rel.get("isOfficer"):         return 0.50
+    if rel.get("isTenPercentOwner"): return 0.70
+    if rel.get("isDirector"):        return 0.60
+    return 0.30
+
+
+RELATIONSHIPS = [
+    {"officerTitle": "VP and CEO"},                 # later-in-title key with higher priority
+    {"officerTitle": "Senior Vice President, CFO"},
+    {"officerTitle": "EVP, Chief Operating Officer"},
+    {"officerTitle": "Chairman of the Board"},
+    {"officerTitle": "Ten Percent Owner"},
+    {"officerTitle": "Treasurer", "isOfficer": True},
+    {"officerTitle": None, "isDirector": True, "isTenPercentOwner": True},
+    {"isDirector": True},
+    {},
+    None,
+]
+
+
+@pytest.mark.parametrize("rel", RELATIONSHIPS)
+def test_matches_linear_scan(rel):
+    assert role_score(rel) == _linear_scan(rel or {})
+
+
+def test_vectorized_matches_scalar():
+    rels = [r or {} for r in RELATIONSHIPS]
+    got = role_scores([r.get("officerTitle") for r in rels],
+                      isOfficer=[r.get("isOfficer") for r in rels],
+                      isDirector=[r.get("isDirector") for r in rels],
+                      isTenPercentOwner=[r.get("isTenPercentOwner") for r in rels])
+    np.testing.assert_array_equal(got, [_linear_scan(r) for r in rels])
+
+
+def test_score_frame_matches_flattener():
+    with open("./insider_trades.json", "r") as f:
+        df = flatten_insider_payload(json.load(f))
+    np.testing.assert_array_equal(RoleScorer().score_frame(df), df["role_score"].to_numpy())
+
+
+def test_titles_are_memoized():
+    scorer = RoleScorer()
+    for _ in range(100):
+        scorer.score({"officerTitle": "Chief Financial Officer"})
+    info = scorer.title_score.cache_info()
+    assert (info.misses, info.hits) == (1, 99)
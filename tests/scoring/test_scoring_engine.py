@@ -0,0 +1,104 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from flattener import flatten_insider_payload
+from insider_trading.scoring import ScoringConfig, ScoringEngine, cluster_sizes
+
+
+def _legs(rows):
+    base = {"filedAt": "2025-01-01T00:00:00-05:00", "direction": "BUYish", "value_usd": 50_000.0,
+            "stake_change": 0.01, "role_score": 0.6}
+    return pd.DataFrame([{**base, **r} for r in rows])
+
+
+def _pairwise_sizes(issuer, owner, day, window):
+    """Reference O(n^2) definition the sweep must reproduce."""
+    return np.array([
+        len({owner[j] for j in range(len(day))
+             if issuer[j] == issuer[i] and day[i] - window <= day[j] <= day[i]})
+        for i in range(len(day))
+    ])
+
+
+def test_cluster_sizes_match_pairwise():
+    rng = np.random.default_rng(7)
+    n = 400
+    issuer = rng.choice(["1", "2", "3"], n)
+    owner = rng.choice([str(i) for i in range(12)], n)
+    day = rng.integers(0, 90, n)
+    for window in (0, 3, 14, 200):
+        expected = _pairwise_sizes(issuer, owner, day, window)
+        assert (cluster_sizes(issuer, owner, day, window) == expected).all()
+
+
+def test_cluster_buy_flags_third_distinct_buyer():
+    df = _legs([
+        {"issuer_cik": "1", "owner_cik": "a", "code": "P", "transactionDate": "2025-01-01"},
+        {"issuer_cik": "1", "owner_cik": "a", "code": "P", "transactionDate": "2025-01-03"},
+        {"issuer_cik": "1", "owner_cik": "b", "code": "P", "transactionDate": "2025-01-05"},
+        {"issuer_cik": "1", "owner_cik": "c", "code": "P", "transactionDate": "2025-01-10"},
+        {"issuer_cik": "1", "owner_cik": "d", "code": "P", "transactionDate": "2025-03-01"},  # outside
+        {"issuer_cik": "2", "owner_cik": "e", "code": "P", "transactionDate": "2025-01-10"},  # other issuer
+        {"issuer_cik": "1", "owner_cik": "f", "code": "S", "transactionDate": "2025-01-10",
+         "direction": "SELLish"},                                                              # not a buy
+    ])
+    scored = ScoringEngine().score(df)
+    assert scored["cluster_size"].tolist() == [1, 1, 2, 3, 1, 1, 0]
+    assert scored["is_cluster"].tolist() == [False, False, False, True, False, False, False]
+    assert scored.loc[3, "score"] > scored.loc[2, "score"]
+
+
+def test_labels_follow_configured_thresholds():
+    config = ScoringConfig(labels=[(0.5, "hot"), (0.0, "meh")], floor_label="cold")
+    engine = ScoringEngine(config)
+    assert engine.label([0.9, 0.5, 0.2, 0.0, -0.1]).tolist() == ["hot", "hot", "meh", "meh", "cold"]
+
+
+def test_sign_and_plan_damping():
+    df = _legs([
+        {"issuer_cik": "1", "owner_cik": "a", "code": "P", "transactionDate": "2025-01-01"},
+        {"issuer_cik": "1", "owner_cik": "a", "code": "S", "transactionDate": "2025-01-01",
+         "direction": "SELLish"},
+        {"issuer_cik": "1", "owner_cik": "a", "code": "S", "transactionDate": "2025-01-01",
+         "direction": "SELLish", "fn_10b5_1": True},
+        {"issuer_cik": "1", "owner_cik": "a", "code": "F", "transactionDate": "2025-01-01",
+         "direction": "TAX"},
+    ])
+    df.loc[df["fn_10b5_1"].isna(), "fn_10b5_1"] = False
+    score = ScoringEngine().score(df)["score"].to_numpy()
+    assert score[0] > 0 > score[1]
+    assert score[2] == pytest.approx(score[1] * 0.5)
+    assert score[3] == 0
+
+
+def test_incremental_matches_batch():
+    rng = np.random.default_rng(3)
+    n = 300
+    days = pd.to_datetime("2025-01-01") + pd.to_timedelta(np.sort(rng.integers(0, 120, n)), "D")
+    df = _legs([
+        {"issuer_cik": str(rng.integers(1, 4)), "owner_cik": str(rng.integers(0, 10)),
+         "code": rng.choice(["P", "S", "A"]), "transactionDate": d.strftime("%Y-%m-%d")}
+        for d in days
+    ])
+    batch = ScoringEngine().score(df)
+
+    engine = ScoringEngine()
+    parts = [engine.update(df.iloc[i:i + 37]) for i in range(0, n, 37)]
+    incremental = pd.concat(parts)
+    pd.testing.assert_frame_equal(incremental, batch)
+    # Old buys were evicted from the running window
+    assert len(engine._window) < (df["code"] == "P").sum()
+
+
+def test_scores_real_payload():
+    with open("insider_trades.json") as f:
+        payload = json.load(f)
+    df = flatten_insider_payload(payload, engine="columnar", footnotes=True)
+    scored = ScoringEngine().score(df)
+    assert len(scored) == len(df)
+    assert scored["score"].between(-1, 1).all()
+    assert set(scored["label"]) <= {"strong buy", "buy", "maybe", "neutral", "sell", "strong sell"}
+    assert (scored.loc[scored["code"] == "S", "score"] < 0).all()
@@ -0,0 +1,127 @@
+import copy
+import json
+
+import pandas as pd
+import pytest
+
+import flattener
+import footnotes
+import roles
+from benchmarks.synth import synthetic_payload
+from flattener import flatten_insider_payload
+from insider_trading.cache import FeatureCache, rule_fingerprints
+from insider_trading.cli import main
+
+
+with open("./insider_trades.json", "r") as file:
+    FILINGS = json.load(file)["transactions"]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    with FeatureCache(tmp_path / "features") as cache:
+        yield cache
+
+
+@pytest.mark.parametrize("notes", [False, True])
+def test_hits_match_flatten(cache, notes):
+    expected = flatten_insider_payload(FILINGS, engine="columnar", footnotes=notes)
+    pd.testing.assert_frame_equal(cache.flatten(FILINGS, footnotes=notes), expected)
+    assert cache.last == {"hits": 0, "patched": 0, "misses": 10, "uncached": 0}
+    pd.testing.assert_frame_equal(cache.flatten(FILINGS, footnotes=notes), expected)
+    assert cache.last["hits"] == 10 and len(cache) == 10
+
+    compact = flatten_insider_payload(FILINGS, engine="columnar", compact=True)
+    pd.testing.assert_frame_equal(cache.flatten(FILINGS, compact=True), compact)
+
+
+def test_synthetic_subsets_and_reorder(cache):
+    filings = synthetic_payload(300, seed=5)["transactions"]
+    cache.flatten(filings[:200])
+    mixed = filings[250:] + filings[:100]
+    pd.testing.assert_frame_equal(cache.flatten(mixed), flatten_insider_payload(mixed, engine="columnar"))
+    assert cache.last == {"hits": 100, "patched": 0, "misses": 50, "uncached": 0}
+
+
+def test_role_and_direction_changes_patch(cache, monkeypatch):
+    cache.flatten(FILINGS)
+    before = rule_fingerprints()
+    role_map = {**roles.ROLE_MAP, "chief executive officer": 0.2}
+    monkeypatch.setattr(roles, "ROLE_MAP", role_map)
+    monkeypatch.setattr(roles, "_SCORER", roles.RoleScorer(role_map))
+    after = rule_fingerprints()
+    assert [k for k in before if before[k] != after[k]] == ["roles"]
+
+    expected = flatten_insider_payload(FILINGS, engine="columnar")
+    got = cache.flatten(FILINGS)
+    assert cache.last == {"hits": 0, "patched": 10, "misses": 0, "uncached": 0}
+    pd.testing.assert_frame_equal(got, expected)
+    cache.flatten(FILINGS)
+    assert cache.last["hits"] == 10                     # patched rows were written back
+
+
+def test_resolver_changes_change_flatten_fingerprint(monkeypatch):
+    before = rule_fingerprints()
+
+    def bind(self, schema):
+        return lambda obj, field, default=None: default
+    monkeypatch.setattr(flattener.SchemaResolver, "bind", bind)
+    after = rule_fingerprints()
+    assert [k for k in before if before[k] != after[k]] == ["flatten"]
+
+
+def test_footnote_rules_redo_only_filings_with_footnotes(cache, monkeypatch):
+    cache.flatten(FILINGS, footnotes=True)
+    monkeypatch.setitem(footnotes.FOOTNOTE_PATTERNS, "fn_extra", r"extra")
+    cache.flatten(FILINGS, footnotes=True)
+    with_notes = sum(bool(f.get("footnotes")) for f in FILINGS)
+    assert cache.last == {"hits": 10 - with_notes, "patched": 0, "misses": with_notes, "uncached": 0}
+
+
+def test_changed_duplicate_and_anonymous_filings(cache):
+    cache.flatten(FILINGS)
+    changed = copy.deepcopy(FILINGS)
+    changed[0]["issuer"]["name"] = "Apple Inc. (renamed)"
+    anonymous = {k: v for k, v in FILINGS[1].items() if k != "id"}
+    clash = copy.deepcopy(FILINGS[2])
+    clash["periodOfReport"] = "2020-01-01"
+    batch = changed + [anonymous, clash, FILINGS[3]]
+
+    got = cache.flatten(batch)
+    assert cache.last == {"hits": 9, "patched": 0, "misses": 1, "uncached": 2}
+    pd.testing.assert_frame_equal(got, flatten_insider_payload(batch, engine="columnar"))
+    assert (got["issuer_name"] == "Apple Inc. (renamed)").sum() > 0
+
+
+def test_eviction_and_compaction(tmp_path):
+    filings = synthetic_payload(400, seed=9)["transactions"]
+    with FeatureCache(tmp_path / "features", max_bytes=1 << 40) as cache:
+        cache.flatten(filings[:200])
+        cache.flatten(filings[200:])
+        full = cache.nbytes()
+        assert cache.stats()["segments"] == 2
+
+        cache.flatten(filings[300:])                        # most recently used
+        assert cache.evict(full // 3) > 0
+        assert cache.nbytes() <= full // 3 and len(cache) < 400
+        assert cache.stats()["segments"] == 1               # the first segment is gone entirely
+
+        got = cache.flatten(filings)
+        assert cache.last["hits"] == len(cache) - cache.last["misses"] > 0
+        pd.testing.assert_frame_equal(got, flatten_insider_payload(filings, engine="columnar"))
+
+    with FeatureCache(tmp_path / "features", max_bytes=1 << 40) as cache:   # reopened from disk
+        cache.flatten(filings)
+        assert cache.last["hits"] == 400
+        cache.clear()
+        assert len(cache) == 0 and cache.stats()["segments"] == 0
+
+
+def test_cli_cache(tmp_path):
+    out, cached = tmp_path / "legs.parquet", tmp_path / "cached.parquet"
+    assert main(["flatten", "insider_trades.json", "-o", str(out)]) == 0
+    for _ in range(2):
+        assert main(["flatten", "insider_trades.json", "--cache", str(tmp_path / "c"), "-o", str(cached)]) == 0
+    pd.testing.assert_frame_equal(pd.read_parquet(cached), pd.read_parquet(out))
+    assert main(["score", "insider_trades.json", "--cache", str(tmp_path / "c"), "-o", str(out)]) == 0
+    assert len(pd.read_parquet(out)) == 46
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synth import synthetic_payload
+from flattener import flatten_insider_payload
+from insider_trading.index import LegIndex
+
+
+@pytest.fixture(scope="module")
+def legs():
+    return flatten_insider_payload(synthetic_payload(1500, seed=4), engine="columnar")
+
+
+def _expected(df, issuer=None, owner=None, direction=None, lo=None, hi=None):
+    filed = pd.to_datetime(df["filedAt"], utc=True, format="ISO8601")
+    mask = pd.Series(True, index=df.index)
+    if issuer is not None:
+        mask &= df["issuer_symbol"] == issuer
+    if owner is not None:
+        mask &= df["owner_cik"] == owner
+    if direction is not None:
+        mask &= df["direction"] == direction
+    if lo is not None:
+        mask &= filed >= pd.Timestamp(lo, tz="UTC")
+    if hi is not None:
+        mask &= filed < pd.Timestamp(hi, tz="UTC")
+    return sorted(df.loc[mask, "id"] + df.loc[mask, "owner_cik"] + df.loc[mask, "securityTitle"])
+
+
+def _keys(out):
+    return sorted(out["id"] + out["owner_cik"] + out["securityTitle"])
+
+
+def _check(index, df):
+    issuer = df["issuer_symbol"].value_counts().index[0]
+    owner = df.loc[df["issuer_symbol"] == issuer, "owner_cik"].iloc[0]
+    for kw, exp in [
+        ({"issuer_symbol": issuer}, {"issuer": issuer}),
+        ({"issuer_symbol": issuer, "direction": "SELLish"}, {"issuer": issuer, "direction": "SELLish"}),
+        ({"owner_cik": owner, "issuer_symbol": issuer}, {"owner": owner, "issuer": issuer}),
+        ({"filed_from": "2024-03-01", "filed_to": "2024-04-01"}, {"lo": "2024-03-01", "hi": "2024-04-01"}),
+        ({"issuer_symbol": issuer, "direction": "BUYish", "last_days": 90, "now": "2024-09-01"},
+         {"issuer": issuer, "direction": "BUYish", "lo": "2024-06-03", "hi": None}),
+    ]:
+        out = index.query(**kw)
+        assert _keys(out) == _expected(df, **exp), kw
+        filed = pd.to_datetime(out["filedAt"], utc=True, format="ISO8601")
+        assert filed.is_monotonic_decreasing
+
+
+def test_queries_match_boolean_masks(legs):
+    index = LegIndex()
+    assert index.extend(legs) == len(legs)
+    assert len(index) == len(legs)
+    _check(index, legs)
+
+
+def test_incremental_and_out_of_order_batches(legs):
+    index = LegIndex()
+    shuffled = legs.sample(frac=1, random_state=0).reset_index(drop=True)
+    for chunk in np.array_split(np.arange(len(shuffled)), 7):
+        index.extend(shuffled.iloc[chunk])
+    _check(index, legs)
+
+
+def test_filing_lookup_and_compact_schema(legs):
+    compact = flatten_insider_payload(synthetic_payload(1500, seed=4), engine="columnar", compact=True)
+    index = LegIndex()
+    index.extend(compact)
+    acc = legs["accessionNo"].value_counts().index[0]
+    assert sorted(index.filing(acc)["id"].astype(str)) == sorted(legs.loc[legs["accessionNo"] == acc, "id"])
+    owner = legs["owner_cik"].iloc[0]
+    assert len(index.query(owner_cik=owner)) == (legs["owner_cik"] == owner).sum()
+    assert index.query(issuer_symbol="NOPE").empty
+    assert index.filing("missing").empty
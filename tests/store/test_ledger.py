@@ -0,0 +1,121 @@
+import json
+
+import pandas as pd
+import pytest
+
+from flattener import flatten_insider_payload
+from insider_trading.ledger import Ledger, PositionKey
+
+
+@pytest.fixture(scope="module")
+def legs():
+    with open("insider_trades.json") as f:
+        return flatten_insider_payload(json.load(f), engine="columnar")
+
+
+def _leg(date, code, acq_disp, shares, post, acc, filed="2025-01-10T18:00:00-05:00", doc="4"):
+    return {"owner_cik": "1", "issuer_cik": "9", "securityTitle": "Common Stock", "directOrIndirect": "D",
+            "transactionDate": date, "code": code, "acq_disp": acq_disp, "shares": shares,
+            "post_shares": post, "accessionNo": acc, "filedAt": filed, "table": "nonDeriv",
+            "documentType": doc}
+
+
+KEY = PositionKey("1", "9", "Common Stock", "D")
+
+
+def _state(ledger):
+    return {k: ([tuple(e) for e in p.entries], dict(p.gaps), dict(p.years))
+            for k, p in ledger.positions.items()}
+
+
+def test_apply_is_idempotent(legs):
+    ledger = Ledger()
+    assert ledger.apply(legs) == len(legs)
+    assert ledger.apply(legs) == 0
+    assert len(ledger) == len(legs)
+
+
+def test_out_of_order_matches_in_order(legs):
+    ordered = Ledger()
+    ordered.apply(legs)
+    shuffled = Ledger()
+    filings = [g for _, g in legs.groupby("accessionNo", sort=False)]
+    for g in filings[::-1]:            # oldest filings first: out of the frame's order
+        shuffled.apply(g)
+    assert _state(shuffled) == _state(ordered)
+
+
+def test_gap_flagged_and_cleared_by_late_leg():
+    ledger = Ledger()
+    ledger.apply(pd.DataFrame([
+        _leg("2025-01-02", "P", "A", 100, 100, "a1"),
+        _leg("2025-01-20", "S", "D", 10, 40, "a3"),     # 100 -> 40 with only 10 sold
+    ]))
+    gaps = ledger.gaps()
+    assert gaps["accessionNo"].tolist() == ["a3"]
+    assert gaps["gap"].iloc[0] == -50
+
+    # The missing filing arrives late and explains the difference
+    ledger.apply(pd.DataFrame([_leg("2025-01-10", "S", "D", 50, 50, "a2")]))
+    assert ledger.gaps().empty
+    assert ledger.holdings("1", "9") == {KEY: 40}
+
+
+def test_amendment_replaces_original_legs():
+    ledger = Ledger()
+    ledger.apply(pd.DataFrame([
+        _leg("2025-01-02", "P", "A", 100, 100, "a1"),
+        _leg("2025-01-05", "S", "D", 30, 70, "a2"),
+    ]))
+    ledger.apply(pd.DataFrame([
+        _leg("2025-01-05", "S", "D", 20, 80, "a2-amend", filed="2025-01-12T09:00:00-05:00", doc="4/A"),
+    ]))
+    pos = ledger.positions[KEY]
+    assert [e.accessionNo for e in pos.entries] == ["a1", "a2-amend"]
+    assert ledger.superseded == 1
+    assert pos.years["2025"] == [20, 100]
+
+
+def test_superseded_legs_stay_out_after_reload(tmp_path):
+    original = pd.DataFrame([
+        _leg("2025-01-02", "P", "A", 100, 100, "a1"),
+        _leg("2025-01-05", "S", "D", 30, 70, "a2"),
+    ])
+    ledger = Ledger()
+    ledger.apply(original)
+    ledger.apply(pd.DataFrame([
+        _leg("2025-01-05", "S", "D", 20, 80, "a2-amend", filed="2025-01-12T09:00:00-05:00", doc="4/A"),
+    ]))
+    assert ledger.apply(original) == 0          # the replaced leg does not come back
+
+    path = tmp_path / "ledger.arrow"
+    ledger.save(path)
+    loaded = Ledger.load(path)
+    assert _state(loaded) == _state(ledger)
+    assert loaded.superseded == 1
+    assert loaded.apply(original) == 0
+    assert [e.accessionNo for e in loaded.positions[KEY].entries] == ["a1", "a2-amend"]
+
+
+def test_fraction_sold_this_year():
+    ledger = Ledger()
+    ledger.apply(pd.DataFrame([
+        _leg("2024-06-01", "P", "A", 1000, 1000, "a0"),
+        _leg("2025-02-01", "A", "A", 200, 1200, "a1"),
+        _leg("2025-03-01", "S", "D", 300, 900, "a2"),
+        _leg("2025-03-02", "F", "D", 100, 800, "a3"),      # tax withholding is not a sale
+    ]))
+    assert ledger.fraction_sold("1", "9", 2025) == pytest.approx(300 / 1200)
+    assert ledger.fraction_sold("1", "9", 2024) == 0.0
+    assert ledger.fraction_sold("1", "9", 2023) == 0.0
+
+
+def test_snapshot_round_trip(tmp_path, legs):
+    ledger = Ledger()
+    ledger.apply(legs)
+    path = tmp_path / "ledger.arrow"
+    ledger.save(path)
+    loaded = Ledger.load(path)
+    assert _state(loaded) == _state(ledger)
+    assert loaded.apply(legs) == 0
+    assert loaded.fraction_sold("1214156", "320193", "2025") == ledger.fraction_sold("1214156", "320193", "2025")
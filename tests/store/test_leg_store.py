@@ -0,0 +1,48 @@
+import json
+
+import pandas as pd
+import pytest
+
+from flattener import flatten_insider_payload
+from insider_trading.store import LegStore
+
+
+with open("./insider_trades.json", "r") as file:
+    FRAME = flatten_insider_payload(json.load(file), engine="columnar")
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = LegStore(tmp_path / "legs")
+    store.append(FRAME)
+    return store
+
+
+def test_round_trip(store):
+    out = store.scan()
+    expected = FRAME.sort_values("filedAt", ascending=False, kind="stable").reset_index(drop=True)
+    pd.testing.assert_frame_equal(out, expected, check_dtype=False)
+
+
+def test_partition_pruning(store):
+    assert {(p, s) for p, s, _ in store.partitions()} == {
+        ("2025-02", "AAPL"), ("2025-04", "AAPL"), ("2025-05", "AAPL"), ("2025-08", "AAPL")}
+    assert len(store.files(issuer_symbol="MSFT")) == 0
+    assert len(store.files(filed_from="2025-04-01", filed_to="2025-05-01")) == 1
+
+
+def test_projection_and_filters(store):
+    out = store.scan(columns=["filedAt", "owner_cik", "shares"], issuer_symbol="AAPL",
+                     owner_cik=1767094, filed_from="2025-04-01", filed_to="2025-09-01")
+    assert list(out.columns) == ["filedAt", "owner_cik", "shares"]
+    mask = ((FRAME["owner_cik"] == "1767094")
+            & (pd.to_datetime(FRAME["filedAt"], utc=True) >= pd.Timestamp("2025-04-01", tz="UTC")))
+    assert len(out) == mask.sum() > 0
+    # filedAt bounds are compared in UTC: 18:30-04:00 on Aug 12 is 22:30Z
+    assert len(store.scan(filed_from="2025-08-12T22:30:19Z")) == len(FRAME[FRAME["filedAt"].str.startswith("2025-08-12")])
+    assert store.scan(filed_from="2025-08-12T22:30:20Z").empty
+
+
+def test_appends_are_additive(store):
+    store.append(FRAME.head(3))
+    assert len(store.scan()) == len(FRAME) + 3